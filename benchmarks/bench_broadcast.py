@@ -0,0 +1,75 @@
+"""Measure broadcast fan-out to many local websocket clients.
+
+Clients are in-process fakes: most send in ~1 ms, a few never finish a
+send, so the figures show whether slow consumers hold up the rest.
+
+Usage: ``python benchmarks/bench_broadcast.py [clients] [messages] [policy]``
+"""
+
+from __future__ import annotations
+
+import asyncio
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from lucas_project.core.orchestrator import WebSocketBroadcaster
+
+
+class FakeSocket:
+    def __init__(self, delay: float | None) -> None:
+        self.delay = delay
+        self.received = 0
+
+    async def accept(self) -> None:
+        pass
+
+    async def send_text(self, message: str) -> None:
+        if self.delay is None:
+            await asyncio.Event().wait()
+        await asyncio.sleep(self.delay)
+        self.received += 1
+
+    async def close(self) -> None:
+        pass
+
+
+async def main(clients: int = 1000, messages: int = 100, policy: str = "drop_oldest") -> None:
+    rng = random.Random(42)
+    broadcaster = WebSocketBroadcaster(policy=policy, send_timeout=60)  # type: ignore[arg-type]
+    sockets = [
+        FakeSocket(None if i % 100 == 0 else rng.uniform(0.0005, 0.002)) for i in range(clients)
+    ]
+    for ws in sockets:
+        await broadcaster.connect(ws)
+    payload = {"topic": "stage", "rows": list(range(50))}
+    call_times = []
+    for n in range(messages):
+        started = time.perf_counter()
+        await broadcaster.broadcast({**payload, "n": n}, key="stage")
+        call_times.append(time.perf_counter() - started)
+        await asyncio.sleep(0.005)
+    await asyncio.sleep(0.1)
+    call_times.sort()
+    latency = broadcaster.latency_percentiles()
+    print(
+        f"{clients} clients x {messages} messages ({policy}): "
+        f"broadcast() p50 {call_times[len(call_times) // 2] * 1e3:.2f} ms, "
+        f"max {call_times[-1] * 1e3:.2f} ms; delivery p50 {latency['p50'] * 1e3:.2f} ms, "
+        f"p99 {latency['p99'] * 1e3:.2f} ms; {broadcaster.stats}"
+    )
+    await broadcaster.aclose()
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    asyncio.run(
+        main(
+            int(args[0]) if len(args) > 0 else 1000,
+            int(args[1]) if len(args) > 1 else 100,
+            args[2] if len(args) > 2 else "drop_oldest",
+        )
+    )
@@ -0,0 +1,50 @@
+"""Measure how long ``import lucas_project.core`` takes in a fresh interpreter.
+
+Each run starts a new process with ``python -X importtime`` and reads the
+cumulative time reported for the package, so the figure excludes
+interpreter startup. Timings vary with the machine and its load; compare
+runs on the same host rather than against a fixed budget.
+
+Usage: ``python benchmarks/bench_imports.py [runs] [module]``
+"""
+
+from __future__ import annotations
+
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def import_time_us(module: str) -> int:
+    """Return the cumulative import time of ``module`` in microseconds."""
+
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    for line in result.stderr.splitlines():
+        parts = [part.strip() for part in line.split("|")]
+        if len(parts) == 3 and parts[2] == module:
+            return int(parts[1])
+    raise RuntimeError(f"{module} not in importtime output")
+
+
+def main(runs: int = 10, module: str = "lucas_project.core") -> None:
+    samples = sorted(import_time_us(module) / 1000 for _ in range(runs))
+    print(
+        f"import {module}: median {statistics.median(samples):.1f} ms, "
+        f"min {samples[0]:.1f} ms, max {samples[-1]:.1f} ms over {runs} runs"
+    )
+
+
+if __name__ == "__main__":
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 10,
+        sys.argv[2] if len(sys.argv) > 2 else "lucas_project.core",
+    )
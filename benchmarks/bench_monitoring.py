@@ -0,0 +1,71 @@
+"""Measure a daily monitoring run over many valuated domains.
+
+Provider calls are replaced by no-ops so the figure covers ranking and
+database work, not the free-tier API rate limits.
+
+Usage: ``python benchmarks/bench_monitoring.py [domains]``
+"""
+
+from __future__ import annotations
+
+import asyncio
+import importlib
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from lucas_project.core.config import get_settings
+from lucas_project.core.db import close_pools, get_db, get_engine
+from lucas_project.core.models import Base
+
+monitoring = importlib.import_module("lucas_project.modules.5_monitoring")
+
+SERVICES = ("EstiBot", "GoDaddy", "HumbleWorth")
+
+
+async def _create_monitor(service: str, domain_id: int) -> str:
+    return f"{service}-{domain_id}"
+
+
+async def _delete_monitor(service: str, domain_id: int) -> None:
+    return None
+
+
+async def main(count: int = 100_000) -> None:
+    monitoring._create_monitor = _create_monitor
+    monitoring._delete_monitor = _delete_monitor
+    rng = random.Random(42)
+    async with get_db() as db:
+        await db.executemany(
+            "INSERT INTO domains (id, domain, status, created_at) "
+            "VALUES (?, ?, 'valuated', CURRENT_TIMESTAMP)",
+            ((i, f"bench{i}.com") for i in range(1, count + 1)),
+        )
+        await db.executemany(
+            "INSERT INTO valuations (domain_id, service, value, created_at) "
+            "VALUES (?, ?, ?, CURRENT_TIMESTAMP)",
+            (
+                (i, service, rng.uniform(0, 1000))
+                for i in range(1, count + 1)
+                for service in SERVICES
+            ),
+        )
+        await db.commit()
+    started = time.perf_counter()
+    await monitoring.run()
+    elapsed = time.perf_counter() - started
+    print(f"{count} valuated domains ranked and capped in {elapsed:.2f}s")
+    await close_pools()
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["LUCAS_DATABASE_URL"] = str(Path(tmp) / "bench.db")
+        get_settings.cache_clear()
+        Base.metadata.create_all(get_engine())
+        asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000))
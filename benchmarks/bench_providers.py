@@ -0,0 +1,80 @@
+"""Load test availability checks and valuations against simulated providers.
+
+Stages 3 and 4 run unchanged, including their rate limiters, retries,
+circuit breakers and HumbleWorth batching. Only the network is replaced by
+:class:`lucas_project.core.simulator.ProviderSimulator`, with lognormal
+latency and optional 5xx/429 injection.
+
+Usage: ``python benchmarks/bench_providers.py [--domains 500] [--latency 0.05]
+[--error-rate 0.01] [--throttle-rate 0.01] [--no-rate-limits]``
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import importlib
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from lucas_project.core.config import get_settings
+from lucas_project.core.db import close_pools, get_db, get_engine
+from lucas_project.core.http import http_clients
+from lucas_project.core.models import Base
+from lucas_project.core.simulator import Latency, ProviderProfile, ProviderSimulator
+from lucas_project.core.utils import _rate_limiters
+
+STAGES = ("3_availability_checker", "4_valuation")
+
+
+async def main(args: argparse.Namespace) -> None:
+    modules = [importlib.import_module(f"lucas_project.modules.{name}") for name in STAGES]
+    if args.no_rate_limits:
+        for limiter in _rate_limiters.values():
+            limiter.interval = limiter.tolerance = 0.0
+    async with get_db() as db:
+        await db.executemany(
+            "INSERT INTO domains (domain, status, created_at) VALUES (?, 'new', CURRENT_TIMESTAMP)",
+            ((f"load{i}.com",) for i in range(args.domains)),
+        )
+        await db.commit()
+    profile = ProviderProfile(
+        latency=Latency("lognormal", mean=args.latency, sigma=args.sigma),
+        error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate,
+    )
+    simulator = ProviderSimulator(default=profile, seed=42)
+    with simulator.install():
+        try:
+            for name, module in zip(STAGES, modules):
+                started = time.perf_counter()
+                await module.run()
+                elapsed = time.perf_counter() - started
+                print(f"{name}: {elapsed:.2f}s ({args.domains / elapsed:,.1f} domains/s)")
+        finally:
+            await http_clients.aclose()
+            await close_pools()
+    print(json.dumps(simulator.summary(), indent=2, default=float))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--domains", type=int, default=500)
+    parser.add_argument("--latency", type=float, default=0.05, help="median provider latency")
+    parser.add_argument("--sigma", type=float, default=0.5, help="lognormal shape (tail length)")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--throttle-rate", type=float, default=0.0)
+    parser.add_argument("--no-rate-limits", action="store_true")
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["LUCAS_DATABASE_URL"] = str(Path(tmp) / "bench.db")
+        os.environ["LUCAS_LLM_CACHE_PATH"] = str(Path(tmp) / "llm_cache.jsonl")
+        get_settings.cache_clear()
+        Base.metadata.create_all(get_engine())
+        asyncio.run(main(args))
@@ -0,0 +1,448 @@
+"""Benchmark every pipeline stage and dashboard route on synthetic data.
+
+A temporary SQLite database is seeded with ``--scale`` domains (``10k``,
+``100k``, ``1m`` or a number) in a realistic status mix. Each dashboard
+route and then each stage ``run()`` is executed in pipeline order. Provider
+calls are replaced by stubs that answer after ``--latency`` seconds (``0``
+for the zero-latency mode), so the figures cover our own work and not
+provider rate limits.
+
+Every step reports wall time, rows/sec, peak RSS and the number of SQL
+statements executed. ``--baseline`` compares the results with a stored JSON
+baseline and exits with status 1 when a step is slower, or runs more SQL,
+than the baseline by more than ``--threshold``. ``--update-baseline``
+records the current results instead.
+
+Usage: ``python benchmarks/harness.py [--scale 10k] [--latency 0]
+[--baseline benchmarks/baseline.json] [--threshold 0.25] [--update-baseline]
+[--output results.json]``
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import importlib
+import json
+import os
+import random
+import resource
+import sys
+import tempfile
+import threading
+import time
+import zlib
+from collections import Counter
+from collections.abc import Awaitable, Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+SCALES = {"10k": 10_000, "100k": 100_000, "1m": 1_000_000}
+STATUS_MIX = {
+    "new": 0.40,
+    "available": 0.15,
+    "taken": 0.15,
+    "valuated": 0.15,
+    "monitoring": 0.05,
+    "backordered": 0.05,
+    "owned": 0.05,
+}
+VALUED = {"valuated", "monitoring", "backordered", "owned"}
+SERVICES = ("EstiBot", "HumbleWorth", "GoDaddy")
+TLDS = ("com", "io", "ai", "dev")
+WORDS = ("cloud", "data", "stack", "flow", "graph", "agent", "vector", "edge", "pay", "shop")
+STAGES = (
+    "1_trend_discovery",
+    "2_domain_generator",
+    "3_availability_checker",
+    "4_valuation",
+    "5_monitoring",
+    "6_backordering",
+    "7_portfolio_manager",
+    "8_monetization",
+)
+# timing differences below this are noise, whatever the threshold
+MIN_REGRESSION_SECONDS = 0.05
+CHUNK = 10_000
+
+
+@dataclass
+class StepResult:
+    """Measurements for one stage or route."""
+
+    name: str
+    seconds: float
+    rows: int
+    rows_per_sec: float
+    peak_rss_mb: float
+    sql: int
+    sql_by_kind: dict[str, int] = field(default_factory=dict)
+    # "process" when the peak could not be reset and covers earlier steps
+    peak_rss_scope: str = "step"
+
+
+def parse_scale(value: str) -> int:
+    return SCALES.get(value.lower()) or int(value.replace("_", ""))
+
+
+def _reset_peak_rss() -> bool:
+    """Reset the peak RSS counter; return whether that is supported."""
+
+    # Linux resets VmHWM when "5" is written to clear_refs
+    try:
+        Path("/proc/self/clear_refs").write_text("5")
+    except OSError:
+        return False
+    return True
+
+
+def _peak_rss_mb() -> float:
+    try:
+        for line in Path("/proc/self/status").read_text().splitlines():
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _chunks(rows: Iterator[tuple[Any, ...]]) -> Iterator[list[tuple[Any, ...]]]:
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= CHUNK:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+async def seed(count: int, *, seed: int = 42) -> dict[str, int]:
+    """Fill the configured database with ``count`` synthetic domains.
+
+    Returns the number of domains per status.
+    """
+
+    from lucas_project.core.db import get_db
+
+    monitoring = importlib.import_module("lucas_project.modules.5_monitoring")
+    rng = random.Random(seed)
+    statuses, weights = zip(*STATUS_MIX.items())
+    assigned = rng.choices(statuses, weights, k=count)
+    seeds = max(1, count // 1000)
+    base = datetime(2024, 1, 1)
+    caps = dict(monitoring.CAPS)
+
+    def domains() -> Iterator[tuple[Any, ...]]:
+        for i, status in enumerate(assigned, 1):
+            created = (base + timedelta(seconds=i)).isoformat(sep=" ")
+            name = f"{WORDS[i % len(WORDS)]}{i}.{TLDS[i % len(TLDS)]}"
+            yield i, name, i % seeds + 1, status, created
+
+    def checks() -> Iterator[tuple[Any, ...]]:
+        for i, status in enumerate(assigned, 1):
+            if status != "new":
+                yield i, status != "taken", "2024-01-02 00:00:00"
+
+    def valuations() -> Iterator[tuple[Any, ...]]:
+        for i, status in enumerate(assigned, 1):
+            if status in VALUED:
+                for service in SERVICES:
+                    yield i, service, round(rng.uniform(0, 1000), 2), "2024-01-03 00:00:00"
+
+    def monitors() -> Iterator[tuple[Any, ...]]:
+        for i, status in enumerate(assigned, 1):
+            if status == "monitoring":
+                for service, left in caps.items():
+                    if left:
+                        caps[service] = left - 1
+                        yield i, service, f"{service}-{i}"
+
+    def backorders() -> Iterator[tuple[Any, ...]]:
+        for i, status in enumerate(assigned, 1):
+            if status == "backordered":
+                yield i, "NoWinNoFee", "2024-01-04 00:00:00"
+
+    statements = (
+        ("INSERT INTO domains (id, domain, trend_seed_id, status, created_at) VALUES (?, ?, ?, ?, ?)", domains),
+        ("INSERT INTO availability_checks (domain_id, available, checked_at) VALUES (?, ?, ?)", checks),
+        ("INSERT INTO valuations (domain_id, service, value, created_at) VALUES (?, ?, ?, ?)", valuations),
+        ("INSERT INTO monitors (domain_id, service, monitor_ref) VALUES (?, ?, ?)", monitors),
+        ("INSERT INTO backorders (domain_id, provider, ordered_at) VALUES (?, ?, ?)", backorders),
+    )
+    async with get_db() as db:
+        await db.executemany(
+            "INSERT INTO trend_seeds (id, phrase) VALUES (?, ?)",
+            ((i, f"{WORDS[i % len(WORDS)]} {WORDS[(i // len(WORDS)) % len(WORDS)]} {i}") for i in range(1, seeds + 1)),
+        )
+        for sql, rows in statements:
+            for chunk in _chunks(rows()):
+                await db.executemany(sql, chunk)
+        await db.commit()
+    return dict(Counter(assigned))
+
+
+@contextmanager
+def stub_providers(latency: float, cache_path: Path) -> Iterator[None]:
+    """Replace every provider call with a stub answering after ``latency``."""
+
+    trends = importlib.import_module("lucas_project.modules.1_trend_discovery")
+    availability = importlib.import_module("lucas_project.modules.3_availability_checker")
+    valuation = importlib.import_module("lucas_project.modules.4_valuation")
+    monitoring = importlib.import_module("lucas_project.modules.5_monitoring")
+    from lucas_project.core.llm_cache import LLMCache
+
+    async def fetch_trends() -> list[str]:
+        await asyncio.sleep(latency)
+        return [f"bench trend {i}" for i in range(5)]
+
+    async def check_domain_availability(domain: str) -> bool:
+        await asyncio.sleep(latency)
+        return zlib.crc32(domain.encode()) % 3 != 0
+
+    def valuer(service: str) -> Callable[[str], Awaitable[float]]:
+        async def fetch(domain: str) -> float:
+            await asyncio.sleep(latency)
+            return float(len(domain) * len(service))
+
+        return fetch
+
+    async def create_monitor(service: str, domain_id: int) -> str:
+        await asyncio.sleep(latency)
+        return f"{service}-{domain_id}"
+
+    async def delete_monitor(service: str, domain_id: int) -> None:
+        await asyncio.sleep(latency)
+
+    patches: list[tuple[Any, str, Any]] = [
+        (trends, "fetch_trends", fetch_trends),
+        (availability, "check_domain_availability", check_domain_availability),
+        (valuation, "cache", LLMCache(cache_path)),
+        (monitoring, "_create_monitor", create_monitor),
+        (monitoring, "_delete_monitor", delete_monitor),
+    ]
+    originals = [(obj, name, getattr(obj, name)) for obj, name, _ in patches]
+    services = dict(valuation.SERVICE_FUNCS)
+    for obj, name, value in patches:
+        setattr(obj, name, value)
+    valuation.SERVICE_FUNCS.update({service: valuer(service) for service in services})
+    try:
+        yield
+    finally:
+        valuation.cache.close()
+        for obj, name, value in originals:
+            setattr(obj, name, value)
+        valuation.SERVICE_FUNCS.update(services)
+
+
+class _StatementCounter:
+    """Count traced statements by kind; called from connection threads."""
+
+    def __init__(self) -> None:
+        self.kinds: Counter[str] = Counter()
+        self._lock = threading.Lock()
+
+    def __call__(self, sql: str) -> None:
+        kind = sql.lstrip().split(None, 1)[0].upper() if sql.strip() else "?"
+        with self._lock:
+            self.kinds[kind] += 1
+
+
+async def measure(name: str, step: Callable[[], Awaitable[int]]) -> StepResult:
+    """Run ``step`` (returning its row count) and measure it."""
+
+    from lucas_project.core.db import get_pool
+
+    pool = get_pool()
+    counter = _StatementCounter()
+    await pool.set_trace(counter)
+    peak_reset = _reset_peak_rss()
+    started = time.perf_counter()
+    try:
+        rows = await step()
+    finally:
+        seconds = time.perf_counter() - started
+        await pool.set_trace(None)
+    return StepResult(
+        name=name,
+        seconds=round(seconds, 4),
+        rows=rows,
+        rows_per_sec=round(rows / seconds, 1) if seconds else 0.0,
+        peak_rss_mb=round(_peak_rss_mb(), 1),
+        sql=sum(counter.kinds.values()),
+        sql_by_kind=dict(counter.kinds),
+        peak_rss_scope="step" if peak_reset else "process",
+    )
+
+
+def _route_steps(client: Any) -> list[tuple[str, Callable[[], Awaitable[int]]]]:
+    async def get(path: str) -> int:
+        response = await client.get(path)
+        response.raise_for_status()
+        return 1
+
+    async def all_pages() -> int:
+        rows, cursor = 0, None
+        while True:
+            params = {"limit": 1000, **({"after": cursor} if cursor else {})}
+            response = await client.get("/api/domains", params=params)
+            response.raise_for_status()
+            page = response.json()
+            rows += len(page["items"])
+            cursor = page["next_cursor"]
+            if cursor is None:
+                return rows
+
+    async def export() -> int:
+        rows = 0
+        async with client.stream("GET", "/api/domains/export") as response:
+            response.raise_for_status()
+            async for line in response.aiter_lines():
+                rows += bool(line)
+        return rows
+
+    return [
+        ("GET /api/kpis", lambda: get("/api/kpis")),
+        ("GET /api/finance", lambda: get("/api/finance")),
+        ("GET /api/domains (all pages)", all_pages),
+        ("GET /api/domains/export", export),
+    ]
+
+
+def _stage_step(name: str) -> Callable[[], Awaitable[int]]:
+    from lucas_project.core import progress
+
+    module = importlib.import_module(f"lucas_project.modules.{name}")
+
+    async def step() -> int:
+        before = progress.totals[f"stage.{name}"].get("rows", 0)
+        await module.run()
+        return int(progress.totals[f"stage.{name}"].get("rows", 0) - before)
+
+    return step
+
+
+async def run_suite(count: int, latency: float, workdir: Path) -> list[StepResult]:
+    """Seed a database under ``workdir`` and benchmark every route and stage.
+
+    Stages write their exports relative to the working directory, so the
+    caller should run this with ``workdir`` as the current directory.
+    """
+
+    os.environ["LUCAS_DATABASE_URL"] = str(workdir / "bench.db")
+    from lucas_project.core.config import get_settings
+
+    get_settings.cache_clear()
+
+    import httpx
+    from fastapi import FastAPI
+
+    from lucas_project.core.db import close_pools, get_engine
+    from lucas_project.core.models import Base
+    from lucas_project.dashboard.api import init_app
+
+    (workdir / "lucas_project" / "data").mkdir(parents=True, exist_ok=True)
+    Base.metadata.create_all(get_engine())
+    results = [await measure("seed", lambda: _seeded(count))]
+    app = FastAPI()
+    init_app(app)
+    try:
+        with stub_providers(latency, workdir / "llm_cache.jsonl"):
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+                for name, step in _route_steps(client):
+                    results.append(await measure(name, step))
+            for name in STAGES:
+                results.append(await measure(name, _stage_step(name)))
+    finally:
+        await close_pools()
+    return results
+
+
+async def _seeded(count: int) -> int:
+    await seed(count)
+    return count
+
+
+def compare(
+    results: list[dict[str, Any]], baseline: dict[str, dict[str, Any]], threshold: float
+) -> list[str]:
+    """Return a description of every step that regressed against ``baseline``."""
+
+    regressions = []
+    for result in results:
+        base = baseline.get(result["name"])
+        if base is None:
+            continue
+        slower = result["seconds"] - base["seconds"]
+        if result["seconds"] > base["seconds"] * (1 + threshold) and slower > MIN_REGRESSION_SECONDS:
+            regressions.append(
+                f"{result['name']}: {result['seconds']:.3f}s vs {base['seconds']:.3f}s baseline"
+            )
+        if result["sql"] > base["sql"] * (1 + threshold):
+            regressions.append(
+                f"{result['name']}: {result['sql']} SQL statements vs {base['sql']} baseline"
+            )
+    return regressions
+
+
+def _print_table(results: list[StepResult]) -> None:
+    print(f"{'step':<32} {'seconds':>9} {'rows':>9} {'rows/s':>11} {'peak MB':>8} {'sql':>9}")
+    for r in results:
+        mark = "*" if r.peak_rss_scope == "process" else " "
+        print(
+            f"{r.name:<32} {r.seconds:>9.3f} {r.rows:>9} {r.rows_per_sec:>11,.0f} "
+            f"{r.peak_rss_mb:>7.1f}{mark} {r.sql:>9}"
+        )
+    if any(r.peak_rss_scope == "process" for r in results):
+        print("* peak RSS since process start; it cannot be reset per step here")
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scale", default="10k", help="10k, 100k, 1m or a domain count")
+    parser.add_argument("--latency", type=float, default=0.0, help="stub provider latency in seconds")
+    parser.add_argument("--baseline", type=Path, default=Path(__file__).with_name("baseline.json"))
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed slowdown, e.g. 0.25")
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--output", type=Path, help="write the results as JSON")
+    args = parser.parse_args(argv)
+
+    count = parse_scale(args.scale)
+    key = f"{count}@{args.latency:g}s"
+    cwd = Path.cwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            results = asyncio.run(run_suite(count, args.latency, Path(tmp)))
+        finally:
+            os.chdir(cwd)
+    _print_table(results)
+    data = [asdict(result) for result in results]
+    if args.output:
+        args.output.write_text(json.dumps({key: data}, indent=2) + "\n")
+
+    baselines = json.loads(args.baseline.read_text()) if args.baseline.exists() else {}
+    if args.update_baseline:
+        baselines[key] = {row["name"]: row for row in data}
+        args.baseline.write_text(json.dumps(baselines, indent=2, sort_keys=True) + "\n")
+        print(f"Baseline {key} written to {args.baseline}")
+        return 0
+    if key not in baselines:
+        print(f"No baseline for {key} in {args.baseline}")
+        return 0
+    regressions = compare(data, baselines[key], args.threshold)
+    for line in regressions:
+        print(f"REGRESSION {line}")
+    if not regressions:
+        print(f"No regressions against baseline {key} (threshold {args.threshold:.0%})")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
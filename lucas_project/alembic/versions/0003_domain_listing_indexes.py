@@ -0,0 +1,27 @@
+"""Index domain listing filters"""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # covers the per-status stage queues as well as keyset listing
+    op.create_index("ix_domains_status_id_domain", "domains", ["status", "id", "domain"])
+    op.create_index("ix_domains_created_at", "domains", ["created_at"])
+    op.create_index(
+        "ix_domains_tld", "domains", [sa.text("substr(domain, instr(domain, '.') + 1)")]
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_domains_tld", table_name="domains")
+    op.drop_index("ix_domains_created_at", table_name="domains")
+    op.drop_index("ix_domains_status_id_domain", table_name="domains")
@@ -0,0 +1,114 @@
+"""Materialize KPI aggregates"""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+# Frozen copies of ``KPI_TRIGGERS`` and ``KPI_REBUILD_SQL`` from
+# ``lucas_project.core.models`` as of this revision.
+TRIGGERS = {
+    "trg_kpi_domain_insert": """
+CREATE TRIGGER IF NOT EXISTS trg_kpi_domain_insert AFTER INSERT ON domains
+BEGIN
+    INSERT INTO kpi_status (status, domains, value) VALUES (NEW.status, 1, 0)
+    ON CONFLICT(status) DO UPDATE SET domains = domains + 1;
+END""",
+    "trg_kpi_domain_delete": """
+CREATE TRIGGER IF NOT EXISTS trg_kpi_domain_delete AFTER DELETE ON domains
+BEGIN
+    UPDATE kpi_status SET domains = domains - 1,
+        value = value - (SELECT COALESCE(SUM(value), 0) FROM valuations WHERE domain_id = OLD.id)
+    WHERE status = OLD.status;
+END""",
+    "trg_kpi_domain_status": """
+CREATE TRIGGER IF NOT EXISTS trg_kpi_domain_status AFTER UPDATE OF status ON domains
+WHEN OLD.status IS NOT NEW.status
+BEGIN
+    UPDATE kpi_status SET domains = domains - 1,
+        value = value - (SELECT COALESCE(SUM(value), 0) FROM valuations WHERE domain_id = OLD.id)
+    WHERE status = OLD.status;
+    INSERT INTO kpi_status (status, domains, value)
+    VALUES (NEW.status, 1,
+        (SELECT COALESCE(SUM(value), 0) FROM valuations WHERE domain_id = NEW.id))
+    ON CONFLICT(status) DO UPDATE SET domains = domains + 1, value = value + excluded.value;
+END""",
+    "trg_kpi_valuation_insert": """
+CREATE TRIGGER IF NOT EXISTS trg_kpi_valuation_insert AFTER INSERT ON valuations
+BEGIN
+    INSERT INTO kpi_service (service, valuations, value) VALUES (NEW.service, 1, NEW.value)
+    ON CONFLICT(service) DO UPDATE SET valuations = valuations + 1, value = value + excluded.value;
+    UPDATE kpi_status SET value = value + NEW.value
+    WHERE status = (SELECT status FROM domains WHERE id = NEW.domain_id);
+END""",
+    "trg_kpi_valuation_delete": """
+CREATE TRIGGER IF NOT EXISTS trg_kpi_valuation_delete AFTER DELETE ON valuations
+BEGIN
+    UPDATE kpi_service SET valuations = valuations - 1, value = value - OLD.value
+    WHERE service = OLD.service;
+    UPDATE kpi_status SET value = value - OLD.value
+    WHERE status = (SELECT status FROM domains WHERE id = OLD.domain_id);
+END""",
+    "trg_kpi_valuation_update": """
+CREATE TRIGGER IF NOT EXISTS trg_kpi_valuation_update
+AFTER UPDATE OF domain_id, service, value ON valuations
+BEGIN
+    UPDATE kpi_service SET valuations = valuations - 1, value = value - OLD.value
+    WHERE service = OLD.service;
+    UPDATE kpi_status SET value = value - OLD.value
+    WHERE status = (SELECT status FROM domains WHERE id = OLD.domain_id);
+    INSERT INTO kpi_service (service, valuations, value) VALUES (NEW.service, 1, NEW.value)
+    ON CONFLICT(service) DO UPDATE SET valuations = valuations + 1, value = value + excluded.value;
+    UPDATE kpi_status SET value = value + NEW.value
+    WHERE status = (SELECT status FROM domains WHERE id = NEW.domain_id);
+END""",
+}
+
+REBUILD_SQL = (
+    "DELETE FROM kpi_status",
+    "DELETE FROM kpi_service",
+    (
+        "INSERT INTO kpi_status (status, domains, value) "
+        "SELECT d.status, COUNT(*), COALESCE(SUM(v.total), 0) FROM domains d "
+        "LEFT JOIN (SELECT domain_id, SUM(value) AS total FROM valuations GROUP BY domain_id) v "
+        "ON v.domain_id = d.id GROUP BY d.status"
+    ),
+    (
+        "INSERT INTO kpi_service (service, valuations, value) "
+        "SELECT service, COUNT(*), COALESCE(SUM(value), 0) FROM valuations GROUP BY service"
+    ),
+)
+
+
+def upgrade() -> None:
+    op.create_index("ix_valuations_domain_id", "valuations", ["domain_id"])
+    op.create_table(
+        "kpi_status",
+        sa.Column("status", sa.String, primary_key=True),
+        sa.Column("domains", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("value", sa.Float, nullable=False, server_default="0"),
+    )
+    op.create_table(
+        "kpi_service",
+        sa.Column("service", sa.String, primary_key=True),
+        sa.Column("valuations", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("value", sa.Float, nullable=False, server_default="0"),
+    )
+    for sql in TRIGGERS.values():
+        op.execute(sql)
+    for sql in REBUILD_SQL:
+        op.execute(sql)
+
+
+def downgrade() -> None:
+    for name in TRIGGERS:
+        op.execute(f"DROP TRIGGER IF EXISTS {name}")
+    op.drop_table("kpi_service")
+    op.drop_table("kpi_status")
+    op.drop_index("ix_valuations_domain_id", table_name="valuations")
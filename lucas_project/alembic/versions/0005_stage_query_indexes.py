@@ -0,0 +1,27 @@
+"""Index stage query predicates"""
+
+from __future__ import annotations
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_valuations_domain_id_value", "valuations", ["domain_id", "value"])
+    op.drop_index("ix_valuations_domain_id", table_name="valuations")
+    op.create_index("ix_monitors_service_domain_id", "monitors", ["service", "domain_id"])
+    op.create_index("ix_availability_checks_domain_id", "availability_checks", ["domain_id"])
+    op.create_index("ix_backorders_domain_id", "backorders", ["domain_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_backorders_domain_id", table_name="backorders")
+    op.drop_index("ix_availability_checks_domain_id", table_name="availability_checks")
+    op.drop_index("ix_monitors_service_domain_id", table_name="monitors")
+    op.create_index("ix_valuations_domain_id", "valuations", ["domain_id"])
+    op.drop_index("ix_valuations_domain_id_value", table_name="valuations")
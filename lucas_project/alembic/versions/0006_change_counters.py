@@ -0,0 +1,78 @@
+"""Count changes to the portfolio export's input"""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+# Frozen copy of ``PORTFOLIO_TRIGGERS`` from ``lucas_project.core.models`` as
+# of this revision.
+TRIGGERS = {
+    "trg_portfolio_domain_insert": """
+CREATE TRIGGER IF NOT EXISTS trg_portfolio_domain_insert AFTER INSERT ON domains
+WHEN NEW.status = 'owned'
+BEGIN
+    INSERT INTO change_counters (name, version) VALUES ('portfolio', 1)
+    ON CONFLICT(name) DO UPDATE SET version = version + 1;
+END""",
+    "trg_portfolio_domain_delete": """
+CREATE TRIGGER IF NOT EXISTS trg_portfolio_domain_delete AFTER DELETE ON domains
+WHEN OLD.status = 'owned'
+BEGIN
+    INSERT INTO change_counters (name, version) VALUES ('portfolio', 1)
+    ON CONFLICT(name) DO UPDATE SET version = version + 1;
+END""",
+    "trg_portfolio_domain_update": """
+CREATE TRIGGER IF NOT EXISTS trg_portfolio_domain_update
+AFTER UPDATE OF status, domain ON domains
+WHEN 'owned' IN (OLD.status, NEW.status)
+BEGIN
+    INSERT INTO change_counters (name, version) VALUES ('portfolio', 1)
+    ON CONFLICT(name) DO UPDATE SET version = version + 1;
+END""",
+    "trg_portfolio_valuation_insert": """
+CREATE TRIGGER IF NOT EXISTS trg_portfolio_valuation_insert AFTER INSERT ON valuations
+WHEN (SELECT status FROM domains WHERE id = NEW.domain_id) = 'owned'
+BEGIN
+    INSERT INTO change_counters (name, version) VALUES ('portfolio', 1)
+    ON CONFLICT(name) DO UPDATE SET version = version + 1;
+END""",
+    "trg_portfolio_valuation_delete": """
+CREATE TRIGGER IF NOT EXISTS trg_portfolio_valuation_delete AFTER DELETE ON valuations
+WHEN (SELECT status FROM domains WHERE id = OLD.domain_id) = 'owned'
+BEGIN
+    INSERT INTO change_counters (name, version) VALUES ('portfolio', 1)
+    ON CONFLICT(name) DO UPDATE SET version = version + 1;
+END""",
+    "trg_portfolio_valuation_update": """
+CREATE TRIGGER IF NOT EXISTS trg_portfolio_valuation_update
+AFTER UPDATE OF domain_id, value ON valuations
+WHEN (SELECT status FROM domains WHERE id = OLD.domain_id) = 'owned'
+    OR (SELECT status FROM domains WHERE id = NEW.domain_id) = 'owned'
+BEGIN
+    INSERT INTO change_counters (name, version) VALUES ('portfolio', 1)
+    ON CONFLICT(name) DO UPDATE SET version = version + 1;
+END""",
+}
+
+
+def upgrade() -> None:
+    op.create_table(
+        "change_counters",
+        sa.Column("name", sa.String, primary_key=True),
+        sa.Column("version", sa.Integer, nullable=False, server_default="0"),
+    )
+    for sql in TRIGGERS.values():
+        op.execute(sql)
+
+
+def downgrade() -> None:
+    for name in TRIGGERS:
+        op.execute(f"DROP TRIGGER IF EXISTS {name}")
+    op.drop_table("change_counters")
@@ -1,24 +1,77 @@
 """Public core helpers for the Lucas project."""
 
+from .aggregates import KpiAggregates, get_kpi_aggregates, rebuild_kpi_aggregates
+from .batching import MicroBatcher
+from .checkpoints import get_checkpoint, reset_checkpoint, set_checkpoint
 from .config import Settings, get_settings
-from .db import get_db
+from .db import close_pools, get_db, pool_stats
+from .domain_index import (
+    CHECKED_DOMAINS,
+    KNOWN_DOMAINS,
+    DomainIndex,
+    get_domain_index,
+    save_domain_indexes,
+)
+from .http import get_http_client, http_clients
 from .llm_cache import LLMCache, cache, get_cache
-from .orchestrator import broadcaster, register_job, scheduler
-from .utils import circuit_breaker, get_logger, rate_limiter, retry, token_bucket
+from .metrics import metrics
+from .orchestrator import (
+    broadcaster,
+    jobs,
+    progress,
+    register_job,
+    scheduler,
+    shutdown,
+    startup,
+)
+from .utils import (
+    RateLimiter,
+    circuit_breaker,
+    get_logger,
+    get_rate_limiter,
+    rate_limiter,
+    retry,
+    token_bucket,
+)
+from .writer import BatchWriter
 
 __all__ = [
-    "Settings",
-    "get_settings",
-    "get_db",
+    "CHECKED_DOMAINS",
+    "KNOWN_DOMAINS",
+    "BatchWriter",
+    "DomainIndex",
+    "KpiAggregates",
     "LLMCache",
-    "get_cache",
+    "MicroBatcher",
+    "RateLimiter",
+    "Settings",
+    "broadcaster",
     "cache",
+    "circuit_breaker",
+    "close_pools",
+    "get_cache",
+    "get_checkpoint",
+    "get_db",
+    "get_domain_index",
+    "get_http_client",
+    "get_kpi_aggregates",
+    "get_logger",
+    "get_rate_limiter",
+    "get_settings",
+    "http_clients",
+    "jobs",
+    "metrics",
+    "pool_stats",
+    "progress",
     "rate_limiter",
-    "token_bucket",
+    "rebuild_kpi_aggregates",
+    "register_job",
+    "reset_checkpoint",
     "retry",
-    "get_logger",
-    "circuit_breaker",
+    "save_domain_indexes",
     "scheduler",
-    "broadcaster",
-    "register_job",
+    "set_checkpoint",
+    "shutdown",
+    "startup",
+    "token_bucket",
 ]
@@ -0,0 +1,126 @@
+"""Materialized KPI aggregates served from memory.
+
+``kpi_status`` and ``kpi_service`` are kept current by triggers on
+``domains`` and ``valuations`` (see :data:`models.KPI_TRIGGERS`), so every
+stage writer updates them in its own transaction. Reading them is a scan of
+a handful of rows; :class:`KpiAggregates` additionally keeps the last read
+in memory for up to ``LUCAS_KPI_MAX_STALENESS`` seconds so dashboard polling
+does not touch the database at all. :meth:`KpiAggregates.rebuild`
+recomputes both tables from the base tables and reports any drift.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import math
+import time
+from typing import Any
+
+from .config import get_settings
+from .db import get_db
+from .utils import get_logger
+
+logger = get_logger(__name__)
+
+Snapshot = dict[str, dict[str, dict[str, float]]]
+
+
+class KpiAggregates:
+    """Cached view of the aggregate tables for one database."""
+
+    def __init__(self, max_staleness: float | None = None) -> None:
+        if max_staleness is None:
+            max_staleness = get_settings().kpi_max_staleness
+        self.max_staleness = max_staleness
+        self.loads = 0
+        self._snapshot: Snapshot | None = None
+        self._loaded_at = 0.0
+        self._lock = asyncio.Lock()
+
+    @property
+    def age(self) -> float:
+        """Seconds since the in-memory snapshot was read."""
+
+        return time.monotonic() - self._loaded_at if self._snapshot is not None else math.inf
+
+    async def snapshot(self) -> Snapshot:
+        """Return aggregates no older than :attr:`max_staleness` seconds."""
+
+        if self.age <= self.max_staleness:
+            return self._snapshot  # type: ignore[return-value]
+        async with self._lock:
+            # another caller may have refreshed while we waited
+            if self.age > self.max_staleness:
+                async with get_db(readonly=True) as db:
+                    self._snapshot = await _read(db)
+                self._loaded_at = time.monotonic()
+                self.loads += 1
+        return self._snapshot  # type: ignore[return-value]
+
+    def invalidate(self) -> None:
+        """Force the next :meth:`snapshot` to re-read the tables."""
+
+        self._snapshot = None
+
+    async def rebuild(self) -> dict[str, Any]:
+        """Recompute the aggregate tables and return the entries that drifted."""
+
+        # models imports SQLAlchemy, which importing core should not pay for
+        from .models import KPI_REBUILD_SQL
+
+        async with get_db() as db:
+            before = await _read(db)
+            for sql in KPI_REBUILD_SQL:
+                await db.execute(sql)
+            after = await _read(db)
+            await db.commit()
+        self.invalidate()
+        drift = _diff(before, after)
+        if drift:
+            logger.warning("KPI aggregates drifted and were rebuilt: %s", drift)
+        return drift
+
+
+async def _read(db: Any) -> Snapshot:
+    snapshot: Snapshot = {"status": {}, "service": {}}
+    async with db.execute("SELECT status, domains, value FROM kpi_status") as cursor:
+        for status, count, value in await cursor.fetchall():
+            if count:
+                snapshot["status"][status] = {"domains": count, "value": value}
+    async with db.execute("SELECT service, valuations, value FROM kpi_service") as cursor:
+        for service, count, value in await cursor.fetchall():
+            if count:
+                snapshot["service"][service] = {"valuations": count, "value": value}
+    return snapshot
+
+
+def _diff(before: Snapshot, after: Snapshot) -> dict[str, Any]:
+    drift: dict[str, Any] = {}
+    for group in after:
+        for key in before[group].keys() | after[group].keys():
+            old, new = before[group].get(key, {}), after[group].get(key, {})
+            if any(
+                not math.isclose(old.get(field, 0), new.get(field, 0), abs_tol=1e-6)
+                for field in old.keys() | new.keys()
+            ):
+                drift[f"{group}:{key}"] = {"was": old, "now": new}
+    return drift
+
+
+_aggregates: dict[str, KpiAggregates] = {}
+
+
+def get_kpi_aggregates() -> KpiAggregates:
+    """Return the aggregates cache for the configured database."""
+
+    url = get_settings().database_url
+    aggregates = _aggregates.get(url)
+    if aggregates is None:
+        aggregates = _aggregates[url] = KpiAggregates()
+    return aggregates
+
+
+async def rebuild_kpi_aggregates() -> dict[str, Any]:
+    """Consistency check: rebuild the configured database's aggregates."""
+
+    return await get_kpi_aggregates().rebuild()
@@ -0,0 +1,95 @@
+"""Coalesce concurrent single-item calls into batched requests."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable, Hashable, Mapping
+from typing import Generic, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+BatchHandler = Callable[[list[K]], Awaitable[Mapping[K, "V | BaseException"]]]
+
+
+class MicroBatcher(Generic[K, V]):
+    """Collect keys submitted within ``max_linger`` seconds into one call.
+
+    ``handler`` receives up to ``max_batch_size`` distinct keys and returns a
+    mapping of key to result. A mapped exception fails only the callers that
+    asked for that key; a key missing from the mapping raises ``KeyError`` for
+    its callers; an exception raised by ``handler`` itself fails the batch,
+    and cancelling the dispatch cancels every caller waiting on it.
+    """
+
+    def __init__(
+        self,
+        handler: BatchHandler[K, V],
+        *,
+        max_batch_size: int = 50,
+        max_linger: float = 0.05,
+    ) -> None:
+        self.handler = handler
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_linger = max_linger
+        self.batches = 0
+        self._pending: dict[K, list[asyncio.Future[V]]] = {}
+        self._timer: asyncio.TimerHandle | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._tasks: set[asyncio.Future[None]] = set()
+
+    async def submit(self, key: K) -> V:
+        """Queue ``key`` for the next batch and wait for its result."""
+
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            # state left behind by a closed loop can never flush
+            self._loop, self._timer, self._pending = loop, None, {}
+        future: asyncio.Future[V] = loop.create_future()
+        self._pending.setdefault(key, []).append(future)
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_linger, self._flush)
+        return await future
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._pending:
+            return
+        batch, self._pending = self._pending, {}
+        self.batches += 1
+        task = asyncio.ensure_future(self._dispatch(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _dispatch(self, batch: dict[K, list[asyncio.Future[V]]]) -> None:
+        try:
+            results = await self.handler(list(batch))
+        except BaseException as exc:
+            cancelled = isinstance(exc, asyncio.CancelledError)
+            for futures in batch.values():
+                for future in futures:
+                    if future.done():
+                        continue
+                    if cancelled:
+                        future.cancel()
+                    else:
+                        future.set_exception(exc)
+            if isinstance(exc, Exception):
+                return
+            raise
+        for key, futures in batch.items():
+            if key in results:
+                result = results[key]
+            else:
+                result = KeyError(key)
+            for future in futures:
+                if future.done():
+                    continue
+                if isinstance(result, BaseException):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
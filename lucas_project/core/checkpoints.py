@@ -0,0 +1,39 @@
+"""Per-stage watermarks for incremental processing.
+
+Checkpoints are written on the caller's connection so they advance in the
+same transaction as the stage's own writes: a run that fails before commit
+leaves its watermark untouched and the rows are picked up again next time.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime, UTC
+
+import aiosqlite
+
+
+async def get_checkpoint(db: aiosqlite.Connection, stage: str) -> int:
+    """Return the watermark recorded for ``stage`` (``0`` if none)."""
+
+    async with db.execute(
+        "SELECT watermark FROM stage_checkpoints WHERE stage = ?", (stage,)
+    ) as cursor:
+        row = await cursor.fetchone()
+    return row[0] if row else 0
+
+
+async def set_checkpoint(db: aiosqlite.Connection, stage: str, watermark: int) -> None:
+    """Record ``watermark`` for ``stage``; takes effect on commit."""
+
+    await db.execute(
+        "INSERT INTO stage_checkpoints (stage, watermark, updated_at) VALUES (?, ?, ?) "
+        "ON CONFLICT(stage) DO UPDATE SET watermark = excluded.watermark, "
+        "updated_at = excluded.updated_at",
+        (stage, watermark, datetime.now(UTC)),
+    )
+
+
+async def reset_checkpoint(db: aiosqlite.Connection, stage: str) -> None:
+    """Forget the watermark for ``stage`` so its next run is a full rebuild."""
+
+    await db.execute("DELETE FROM stage_checkpoints WHERE stage = ?", (stage,))
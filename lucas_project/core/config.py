@@ -2,21 +2,79 @@
 
 from functools import lru_cache
 from pathlib import Path
+from typing import Literal
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
+SlowConsumerPolicy = Literal["drop_oldest", "coalesce", "disconnect"]
+ProfileMode = Literal["cpu", "memory", "both"]
+ExportFormat = Literal["csv", "csv.gz", "parquet"]
+
 
 class Settings(BaseSettings):
     """Configuration values for the application."""
 
     debug: bool = False
     database_url: str = "./lucas.db"
-    llm_cache_path: Path = Path("./lucas_project/data/llm_cache.json")
+    db_pool_readers: int = 4
+    db_synchronous: str = "NORMAL"
+    db_cache_size: int = -65536
+    db_mmap_size: int = 268_435_456
+    db_busy_timeout: int = 5000
+    db_write_chunk_size: int = 1000
+    kpi_max_staleness: float = 5.0
+    kpi_rebuild_interval: float = 86_400.0
+    query_audit_min_rows: int = 1000
+    domain_index_capacity: int = 1_000_000
+    domain_index_error_rate: float = 0.01
+    llm_cache_path: Path = Path("./lucas_project/data/llm_cache.jsonl")
+    llm_cache_ttl: float | None = None
+    llm_cache_max_entries: int = 100_000
+    llm_cache_fsync: bool = False
     scheduler_timezone: str = "UTC"
+    http2: bool = False
+    http_max_connections: int = 20
+    http_max_keepalive: int = 10
+    http_keepalive_expiry: float = 30.0
+    http_timeouts: dict[str, float] = {}
+    availability_concurrency: int = 20
+    availability_batch_size: int = 500
+    generator_tlds: list[str] = ["com"]
+    generator_prefixes: list[str] = []
+    generator_suffixes: list[str] = []
+    generator_hyphenate: bool = False
+    generator_inflect: bool = False
+    generator_abbreviate: bool = False
+    semantic_dedup: bool = False
+    semantic_dedup_threshold: float = 0.85
+    embedding_model: str = "sentence-transformers/all-MiniLM-L6-v2"
+    embedding_batch_size: int = 256
+    embedding_ann_threshold: int = 100_000
+    embedding_store_path: Path = Path("./lucas_project/data/embeddings")
+    ws_queue_size: int = 100
+    ws_slow_consumer_policy: SlowConsumerPolicy = "drop_oldest"
+    ws_send_timeout: float = 5.0
+    job_misfire_grace_time: int = 300
+    job_jitter: int = 0
+    events_tick: float = 1.0
+    metrics_enabled: bool = False
+    profile_jobs: str = ""
+    profile_mode: ProfileMode = "cpu"
+    profile_every: int = 1
+    profile_dir: Path = Path("./lucas_project/data/profiles")
+    profile_retention: int = 20
+    profile_top: int = 25
+    export_format: ExportFormat = "csv"
+    export_chunk_size: int = 5000
+    export_dir: Path = Path("./lucas_project/data")
+    stream_queue_size: int = 1000
+    stream_discovery_interval: float = 300.0
     github_token: str | None = None
     whois_api_key: str | None = None
     estibot_api_key: str | None = None
     humbleworth_api_key: str | None = None
+    humbleworth_batch_size: int = 50
+    humbleworth_batch_linger: float = 0.05
 
     model_config = SettingsConfigDict(env_prefix="LUCAS_")
 
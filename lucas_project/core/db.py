@@ -1,36 +1,250 @@
-"""Async database helpers using :mod:`aiosqlite`."""
+"""Async database helpers using :mod:`aiosqlite`.
+
+Connections are kept in a process-wide pool per database file: a single
+writer connection serialises transactions while a small set of read-only
+connections serve concurrent readers under WAL journaling. Callers keep
+using :func:`get_db` and never pay connection setup on the hot path.
+"""
 
 from __future__ import annotations
 
-from contextlib import asynccontextmanager
+import asyncio
 import sqlite3
-
-from sqlalchemy import create_engine
-from sqlalchemy.engine import Engine
+import time
+from collections.abc import AsyncIterator, Callable
+from contextlib import asynccontextmanager
+from dataclasses import asdict, dataclass
+from typing import TYPE_CHECKING, Any
 
 import aiosqlite
 
 from .config import get_settings
+from .metrics import DB_CHECKOUT
 
+if TYPE_CHECKING:
+    from sqlalchemy.engine import Engine
 
-@asynccontextmanager
-async def get_db() -> aiosqlite.Connection:
-    """Yield an aiosqlite connection configured with row factory."""
+
+@dataclass
+class PoolStats:
+    """Counters describing pool usage."""
+
+    opened: int = 0
+    checkouts: int = 0
+    waits: int = 0
+    wait_time: float = 0.0
+    max_wait: float = 0.0
+
+
+class ConnectionPool:
+    """Long-lived reader/writer connections for a single SQLite file."""
+
+    def __init__(
+        self,
+        path: str,
+        *,
+        readers: int = 4,
+        synchronous: str = "NORMAL",
+        cache_size: int = -65536,
+        mmap_size: int = 268_435_456,
+        busy_timeout: int = 5000,
+    ) -> None:
+        self.path = path
+        self.max_readers = max(0, readers) if path != ":memory:" else 0
+        self.pragmas = {
+            "synchronous": synchronous,
+            "cache_size": cache_size,
+            "mmap_size": mmap_size,
+            "busy_timeout": busy_timeout,
+        }
+        self.stats = PoolStats()
+        self.trace: Callable[[str], None] | None = None
+        self._writer: aiosqlite.Connection | None = None
+        self._readers: list[aiosqlite.Connection] = []
+        self._idle: list[aiosqlite.Connection] = []
+        self._holder: asyncio.Task[Any] | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._write_lock: asyncio.Lock
+        self._reader_slots: asyncio.Semaphore
+        self._open_lock: asyncio.Lock
+
+    def _bind_loop(self) -> None:
+        """(Re)create asyncio primitives for the running event loop."""
+
+        loop = asyncio.get_running_loop()
+        if loop is self._loop:
+            return
+        self._loop = loop
+        self._write_lock = asyncio.Lock()
+        self._open_lock = asyncio.Lock()
+        self._reader_slots = asyncio.Semaphore(max(1, self.max_readers))
+        self._idle = list(self._readers)
+
+    async def _connect(self, readonly: bool) -> aiosqlite.Connection:
+        conn = aiosqlite.connect(
+            self.path,
+            detect_types=sqlite3.PARSE_DECLTYPES | sqlite3.PARSE_COLNAMES,
+        )
+        # pooled connections outlive any single job; never block interpreter exit
+        getattr(conn, "_thread", conn).daemon = True
+        await conn
+        conn.row_factory = aiosqlite.Row
+        if not readonly:
+            await conn.execute("PRAGMA journal_mode=WAL")
+        for name, value in self.pragmas.items():
+            await conn.execute(f"PRAGMA {name}={value}")
+        if readonly:
+            await conn.execute("PRAGMA query_only=ON")
+        if self.trace is not None:
+            await conn.set_trace_callback(self.trace)
+        self.stats.opened += 1
+        return conn
+
+    async def set_trace(self, callback: Callable[[str], None] | None) -> None:
+        """Pass every statement run on pooled connections to ``callback``.
+
+        The callback is invoked from the connection threads. ``None`` stops
+        tracing.
+        """
+
+        self.trace = callback
+        for conn in [*self._readers, *([self._writer] if self._writer else [])]:
+            await conn.set_trace_callback(callback)
+
+    async def _writer_conn(self) -> aiosqlite.Connection:
+        if self._writer is None:
+            self._writer = await self._connect(readonly=False)
+        return self._writer
+
+    @asynccontextmanager
+    async def connection(self, readonly: bool = False) -> AsyncIterator[aiosqlite.Connection]:
+        """Check out a connection for the duration of the block.
+
+        A read-only checkout nested inside the same task's writer checkout
+        shares the writer when there are no reader connections; a nested
+        writer checkout raises instead of deadlocking. Tasks spawned inside
+        the block do not count as the holder and wait for the writer.
+        """
+
+        self._bind_loop()
+        task = asyncio.current_task()
+        nested = self._holder is not None and self._holder is task
+        if readonly and self.max_readers:
+            gate: Any = self._reader_slots
+        elif nested:
+            # the write lock is not reentrant; waiting on it here would hang
+            if not readonly:
+                raise RuntimeError(
+                    "writer connection is already checked out by this task"
+                )
+            assert self._writer is not None
+            yield self._writer
+            return
+        else:
+            gate = self._write_lock
+            readonly = False
+        started = time.perf_counter()
+        waited = gate.locked()
+        async with gate:
+            wait = time.perf_counter() - started
+            self.stats.checkouts += 1
+            self.stats.wait_time += wait
+            self.stats.max_wait = max(self.stats.max_wait, wait)
+            if waited:
+                self.stats.waits += 1
+            DB_CHECKOUT.observe(wait, "read" if readonly else "write")
+            async with self._open_lock:
+                if readonly:
+                    if self._idle:
+                        conn = self._idle.pop()
+                    else:
+                        if self._writer is None:
+                            # the writer switches the file to WAL; readers
+                            # must never see it in rollback-journal mode
+                            await self._writer_conn()
+                        conn = await self._connect(readonly=True)
+                        self._readers.append(conn)
+                else:
+                    conn = await self._writer_conn()
+            if not readonly:
+                self._holder = task
+            try:
+                yield conn
+            finally:
+                if not readonly:
+                    self._holder = None
+                if conn.in_transaction:
+                    # uncommitted work must not leak to the next borrower
+                    await conn.rollback()
+                if readonly:
+                    self._idle.append(conn)
+
+    async def close(self) -> None:
+        """Close every pooled connection."""
+
+        for conn in [*self._readers, *([self._writer] if self._writer else [])]:
+            await conn.close()
+        self._readers.clear()
+        self._idle.clear()
+        self._writer = None
+
+
+_pools: dict[str, ConnectionPool] = {}
+
+
+def get_pool() -> ConnectionPool:
+    """Return the pool for the configured database, creating it on demand."""
 
     settings = get_settings()
-    db = await aiosqlite.connect(
-        settings.database_url,
-        detect_types=sqlite3.PARSE_DECLTYPES | sqlite3.PARSE_COLNAMES,
-    )
-    db.row_factory = aiosqlite.Row
-    try:
+    pool = _pools.get(settings.database_url)
+    if pool is None:
+        pool = ConnectionPool(
+            settings.database_url,
+            readers=settings.db_pool_readers,
+            synchronous=settings.db_synchronous,
+            cache_size=settings.db_cache_size,
+            mmap_size=settings.db_mmap_size,
+            busy_timeout=settings.db_busy_timeout,
+        )
+        _pools[settings.database_url] = pool
+    return pool
+
+
+@asynccontextmanager
+async def get_db(readonly: bool = False) -> AsyncIterator[aiosqlite.Connection]:
+    """Yield a pooled aiosqlite connection configured with row factory.
+
+    ``readonly`` connections may be used concurrently; the default writer
+    connection is handed to one caller at a time.
+    """
+
+    async with get_pool().connection(readonly) as db:
         yield db
-    finally:
-        await db.close()
+
+
+def pool_stats() -> dict[str, Any]:
+    """Return usage statistics for the configured database pool."""
+
+    pool = get_pool()
+    return {
+        **asdict(pool.stats),
+        "readers": len(pool._readers),
+        "idle_readers": len(pool._idle),
+    }
+
+
+async def close_pools() -> None:
+    """Close all pooled connections, e.g. on application shutdown."""
+
+    for pool in list(_pools.values()):
+        await pool.close()
+    _pools.clear()
 
 
 def get_engine() -> Engine:
     """Return a synchronous SQLAlchemy engine for migrations."""
 
+    from sqlalchemy import create_engine
+
     settings = get_settings()
     return create_engine(f"sqlite:///{settings.database_url}")
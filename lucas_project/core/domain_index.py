@@ -0,0 +1,280 @@
+"""Probabilistic membership index of known domains.
+
+A Bloom filter answers "definitely new" for most fresh candidates without a
+database round-trip; "maybe known" answers are confirmed with one batched,
+index-backed ``IN`` query so a false positive never drops a real candidate.
+Filters are snapshotted next to the database file and caught up from the
+last loaded row id on startup.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import math
+import struct
+from collections.abc import Iterable
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+import aiosqlite
+
+from .config import get_settings
+from .db import get_db
+from .utils import get_logger
+
+logger = get_logger(__name__)
+
+_MAGIC = b"LBF1"
+_IN_CHUNK = 500
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings using double hashing."""
+
+    def __init__(self, capacity: int, error_rate: float) -> None:
+        self.capacity = max(1, capacity)
+        self.error_rate = error_rate
+        self.num_bits = max(
+            8, math.ceil(-self.capacity * math.log(error_rate) / math.log(2) ** 2)
+        )
+        self.num_hashes = max(1, round(self.num_bits / self.capacity * math.log(2)))
+        self.bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item: str) -> Iterable[int]:
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        first, second = struct.unpack("<QQ", digest)
+        second |= 1
+        return ((first + i * second) % self.num_bits for i in range(self.num_hashes))
+
+    def add(self, item: str) -> None:
+        positions = list(self._positions(item))
+        if all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in positions):
+            # already present (or a false positive); keep count ~ distinct items
+            return
+        for pos in positions:
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def __contains__(self, item: str) -> bool:
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
+
+    @property
+    def nbytes(self) -> int:
+        return len(self.bits)
+
+    def estimated_fpr(self) -> float:
+        """Expected false-positive rate at the current fill level."""
+
+        return (1 - math.exp(-self.num_hashes * self.count / self.num_bits)) ** self.num_hashes
+
+
+@dataclass(frozen=True)
+class IndexSource:
+    """SQL describing which domains an index tracks."""
+
+    name: str
+    # ``(id, domain)`` rows with ``id > ?`` in ascending id order
+    since_sql: str
+    # ``domain`` rows matching a ``{placeholders}`` list
+    exact_sql: str
+    # highest id currently in the source table
+    max_id_sql: str
+
+
+KNOWN_DOMAINS = IndexSource(
+    "domains",
+    "SELECT id, domain FROM domains WHERE id > ? ORDER BY id",
+    "SELECT domain FROM domains WHERE domain IN ({placeholders})",
+    "SELECT MAX(id) FROM domains",
+)
+CHECKED_DOMAINS = IndexSource(
+    "checked",
+    "SELECT c.id, d.domain FROM availability_checks c "
+    "JOIN domains d ON d.id = c.domain_id WHERE c.id > ? ORDER BY c.id",
+    "SELECT d.domain FROM domains d WHERE d.domain IN ({placeholders}) "
+    "AND EXISTS (SELECT 1 FROM availability_checks c WHERE c.domain_id = d.id)",
+    "SELECT MAX(id) FROM availability_checks",
+)
+
+
+class DomainIndex:
+    """Bloom filter with exact database fallback for one :class:`IndexSource`."""
+
+    def __init__(
+        self,
+        source: IndexSource,
+        *,
+        capacity: int,
+        error_rate: float,
+        snapshot_path: Path | None = None,
+    ) -> None:
+        self.source = source
+        self.error_rate = error_rate
+        self.snapshot_path = snapshot_path
+        self.bloom = BloomFilter(capacity, error_rate)
+        self.max_id = 0
+        self.positives = 0
+        self.false_positives = 0
+
+    async def load(self, db: aiosqlite.Connection) -> None:
+        """Restore the snapshot if valid, then index rows added since."""
+
+        restored = self._restore()
+        if restored:
+            async with db.execute(self.source.max_id_sql) as cursor:
+                current = (await cursor.fetchone())[0] or 0
+            # a snapshot ahead of the table belongs to a different database
+            restored = current >= self.max_id
+        if not restored:
+            self.bloom = BloomFilter(self.bloom.capacity, self.error_rate)
+            self.max_id = 0
+        await self.catch_up(db)
+        if self.over_capacity:
+            await self._rebuild(db)
+
+    @property
+    def over_capacity(self) -> bool:
+        # past capacity the false-positive rate climbs quickly
+        return self.bloom.count > self.bloom.capacity
+
+    async def _rebuild(self, db: aiosqlite.Connection) -> None:
+        self.bloom = BloomFilter(self.bloom.count * 2, self.error_rate)
+        self.max_id = 0
+        await self.catch_up(db)
+
+    async def grow(self) -> None:
+        """Rebuild the filter at twice its size once it is over capacity.
+
+        Call after the rows passed to :meth:`add_many` are committed; the
+        rebuild reads them back from the database.
+        """
+
+        if not self.over_capacity:
+            return
+        async with get_db(readonly=True) as db:
+            await self._rebuild(db)
+        logger.info("Rebuilt %s index: %s", self.source.name, self.stats())
+
+    async def catch_up(self, db: aiosqlite.Connection) -> None:
+        """Add rows with ids above the last one indexed."""
+
+        async with db.execute(self.source.since_sql, (self.max_id,)) as cursor:
+            while rows := await cursor.fetchmany(10_000):
+                for row_id, domain in rows:
+                    self.bloom.add(domain)
+                self.max_id = rows[-1][0]
+
+    def add_many(self, domains: Iterable[str]) -> None:
+        """Record freshly inserted domains."""
+
+        for domain in domains:
+            self.bloom.add(domain)
+
+    def might_contain(self, domain: str) -> bool:
+        return domain in self.bloom
+
+    async def filter_new(self, db: aiosqlite.Connection, domains: Iterable[str]) -> list[str]:
+        """Return the ``domains`` not yet tracked, preserving order."""
+
+        domains = list(dict.fromkeys(domains))
+        maybe = [domain for domain in domains if domain in self.bloom]
+        known: set[str] = set()
+        for start in range(0, len(maybe), _IN_CHUNK):
+            chunk = maybe[start : start + _IN_CHUNK]
+            sql = self.source.exact_sql.format(placeholders=",".join("?" * len(chunk)))
+            async with db.execute(sql, chunk) as cursor:
+                known.update(row[0] for row in await cursor.fetchall())
+        self.positives += len(maybe)
+        self.false_positives += len(maybe) - len(known)
+        return [domain for domain in domains if domain not in known]
+
+    def stats(self) -> dict[str, Any]:
+        """Return size, memory and false-positive figures."""
+
+        return {
+            "entries": self.bloom.count,
+            "capacity": self.bloom.capacity,
+            "memory_bytes": self.bloom.nbytes,
+            "estimated_fpr": self.bloom.estimated_fpr(),
+            "observed_fpr": (
+                self.false_positives / self.positives if self.positives else 0.0
+            ),
+        }
+
+    def save(self) -> None:
+        """Atomically write the filter to :attr:`snapshot_path`."""
+
+        if self.snapshot_path is None:
+            return
+        header = json.dumps(
+            {
+                "capacity": self.bloom.capacity,
+                "error_rate": self.error_rate,
+                "count": self.bloom.count,
+                "max_id": self.max_id,
+            }
+        ).encode("utf-8")
+        tmp_path = self.snapshot_path.with_suffix(self.snapshot_path.suffix + ".tmp")
+        with tmp_path.open("wb") as fh:
+            fh.write(_MAGIC + struct.pack("<I", len(header)) + header)
+            fh.write(self.bloom.bits)
+        tmp_path.replace(self.snapshot_path)
+
+    def _restore(self) -> bool:
+        path = self.snapshot_path
+        if path is None or not path.exists():
+            return False
+        try:
+            data = path.read_bytes()
+            if data[:4] != _MAGIC:
+                return False
+            (size,) = struct.unpack("<I", data[4:8])
+            header = json.loads(data[8 : 8 + size])
+            bloom = BloomFilter(header["capacity"], header["error_rate"])
+            bits = data[8 + size :]
+            if len(bits) != bloom.nbytes:
+                return False
+        except (OSError, ValueError, KeyError, struct.error):
+            logger.warning("Ignoring unreadable domain index snapshot %s", path)
+            return False
+        bloom.bits = bytearray(bits)
+        bloom.count = header["count"]
+        self.bloom = bloom
+        self.max_id = header["max_id"]
+        return True
+
+
+_indexes: dict[tuple[str, str], DomainIndex] = {}
+
+
+async def get_domain_index(source: IndexSource = KNOWN_DOMAINS) -> DomainIndex:
+    """Return the loaded index for ``source`` on the configured database."""
+
+    settings = get_settings()
+    key = (settings.database_url, source.name)
+    index = _indexes.get(key)
+    if index is None:
+        snapshot = None
+        if settings.database_url != ":memory:":
+            snapshot = Path(f"{settings.database_url}.{source.name}.bloom")
+        index = DomainIndex(
+            source,
+            capacity=settings.domain_index_capacity,
+            error_rate=settings.domain_index_error_rate,
+            snapshot_path=snapshot,
+        )
+        async with get_db(readonly=True) as db:
+            await index.load(db)
+        _indexes[key] = index
+        logger.info("Loaded %s index: %s", source.name, index.stats())
+    return index
+
+
+def save_domain_indexes() -> None:
+    """Snapshot every loaded index to disk."""
+
+    for index in _indexes.values():
+        index.save()
@@ -0,0 +1,308 @@
+"""Batched sentence embeddings with a persistent vector cache.
+
+Texts are encoded on CPU in large batches with :mod:`sentence_transformers`.
+The model and :mod:`numpy` are imported on first use only, so processes that
+never embed anything start as fast as before. Vectors are appended to a
+memory-mapped float32 file keyed by a hash of the text and are never
+recomputed. :meth:`EmbeddingEngine.collapse` groups near-duplicate texts by
+cosine similarity, switching from exact all-pairs comparison to a
+random-hyperplane LSH index once the corpus is large.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+from collections.abc import Callable, Sequence
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from .config import get_settings
+from .utils import get_logger
+
+if TYPE_CHECKING:  # pragma: no cover
+    import numpy as np
+
+logger = get_logger(__name__)
+
+Encoder = Callable[[list[str]], Any]
+
+# Earlier texts are compared in slices of this many rows to bound memory.
+_EARLIER_CHUNK = 4096
+
+
+def _text_key(text: str) -> str:
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+
+class VectorStore:
+    """Append-only ``float32`` matrix on disk with a text-hash index."""
+
+    def __init__(self, path: Path, dim: int) -> None:
+        import numpy as np
+
+        self.path = path
+        self.dim = dim
+        self.path.mkdir(parents=True, exist_ok=True)
+        (path / "meta.json").write_text(json.dumps({"dim": dim}), encoding="utf-8")
+        self._vectors_path = path / "vectors.f32"
+        self._keys_path = path / "keys.txt"
+        self._rows: dict[str, int] = {}
+        row_bytes = dim * np.dtype(np.float32).itemsize
+        stored = (
+            self._vectors_path.stat().st_size // row_bytes
+            if self._vectors_path.exists()
+            else 0
+        )
+        if self._keys_path.exists():
+            with self._keys_path.open("r", encoding="ascii") as fh:
+                for row, line in enumerate(fh):
+                    # keys are written after their vectors; ignore torn tails
+                    if row >= stored:
+                        break
+                    self._rows[line.strip()] = row
+        self._matrix: np.ndarray | None = None
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._rows
+
+    @property
+    def matrix(self) -> np.ndarray:
+        """Memory-mapped view of all stored vectors."""
+
+        import numpy as np
+
+        if self._matrix is None or len(self._matrix) != len(self._rows):
+            if not self._rows:
+                return np.empty((0, self.dim), dtype=np.float32)
+            self._matrix = np.memmap(
+                self._vectors_path, dtype=np.float32, mode="r", shape=(len(self._rows), self.dim)
+            )
+        return self._matrix
+
+    def get(self, keys: Sequence[str]) -> np.ndarray:
+        return self.matrix[[self._rows[key] for key in keys]]
+
+    def append(self, keys: Sequence[str], vectors: np.ndarray) -> None:
+        import numpy as np
+
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        with self._vectors_path.open("ab") as fh:
+            fh.write(vectors.tobytes())
+        with self._keys_path.open("a", encoding="ascii") as fh:
+            fh.writelines(f"{key}\n" for key in keys)
+        for key in keys:
+            self._rows[key] = len(self._rows)
+        self._matrix = None
+
+
+class EmbeddingEngine:
+    """Encode texts in batches, caching normalised vectors on disk."""
+
+    def __init__(
+        self,
+        *,
+        model_name: str | None = None,
+        store_path: Path | None = None,
+        batch_size: int | None = None,
+        ann_threshold: int | None = None,
+        encoder: Encoder | None = None,
+    ) -> None:
+        settings = get_settings()
+        self.model_name = model_name or settings.embedding_model
+        self.batch_size = batch_size or settings.embedding_batch_size
+        self.ann_threshold = ann_threshold or settings.embedding_ann_threshold
+        base = store_path or settings.embedding_store_path
+        self.store_path = Path(base) / self.model_name.replace("/", "__")
+        self._encoder = encoder
+        self._store: VectorStore | None = None
+        self.encoded = 0
+
+    def _encode(self, texts: list[str]) -> np.ndarray:
+        if self._encoder is None:
+            from sentence_transformers import SentenceTransformer
+
+            logger.info("Loading embedding model %s", self.model_name)
+            model = SentenceTransformer(self.model_name, device="cpu")
+            self._encoder = lambda batch: model.encode(
+                batch, batch_size=self.batch_size, convert_to_numpy=True
+            )
+        return self._encoder(texts)
+
+    def _open_store(self, dim: int | None = None) -> VectorStore | None:
+        if self._store is None:
+            meta = self.store_path / "meta.json"
+            if meta.exists():
+                dim = json.loads(meta.read_text(encoding="utf-8"))["dim"]
+            if dim is None:
+                return None
+            self._store = VectorStore(self.store_path, dim)
+        return self._store
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        """Return unit-length vectors for ``texts``, encoding only misses."""
+
+        import numpy as np
+
+        keys = [_text_key(text) for text in texts]
+        store = self._open_store()
+        missing = {
+            key: text
+            for key, text in zip(keys, texts)
+            if store is None or key not in store
+        }
+        items = list(missing.items())
+        for start in range(0, len(items), self.batch_size):
+            chunk = items[start : start + self.batch_size]
+            vectors = np.asarray(self._encode([text for _, text in chunk]), dtype=np.float32)
+            norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+            vectors /= np.where(norms == 0, 1, norms)
+            store = self._open_store(vectors.shape[1])
+            store.append([key for key, _ in chunk], vectors)
+            self.encoded += len(chunk)
+        if store is None:
+            return np.empty((0, 0), dtype=np.float32)
+        return np.asarray(store.get(keys))
+
+    def collapse(
+        self, texts: Sequence[str], threshold: float, earlier: Sequence[str] = ()
+    ) -> dict[str, str]:
+        """Map every text to the first earlier text at least ``threshold`` similar.
+
+        ``earlier`` texts precede all of ``texts`` and are only compared
+        against, so new texts cost ``O(len(texts) * len(earlier))`` instead
+        of collapsing the whole history again. Once ``texts`` and
+        ``earlier`` together reach ``ann_threshold``, only pairs sharing an
+        LSH bucket are compared.
+        """
+
+        import numpy as np
+
+        unique = list(dict.fromkeys(texts))
+        if not unique:
+            return {}
+        vectors = self.embed(unique)
+        leader = np.full(len(unique), -1, dtype=np.int64)
+        matches: dict[int, str] = {}
+        earlier = list(dict.fromkeys(earlier))
+        lsh = (
+            _LSH(vectors.shape[1])
+            if len(unique) + len(earlier) >= self.ann_threshold
+            else None
+        )
+        signatures = lsh.signatures(vectors) if lsh else None
+        for start in range(0, len(earlier), _EARLIER_CHUNK):
+            open_rows = np.flatnonzero(leader < 0)
+            if open_rows.size == 0:
+                break
+            chunk = earlier[start : start + _EARLIER_CHUNK]
+            chunk_vectors = self.embed(chunk)
+            if lsh is None:
+                similar = chunk_vectors @ vectors[open_rows].T >= threshold
+                hit = similar.any(axis=0)
+                found = zip(open_rows[hit], similar.argmax(axis=0)[hit])
+            else:
+                rows, offsets = _bucket_pairs(signatures[open_rows], lsh.signatures(chunk_vectors))
+                rows = open_rows[rows]
+                keep = np.einsum("ij,ij->i", vectors[rows], chunk_vectors[offsets]) >= threshold
+                # pairs are sorted by row, then offset: keep each row's first hit
+                rows, offsets = rows[keep], offsets[keep]
+                first = np.unique(rows, return_index=True)[1]
+                found = zip(rows[first], offsets[first])
+            for row, offset in found:
+                # matched rows are settled and never lead other texts
+                leader[row] = row
+                matches[int(row)] = chunk[offset]
+        candidates = lsh.candidates(signatures) if lsh else None
+        for i in range(len(unique)):
+            if leader[i] >= 0:
+                continue
+            leader[i] = i
+            pool = np.arange(i + 1, len(unique)) if candidates is None else candidates(i)
+            pool = pool[leader[pool] < 0]
+            if pool.size == 0:
+                continue
+            similar = pool[vectors[pool] @ vectors[i] >= threshold]
+            leader[similar] = i
+        return {
+            text: matches.get(i, unique[leader[i]]) for i, text in enumerate(unique)
+        }
+
+
+class _LSH:
+    """Random-hyperplane LSH over several independent hash tables.
+
+    Two unit vectors at cosine similarity ``s`` share a ``bits``-bit
+    signature with probability ``(1 - acos(s) / pi) ** bits``; ``tables``
+    independent signatures are OR-ed, which keeps recall above 97% at
+    ``s >= 0.85`` for the defaults while each table has 1024 buckets.
+    """
+
+    def __init__(self, dim: int, bits: int = 10, tables: int = 24) -> None:
+        import numpy as np
+
+        rng = np.random.default_rng(0)
+        self.planes = rng.standard_normal((tables, dim, bits)).astype(np.float32)
+        self.weights = 1 << np.arange(bits, dtype=np.int64)
+
+    def signatures(self, vectors: np.ndarray) -> np.ndarray:
+        """Return one integer signature per table for every row."""
+
+        return (((vectors @ self.planes) > 0) @ self.weights).T
+
+    def candidates(self, signatures: np.ndarray) -> Callable[[int], np.ndarray]:
+        """Return a lookup of the later rows sharing any bucket with row ``i``."""
+
+        import numpy as np
+
+        orders = [np.argsort(column, kind="stable") for column in signatures.T]
+        ordered = [column[order] for column, order in zip(signatures.T, orders)]
+
+        def candidates(i: int) -> np.ndarray:
+            buckets = []
+            for table, (order, keys) in enumerate(zip(orders, ordered)):
+                lo = np.searchsorted(keys, signatures[i, table], side="left")
+                hi = np.searchsorted(keys, signatures[i, table], side="right")
+                buckets.append(order[lo:hi])
+            pool = np.unique(np.concatenate(buckets))
+            return pool[pool > i]
+
+        return candidates
+
+
+def _bucket_pairs(queries: np.ndarray, keys: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Return ``(query, key)`` row pairs sharing a bucket in any table.
+
+    Pairs are unique and sorted by query row, then key row.
+    """
+
+    import numpy as np
+
+    found = []
+    for table in range(queries.shape[1]):
+        order = np.argsort(keys[:, table], kind="stable")
+        ordered = keys[order, table]
+        lo = np.searchsorted(ordered, queries[:, table], side="left")
+        counts = np.searchsorted(ordered, queries[:, table], side="right") - lo
+        query_rows = np.repeat(np.arange(len(queries)), counts)
+        # position of each pair inside its query's run of matching keys
+        within = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        key_rows = order[np.repeat(lo, counts) + within]
+        found.append(query_rows * len(keys) + key_rows)
+    pairs = np.unique(np.concatenate(found))
+    return pairs // len(keys), pairs % len(keys)
+
+
+_engine: EmbeddingEngine | None = None
+
+
+def get_embedding_engine() -> EmbeddingEngine:
+    """Return the shared engine; the model loads on the first encode."""
+
+    global _engine
+    if _engine is None:
+        _engine = EmbeddingEngine()
+    return _engine
@@ -0,0 +1,144 @@
+"""Structured progress events aggregated into periodic deltas.
+
+Stage jobs are wrapped with :meth:`ProgressHub.tracked` and report rows and
+status transitions as they work. Emitting only adds numbers to an in-memory table, so
+it is safe on hot paths. Every ``LUCAS_EVENTS_TICK`` seconds the hub sends
+one message per changed topic through the websocket broadcaster, so
+dashboards subscribed to a topic get coalesced deltas instead of polling.
+
+Topics in use:
+
+- ``stage.<name>``: ``rows``, ``runs``, ``failed`` and ``seconds`` spent,
+  plus the derived ``rows_per_sec``.
+- ``domains.status``: net change in the number of domains per status.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import defaultdict
+from collections.abc import Awaitable, Callable, Iterator, Mapping
+from contextlib import contextmanager
+from functools import wraps
+from typing import Any, ParamSpec, TypeVar
+
+from .config import get_settings
+from .utils import get_logger
+
+logger = get_logger(__name__)
+
+P = ParamSpec("P")
+R = TypeVar("R")
+Publisher = Callable[..., Awaitable[None]]
+
+STATUS_TOPIC = "domains.status"
+
+
+class ProgressHub:
+    """Accumulate numeric deltas per topic and publish them on a tick."""
+
+    def __init__(self, publish: Publisher, *, tick: float | None = None) -> None:
+        self.publish = publish
+        self.tick = tick or get_settings().events_tick
+        self.totals: dict[str, dict[str, float]] = defaultdict(dict)
+        self._deltas: dict[str, dict[str, float]] = defaultdict(dict)
+        self._task: asyncio.Task[None] | None = None
+
+    def emit(self, topic: str, values: Mapping[str, float] | None = None, **kwargs: float) -> None:
+        """Add ``values`` to the pending delta for ``topic``."""
+
+        delta = self._deltas[topic]
+        totals = self.totals[topic]
+        for name, value in {**(values or {}), **kwargs}.items():
+            delta[name] = delta.get(name, 0) + value
+            totals[name] = totals.get(name, 0) + value
+
+    def transition(self, old: str | None, new: str, count: int = 1) -> None:
+        """Record ``count`` domains moving from status ``old`` to ``new``.
+
+        ``old`` is ``None`` for newly created domains.
+        """
+
+        if count:
+            self.emit(STATUS_TOPIC, {new: count, **({old: -count} if old else {})})
+
+    def rows(self, stage: str, count: int = 1) -> None:
+        """Record ``count`` more rows handled by ``stage``."""
+
+        if count:
+            self.emit(f"stage.{stage}", rows=count)
+
+    @contextmanager
+    def track(self, stage: str) -> Iterator[None]:
+        """Report one run of ``stage``: its duration and whether it failed."""
+
+        started = time.perf_counter()
+        failed = 0
+        try:
+            yield
+        except BaseException:
+            failed = 1
+            raise
+        finally:
+            self.emit(
+                f"stage.{stage}", runs=1, failed=failed, seconds=time.perf_counter() - started
+            )
+
+    def tracked(self, stage: str) -> Callable[[Callable[P, Awaitable[R]]], Callable[P, Awaitable[R]]]:
+        """Decorate a stage job so every call is reported via :meth:`track`."""
+
+        def decorator(func: Callable[P, Awaitable[R]]) -> Callable[P, Awaitable[R]]:
+            @wraps(func)
+            async def wrapper(*args: P.args, **kwargs: P.kwargs) -> R:
+                with self.track(stage):
+                    return await func(*args, **kwargs)
+
+            return wrapper
+
+        return decorator
+
+    def pending(self) -> list[dict[str, Any]]:
+        """Take the deltas accumulated since the last call as messages."""
+
+        deltas, self._deltas = self._deltas, defaultdict(dict)
+        messages = []
+        for topic, delta in deltas.items():
+            delta = {name: value for name, value in delta.items() if value}
+            if not delta:
+                continue
+            if delta.get("seconds") and "rows" in delta:
+                delta["rows_per_sec"] = delta["rows"] / delta["seconds"]
+            messages.append({"topic": topic, "delta": delta, "totals": dict(self.totals[topic])})
+        return messages
+
+    async def flush(self) -> int:
+        """Publish pending deltas now; return the number of messages."""
+
+        messages = self.pending()
+        for message in messages:
+            await self.publish(message, key=message["topic"], topic=message["topic"])
+        return len(messages)
+
+    def start(self) -> None:
+        """Start publishing on every tick."""
+
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the tick task and publish what is left."""
+
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await self.flush()
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.tick)
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception("Publishing progress events failed")
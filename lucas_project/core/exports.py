@@ -0,0 +1,136 @@
+"""Stream query results into export files with flat memory use.
+
+:func:`stream_rows` yields rows from a cursor in ``LUCAS_EXPORT_CHUNK_SIZE``
+chunks and :class:`ExportWriter` appends each chunk to a CSV, gzipped CSV
+or Parquet file as it arrives. Output goes to a temporary file next to the
+target that is renamed over it only once the export completes, so readers
+never see a partial file and a failed export leaves the previous one in
+place.
+"""
+
+from __future__ import annotations
+
+import csv
+import gzip
+import importlib.util
+import os
+from collections.abc import AsyncIterator, Iterable, Sequence
+from pathlib import Path
+from types import TracebackType
+from typing import IO, Any, Self
+
+import aiosqlite
+
+from .config import ExportFormat, get_settings
+from .utils import get_logger
+
+logger = get_logger(__name__)
+
+SUFFIXES: dict[str, str] = {"csv": ".csv", "csv.gz": ".csv.gz", "parquet": ".parquet"}
+
+
+async def stream_rows(
+    db: aiosqlite.Connection,
+    sql: str,
+    params: Sequence[Any] = (),
+    chunk_size: int | None = None,
+) -> AsyncIterator[list[aiosqlite.Row]]:
+    """Yield the rows of ``sql`` in chunks of at most ``chunk_size``."""
+
+    chunk_size = chunk_size or get_settings().export_chunk_size
+    async with db.execute(sql, params) as cursor:
+        while chunk := await cursor.fetchmany(chunk_size):
+            yield chunk
+
+
+class ExportWriter:
+    """Write rows incrementally to ``<stem><suffix>`` and publish atomically.
+
+    ``format`` is ``csv``, ``csv.gz`` or ``parquet`` (default
+    ``LUCAS_EXPORT_FORMAT``); Parquet needs :mod:`pyarrow` and falls back to
+    CSV without it. ``columns`` name the CSV header (written when ``header``
+    is set) and the Parquet schema. With ``keep_empty=False`` an export
+    without rows leaves no file behind.
+    """
+
+    def __init__(
+        self,
+        stem: Path,
+        columns: Sequence[str],
+        *,
+        format: ExportFormat | None = None,
+        header: bool = True,
+        keep_empty: bool = True,
+    ) -> None:
+        format = format or get_settings().export_format
+        if format == "parquet" and importlib.util.find_spec("pyarrow") is None:
+            logger.warning("Parquet export requested but pyarrow is not installed; writing CSV")
+            format = "csv"
+        self.format = format
+        self.columns = tuple(columns)
+        self.header = header
+        self.keep_empty = keep_empty
+        self.path = Path(stem).with_name(Path(stem).name + SUFFIXES[format])
+        self.tmp_path = self.path.with_name(f".{self.path.name}.tmp")
+        self.rows = 0
+        self._fh: IO[str] | None = None
+        self._csv: Any = None
+        self._parquet: Any = None
+
+    def __enter__(self) -> Self:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if self.format != "parquet":
+            if self.format == "csv.gz":
+                self._fh = gzip.open(self.tmp_path, "wt", newline="", encoding="utf-8")
+            else:
+                self._fh = self.tmp_path.open("w", newline="", encoding="utf-8")
+            self._csv = csv.writer(self._fh, lineterminator="\n")
+            if self.header:
+                self._csv.writerow(self.columns)
+        return self
+
+    def write(self, rows: Iterable[Sequence[Any]]) -> int:
+        """Append ``rows`` and return how many were written."""
+
+        rows = [tuple(row) for row in rows]
+        if not rows:
+            return 0
+        if self.format == "parquet":
+            self._write_parquet(rows)
+        else:
+            self._csv.writerows(rows)
+        self.rows += len(rows)
+        return len(rows)
+
+    def _write_parquet(self, rows: list[tuple[Any, ...]]) -> None:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        table = pa.table({name: list(values) for name, values in zip(self.columns, zip(*rows))})
+        if self._parquet is None:
+            self._parquet = pq.ParquetWriter(self.tmp_path, table.schema)
+        self._parquet.write_table(table.cast(self._parquet.schema))
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        if self._fh is not None:
+            self._fh.close()
+        if self._parquet is not None:
+            self._parquet.close()
+        elif self.format == "parquet" and exc_type is None and self.keep_empty:
+            self._write_empty_parquet()
+        if exc_type is not None or (not self.rows and not self.keep_empty):
+            self.tmp_path.unlink(missing_ok=True)
+            return
+        os.replace(self.tmp_path, self.path)
+        logger.info("Exported %d rows to %s", self.rows, self.path)
+
+    def _write_empty_parquet(self) -> None:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        pq.write_table(pa.table({name: pa.array([], pa.null()) for name in self.columns}), self.tmp_path)
@@ -0,0 +1,136 @@
+"""Shared keep-alive HTTP clients for outbound provider calls."""
+
+from __future__ import annotations
+
+import importlib.util
+from dataclasses import dataclass, replace
+from typing import TYPE_CHECKING, Any
+
+from .config import get_settings
+from .utils import get_logger
+
+if TYPE_CHECKING:
+    import httpx
+
+logger = get_logger(__name__)
+
+
+@dataclass(frozen=True)
+class ProviderConfig:
+    """Connection settings for a single upstream provider."""
+
+    base_url: str = ""
+    timeout: float = 10.0
+    max_connections: int | None = None
+    max_keepalive: int | None = None
+    keepalive_expiry: float | None = None
+    http2: bool | None = None
+
+
+PROVIDERS: dict[str, ProviderConfig] = {
+    "github": ProviderConfig(base_url="https://api.github.com"),
+    "humbleworth": ProviderConfig(
+        base_url="https://valuation.humbleworth.com", timeout=15.0
+    ),
+    "whois": ProviderConfig(timeout=5.0),
+    "estibot": ProviderConfig(timeout=10.0),
+    "godaddy": ProviderConfig(timeout=10.0),
+}
+
+
+class ClientRegistry:
+    """Lazily create and reuse one :class:`httpx.AsyncClient` per provider."""
+
+    def __init__(self, providers: dict[str, ProviderConfig] | None = None) -> None:
+        self.providers = dict(providers or PROVIDERS)
+        self._clients: dict[str, httpx.AsyncClient] = {}
+        self._transports: dict[str | None, httpx.AsyncBaseTransport] = {}
+        self._retired: list[httpx.AsyncClient] = []
+
+    def configure(self, name: str, **overrides: Any) -> None:
+        """Override settings for provider ``name``; applies to new clients."""
+
+        self.providers[name] = replace(
+            self.providers.get(name, ProviderConfig()), **overrides
+        )
+
+    def configured(self, name: str) -> bool:
+        """Return whether provider ``name`` has an endpoint to call."""
+
+        return bool(self.providers.get(name, ProviderConfig()).base_url)
+
+    def set_transport(
+        self, transport: httpx.AsyncBaseTransport | None, provider: str | None = None
+    ) -> None:
+        """Route requests through ``transport`` (e.g. :class:`httpx.MockTransport`).
+
+        Without ``provider`` the transport applies to every provider. Passing
+        ``None`` restores real network access. Existing clients are dropped so
+        the next :meth:`get` picks up the change.
+        """
+
+        if transport is None:
+            self._transports.pop(provider, None)
+        else:
+            self._transports[provider] = transport
+        names = list(self._clients) if provider is None else [provider]
+        for name in names:
+            client = self._clients.pop(name, None)
+            if client is not None:
+                self._retired.append(client)
+
+    def _build(self, name: str) -> httpx.AsyncClient:
+        import httpx
+
+        settings = get_settings()
+        config = self.providers.get(name, ProviderConfig())
+        timeout = settings.http_timeouts.get(name, config.timeout)
+        limits = httpx.Limits(
+            max_connections=config.max_connections or settings.http_max_connections,
+            max_keepalive_connections=config.max_keepalive
+            or settings.http_max_keepalive,
+            keepalive_expiry=config.keepalive_expiry or settings.http_keepalive_expiry,
+        )
+        http2 = settings.http2 if config.http2 is None else config.http2
+        if http2 and importlib.util.find_spec("h2") is None:
+            logger.warning("HTTP/2 requested for %s but h2 is not installed", name)
+            http2 = False
+        transport = self._transports.get(name) or self._transports.get(None)
+        return httpx.AsyncClient(
+            base_url=config.base_url,
+            timeout=timeout,
+            limits=limits,
+            http2=http2,
+            transport=transport,
+        )
+
+    def get(self, name: str) -> httpx.AsyncClient:
+        """Return the shared client for provider ``name``."""
+
+        client = self._clients.get(name)
+        if client is None or client.is_closed:
+            client = self._clients[name] = self._build(name)
+        return client
+
+    async def startup(self) -> None:
+        """Create clients for all known providers ahead of the first call."""
+
+        for name in self.providers:
+            self.get(name)
+
+    async def aclose(self) -> None:
+        """Close every client and its pooled connections."""
+
+        clients = [*self._clients.values(), *self._retired]
+        self._clients, self._retired = {}, []
+        for client in clients:
+            await client.aclose()
+
+
+http_clients = ClientRegistry()
+
+
+def get_http_client(name: str) -> httpx.AsyncClient:
+    """Return the shared HTTP client for provider ``name``."""
+
+    return http_clients.get(name)
@@ -0,0 +1,266 @@
+"""Scheduled job execution with single-flight runs and stage dependencies.
+
+Every registered job runs at most once at a time. A trigger that fires
+while the job is running queues a single follow-up run; further triggers
+with the same arguments join that queued run instead of stacking more.
+Jobs can list ``after`` dependencies and are then started as soon as an
+upstream job completes successfully, in addition to their own schedule. Each execution is
+recorded with its duration and the rows it reported via
+:meth:`ProgressHub.rows`, and jobs named in ``LUCAS_PROFILE_JOBS`` are
+profiled by :class:`~.profiling.JobProfiler`.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import deque
+from collections.abc import Awaitable, Callable, Hashable, Iterable
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, UTC
+from typing import Any
+
+from apscheduler.schedulers.base import BaseScheduler
+
+from .config import get_settings
+from .events import ProgressHub
+from .metrics import JOB_DURATION, JOB_FAILURES, JOB_ROWS, JOB_ROWS_PER_SECOND
+from .profiling import JobProfiler
+from .utils import get_logger
+
+logger = get_logger(__name__)
+
+JobFunc = Callable[..., Awaitable[Any]]
+
+
+@dataclass
+class JobRun:
+    """Outcome of one job execution."""
+
+    started_at: datetime
+    duration: float
+    rows: int
+    ok: bool
+    trigger: str
+
+
+@dataclass
+class Job:
+    """A registered job and its execution history."""
+
+    name: str
+    func: JobFunc
+    after: tuple[str, ...] = ()
+    trigger: str = "interval"
+    trigger_args: dict[str, Any] = field(default_factory=dict)
+    runs: int = 0
+    failures: int = 0
+    coalesced: int = 0
+    history: deque[JobRun] = field(default_factory=lambda: deque(maxlen=50))
+    _lock: asyncio.Lock | None = None
+    _loop: asyncio.AbstractEventLoop | None = None
+    _queued: dict[Hashable, asyncio.Future[JobRun]] = field(default_factory=dict)
+
+    @property
+    def running(self) -> bool:
+        return self._lock is not None and self._lock.locked()
+
+    def summary(self) -> dict[str, Any]:
+        last = self.history[-1] if self.history else None
+        return {
+            "name": self.name,
+            "after": list(self.after),
+            "running": self.running,
+            "runs": self.runs,
+            "failures": self.failures,
+            "coalesced": self.coalesced,
+            "last_run": asdict(last) if last else None,
+        }
+
+
+def _call_key(args: tuple[Any, ...], kwargs: dict[str, Any]) -> Hashable | None:
+    """Return a key identifying a call's arguments, or ``None`` if unhashable."""
+
+    key = (args, frozenset(kwargs.items()))
+    try:
+        hash(key)
+    except TypeError:
+        return None
+    return key
+
+
+class JobEngine:
+    """Register coroutine jobs with an APScheduler scheduler."""
+
+    def __init__(
+        self,
+        scheduler: BaseScheduler,
+        progress: ProgressHub,
+        profiler: JobProfiler | None = None,
+    ) -> None:
+        self.scheduler = scheduler
+        self.progress = progress
+        self.profiler = profiler or JobProfiler()
+        self.jobs: dict[str, Job] = {}
+        self._tasks: set[asyncio.Task[Any]] = set()
+
+    def register(
+        self,
+        func: JobFunc,
+        *,
+        name: str,
+        trigger: str = "interval",
+        after: str | Iterable[str] = (),
+        **trigger_args: Any,
+    ) -> Job:
+        """Register ``func`` as job ``name``.
+
+        ``trigger_args`` go to APScheduler (e.g. ``minutes=60`` or
+        ``jitter=30``). The job is handed to the scheduler by :meth:`schedule`,
+        or right away if the scheduler is already running, so registering at
+        import time has no side effects.
+        """
+
+        job = Job(
+            name,
+            func,
+            (after,) if isinstance(after, str) else tuple(after),
+            trigger,
+            trigger_args,
+        )
+        self.jobs[name] = job
+        if self.scheduler.running:
+            self._add(job)
+        return job
+
+    def schedule(self) -> None:
+        """Add every registered job to the scheduler.
+
+        Missed runs are coalesced into one and may start up to
+        ``LUCAS_JOB_MISFIRE_GRACE_TIME`` seconds late.
+        """
+
+        for job in self.jobs.values():
+            self._add(job)
+
+    def _add(self, job: Job) -> None:
+        settings = get_settings()
+        trigger_args = dict(job.trigger_args)
+        if settings.job_jitter and job.trigger in ("interval", "cron"):
+            trigger_args.setdefault("jitter", settings.job_jitter)
+        self.scheduler.add_job(
+            self.trigger,
+            job.trigger,
+            args=(job.name,),
+            id=job.name,
+            name=job.name,
+            replace_existing=True,
+            max_instances=1,
+            coalesce=True,
+            misfire_grace_time=settings.job_misfire_grace_time,
+            **trigger_args,
+        )
+
+    def downstream(self, name: str) -> list[str]:
+        """Return the jobs that run after ``name``."""
+
+        return [job.name for job in self.jobs.values() if name in job.after]
+
+    async def trigger(self, name: str, *, reason: str = "schedule") -> JobRun:
+        """Run ``name`` and then start its downstream jobs if it succeeded."""
+
+        run = await self.run(name, reason=reason)
+        if run.ok:
+            for downstream in self.downstream(name):
+                task = asyncio.create_task(self.trigger(downstream, reason=f"after {name}"))
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+        return run
+
+    async def run(self, name: str, *args: Any, reason: str = "manual", **kwargs: Any) -> JobRun:
+        """Run ``name`` once, never concurrently with itself.
+
+        If the job is already running the call waits for (and shares) a
+        single follow-up run with the same arguments, so the result always
+        reflects work started after the call. Calls with different (or
+        unhashable) arguments queue their own run.
+        """
+
+        job = self.jobs[name]
+        loop = asyncio.get_running_loop()
+        if job._lock is None or job._loop is not loop:
+            job._loop, job._lock, job._queued = loop, asyncio.Lock(), {}
+        lock = job._lock
+        key = _call_key(args, kwargs)
+        if lock.locked() and key is not None:
+            if key in job._queued:
+                job.coalesced += 1
+                return await asyncio.shield(job._queued[key])
+            queued = job._queued[key] = loop.create_future()
+            try:
+                async with lock:
+                    del job._queued[key]
+                    run = await self._execute(job, args, kwargs, reason)
+            except BaseException as exc:
+                # never leave coalesced callers waiting on a run that won't come
+                if job._queued.get(key) is queued:
+                    del job._queued[key]
+                if isinstance(exc, asyncio.CancelledError):
+                    queued.cancel()
+                else:
+                    queued.set_exception(exc)
+                raise
+            queued.set_result(run)
+            return run
+        async with lock:
+            return await self._execute(job, args, kwargs, reason)
+
+    async def _execute(
+        self, job: Job, args: tuple[Any, ...], kwargs: dict[str, Any], reason: str
+    ) -> JobRun:
+        topic = self.progress.totals[f"stage.{job.name}"]
+        rows_before = topic.get("rows", 0)
+        started_at = datetime.now(UTC)
+        started = time.perf_counter()
+        ok = True
+        try:
+            with self.profiler.profile(job.name):
+                await job.func(*args, **kwargs)
+        except Exception:
+            ok = False
+            job.failures += 1
+            logger.exception("Scheduled job %s failed", job.name)
+        run = JobRun(
+            started_at=started_at,
+            duration=time.perf_counter() - started,
+            rows=int(topic.get("rows", 0) - rows_before),
+            ok=ok,
+            trigger=reason,
+        )
+        job.runs += 1
+        job.history.append(run)
+        JOB_DURATION.observe(run.duration, job.name)
+        JOB_ROWS.inc(job.name, amount=run.rows)
+        if run.duration > 0:
+            JOB_ROWS_PER_SECOND.set(run.rows / run.duration, job.name)
+        if not ok:
+            JOB_FAILURES.inc(job.name)
+        logger.info(
+            "Job %s (%s) finished in %.2fs, %d rows%s",
+            job.name,
+            reason,
+            run.duration,
+            run.rows,
+            "" if ok else ", failed",
+        )
+        return run
+
+    def stats(self) -> list[dict[str, Any]]:
+        """Return a summary of every registered job."""
+
+        return [job.summary() for job in self.jobs.values()]
+
+    async def aclose(self) -> None:
+        """Wait for triggered downstream runs to finish."""
+
+        await asyncio.gather(*self._tasks, return_exceptions=True)
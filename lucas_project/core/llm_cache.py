@@ -1,49 +1,257 @@
-"""Simple JSON-based cache for LLM responses."""
+"""Append-only, indexed cache for LLM responses.
+
+Entries live in an in-memory LRU index and are persisted to a JSON-lines log.
+Each ``store`` appends one record instead of rewriting the file, and lookups
+are served from memory only. The log is periodically compacted into a fresh
+file which atomically replaces the old one, so a crash never leaves a
+half-written cache behind; a torn trailing line is cut off on load.
+"""
 
 from __future__ import annotations
 
 import json
+import os
+import time
+import weakref
+from collections import OrderedDict
 from pathlib import Path
-from typing import Any
+from typing import IO, Any
 
 from .config import get_settings
+from .metrics import MetricFamily, metrics
+from .utils import get_logger
+
+logger = get_logger(__name__)
+
+# Compact once the log holds this many times more records than live entries.
+_COMPACT_RATIO = 2
+_COMPACT_MIN_RECORDS = 1024
+
+# Every live cache, so the metrics collector also sees ad-hoc instances.
+_instances: weakref.WeakSet[LLMCache] = weakref.WeakSet()
+
+
+def _valid(record: Any) -> bool:
+    """Return whether ``record`` is a well-formed store or delete record."""
+
+    return (
+        isinstance(record, dict)
+        and isinstance(record.get("k"), str)
+        and (bool(record.get("d")) or "v" in record)
+    )
 
 
 class LLMCache:
-    """Disk backed JSON cache."""
+    """Disk backed cache with TTL and size-bounded LRU eviction."""
 
-    def __init__(self, path: Path | None = None) -> None:
+    def __init__(
+        self,
+        path: Path | None = None,
+        *,
+        ttl: float | None = None,
+        max_entries: int | None = None,
+        fsync: bool | None = None,
+    ) -> None:
         settings = get_settings()
-        self.path = path or settings.llm_cache_path
+        path = Path(path or settings.llm_cache_path)
+        if path.suffix == ".json":
+            legacy_path, path = path, path.with_suffix(".jsonl")
+        else:
+            legacy_path = path.with_suffix(".json")
+        self.path = path
+        self.ttl = settings.llm_cache_ttl if ttl is None else ttl
+        self.max_entries = (
+            settings.llm_cache_max_entries if max_entries is None else max_entries
+        )
+        self.fsync = settings.llm_cache_fsync if fsync is None else fsync
+        self._index: OrderedDict[str, tuple[Any, float | None]] = OrderedDict()
+        self._records = 0
+        self._fh: IO[str] | None = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        _instances.add(self)
+
         self.path.parent.mkdir(parents=True, exist_ok=True)
-        if not self.path.exists():
-            self.path.write_text("{}", encoding="utf-8")
+        if self.path.exists():
+            self._load()
+        elif legacy_path.exists():
+            self._migrate(legacy_path)
+
+    # ------------------------------------------------------------------ disk
+    def _load(self) -> None:
+        now = time.time()
+        intact = 0
+        with self.path.open("rb") as fh:
+            for line in fh:
+                if not line.endswith(b"\n"):
+                    # torn write from a crash; everything before it is intact
+                    logger.warning("Dropping torn record at end of %s", self.path)
+                    break
+                intact += len(line)
+                try:
+                    record = json.loads(line)
+                except (json.JSONDecodeError, UnicodeDecodeError):
+                    record = None
+                if not _valid(record):
+                    logger.warning("Ignoring corrupt record in %s", self.path)
+                    continue
+                self._records += 1
+                key = record["k"]
+                if record.get("d"):
+                    self._index.pop(key, None)
+                    continue
+                expires = record.get("e")
+                if expires is not None and expires <= now:
+                    self._index.pop(key, None)
+                    continue
+                self._index[key] = (record["v"], expires)
+                self._index.move_to_end(key)
+        if intact < self.path.stat().st_size:
+            # cut the partial line so the next append starts on a fresh one
+            os.truncate(self.path, intact)
+        while len(self._index) > self.max_entries:
+            self._index.popitem(last=False)
+
+    def _migrate(self, legacy_path: Path) -> None:
+        """Import entries from the old whole-file JSON cache."""
+
+        with legacy_path.open("r", encoding="utf-8") as fh:
+            data: dict[str, Any] = json.load(fh)
+        for key, value in data.items():
+            self._index[key] = (value, None)
+        while len(self._index) > self.max_entries:
+            self._index.popitem(last=False)
+        self.compact()
+        legacy_path.rename(legacy_path.with_suffix(".json.migrated"))
+        logger.info("Migrated %d entries from %s", len(self._index), legacy_path)
+
+    def _append(self, record: dict[str, Any]) -> None:
+        if self._fh is None:
+            self._fh = self.path.open("a", encoding="utf-8")
+        self._fh.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._fh.flush()
+        if self.fsync:
+            os.fsync(self._fh.fileno())
+        self._records += 1
+        if self._records > max(
+            _COMPACT_MIN_RECORDS, _COMPACT_RATIO * len(self._index)
+        ):
+            self.compact()
+
+    def compact(self) -> None:
+        """Rewrite the log with only live entries and swap it in atomically."""
 
-    def _read(self) -> dict[str, Any]:
-        with self.path.open("r", encoding="utf-8") as fh:
-            return json.load(fh)
+        self.close()
+        now = time.time()
+        tmp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+        with tmp_path.open("w", encoding="utf-8") as fh:
+            for key, (value, expires) in list(self._index.items()):
+                if expires is not None and expires <= now:
+                    del self._index[key]
+                    continue
+                record: dict[str, Any] = {"k": key, "v": value}
+                if expires is not None:
+                    record["e"] = expires
+                fh.write(json.dumps(record, ensure_ascii=False) + "\n")
+            fh.flush()
+            os.fsync(fh.fileno())
+        os.replace(tmp_path, self.path)
+        self._records = len(self._index)
 
-    def _write(self, data: dict[str, Any]) -> None:
-        with self.path.open("w", encoding="utf-8") as fh:
-            json.dump(data, fh, ensure_ascii=False, indent=2)
+    def close(self) -> None:
+        """Close the underlying log file handle."""
+
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
+
+    # ------------------------------------------------------------------- api
+    def __len__(self) -> int:
+        return len(self._index)
 
     def lookup(self, key: str) -> Any | None:
         """Return cached value for ``key`` or ``None``."""
 
-        return self._read().get(key)
+        entry = self._index.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        value, expires = entry
+        if expires is not None and expires <= time.time():
+            del self._index[key]
+            self.misses += 1
+            return None
+        self._index.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def store(self, key: str, value: Any, ttl: float | None = None) -> None:
+        """Store ``value`` under ``key``, expiring after ``ttl`` seconds."""
+
+        ttl = self.ttl if ttl is None else ttl
+        expires = time.time() + ttl if ttl else None
+        self._index[key] = (value, expires)
+        self._index.move_to_end(key)
+        record: dict[str, Any] = {"k": key, "v": value}
+        if expires is not None:
+            record["e"] = expires
+        self._append(record)
+        while len(self._index) > self.max_entries:
+            evicted, _ = self._index.popitem(last=False)
+            self.evictions += 1
+            self._append({"k": evicted, "d": 1})
 
-    def store(self, key: str, value: Any) -> None:
-        """Store ``value`` under ``key``."""
 
-        data = self._read()
-        data[key] = value
-        self._write(data)
+_caches: dict[Path, LLMCache] = {}
 
 
 def get_cache(path: Path | None = None) -> LLMCache:
-    """Return a cache instance."""
+    """Return the shared cache instance for ``path``."""
+
+    resolved = Path(path or get_settings().llm_cache_path).resolve()
+    if resolved.suffix == ".json":
+        resolved = resolved.with_suffix(".jsonl")
+    if resolved not in _caches:
+        _caches[resolved] = LLMCache(resolved)
+    return _caches[resolved]
+
+
+@metrics.collector
+def _cache_metrics() -> list[MetricFamily]:
+    families = []
+    for name, help in (
+        ("hits", "LLM cache lookups answered from the cache."),
+        ("misses", "LLM cache lookups that were missing or expired."),
+        ("evictions", "LLM cache entries evicted to stay within the size cap."),
+    ):
+        totals: dict[str, int] = {}
+        for cache in list(_instances):
+            totals[cache.path.name] = totals.get(cache.path.name, 0) + getattr(cache, name)
+        family = MetricFamily(f"lucas_llm_cache_{name}_total", "counter", help)
+        family.samples = [({"cache": label}, value) for label, value in totals.items()]
+        families.append(family)
+    return families
+
+
+class _DefaultCache:
+    """Stand-in for the default cache that opens it on first use.
+
+    Keeps importing this module free of disk access.
+    """
+
+    _cache: LLMCache | None = None
+
+    def _resolve(self) -> LLMCache:
+        if self._cache is None:
+            self._cache = get_cache()
+        return self._cache
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._resolve(), name)
 
-    return LLMCache(path)
+    def __len__(self) -> int:
+        return len(self._resolve())
 
 
-cache = LLMCache()
+cache: LLMCache = _DefaultCache()  # type: ignore[assignment]
@@ -0,0 +1,233 @@
+"""Dependency-free counters and histograms in Prometheus text format.
+
+Instruments are module-level objects updated from the hot paths in
+:mod:`.utils`, :mod:`.db` and :mod:`.jobs`. Every update first checks
+:attr:`MetricsRegistry.enabled` and returns immediately when metrics are
+off (``LUCAS_METRICS_ENABLED``), so disabled instrumentation costs one
+attribute lookup. Values that components already count themselves (cache
+hits, pool checkouts) are read by collectors at scrape time instead.
+"""
+
+from __future__ import annotations
+
+import math
+from bisect import bisect_left
+from collections.abc import Callable, Iterable, Iterator
+from dataclasses import dataclass, field
+from typing import Any, TypeVar
+
+from .config import get_settings
+
+Labels = tuple[str, ...]
+M = TypeVar("M", bound="_Metric")
+
+
+@dataclass
+class MetricFamily:
+    """A metric and its samples as produced by a collector."""
+
+    name: str
+    type: str
+    help: str
+    samples: list[tuple[dict[str, str], float]] = field(default_factory=list)
+
+
+Collector = Callable[[], Iterable[MetricFamily]]
+
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 60.0, 300.0, 1800.0)
+
+
+class MetricsRegistry:
+    """Hold instruments and collectors and render them for scraping."""
+
+    def __init__(self, enabled: bool = False) -> None:
+        self.enabled = enabled
+        self._metrics: dict[str, _Metric] = {}
+        self._collectors: list[Collector] = []
+
+    def counter(self, name: str, help: str, labels: Labels = ()) -> Counter:
+        return self._register(Counter(self, name, help, labels))
+
+    def gauge(self, name: str, help: str, labels: Labels = ()) -> Gauge:
+        return self._register(Gauge(self, name, help, labels))
+
+    def histogram(
+        self, name: str, help: str, labels: Labels = (), buckets: Iterable[float] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        return self._register(Histogram(self, name, help, labels, tuple(sorted(buckets))))
+
+    def collector(self, func: Collector) -> Collector:
+        """Register ``func`` to contribute metric families at scrape time."""
+
+        self._collectors.append(func)
+        return func
+
+    def _register(self, metric: M) -> M:
+        self._metrics[metric.name] = metric
+        return metric
+
+    def reset(self) -> None:
+        """Zero every instrument (collectors are unaffected)."""
+
+        for metric in self._metrics.values():
+            metric.values.clear()
+
+    def render(self) -> str:
+        """Return all metrics in the Prometheus text exposition format."""
+
+        if not self.enabled:
+            return "# metrics disabled; set LUCAS_METRICS_ENABLED=true\n"
+        lines: list[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        for collect in self._collectors:
+            for family in collect():
+                lines.extend(_header(family.name, family.type, family.help))
+                lines.extend(
+                    f"{family.name}{_labels(labels)} {_number(value)}"
+                    for labels, value in family.samples
+                )
+        return "\n".join(lines) + "\n"
+
+
+def _header(name: str, type_: str, help: str) -> list[str]:
+    return [f"# HELP {name} {help}", f"# TYPE {name} {type_}"]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(labels: dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(str(value))}"' for key, value in labels.items()) + "}"
+
+
+def _number(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    type = ""
+
+    def __init__(self, registry: MetricsRegistry, name: str, help: str, labels: Labels) -> None:
+        self.registry = registry
+        self.name = name
+        self.help = help
+        self.labelnames = labels
+        self.values: dict[Labels, Any] = {}
+
+    def _samples(self) -> Iterator[tuple[dict[str, str], float]]:
+        for key, value in self.values.items():
+            yield dict(zip(self.labelnames, key)), value
+
+    def render(self) -> list[str]:
+        lines = _header(self.name, self.type, self.help)
+        lines.extend(f"{self.name}{_labels(labels)} {_number(value)}" for labels, value in self._samples())
+        return lines
+
+
+class Counter(_Metric):
+    """Monotonically increasing value."""
+
+    type = "counter"
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        if not self.registry.enabled:
+            return
+        self.values[labels] = self.values.get(labels, 0.0) + amount
+
+
+class Gauge(_Metric):
+    """Value that can go up and down."""
+
+    type = "gauge"
+
+    def set(self, value: float, *labels: str) -> None:
+        if not self.registry.enabled:
+            return
+        self.values[labels] = value
+
+
+class Histogram(_Metric):
+    """Distribution of observations over fixed buckets."""
+
+    type = "histogram"
+
+    def __init__(
+        self,
+        registry: MetricsRegistry,
+        name: str,
+        help: str,
+        labels: Labels,
+        buckets: tuple[float, ...],
+    ) -> None:
+        super().__init__(registry, name, help, labels)
+        self.buckets = buckets
+
+    def observe(self, value: float, *labels: str) -> None:
+        if not self.registry.enabled:
+            return
+        series = self.values.get(labels)
+        if series is None:
+            # per-bucket counts (the last one is +Inf), then sum and count
+            series = self.values[labels] = [0.0] * (len(self.buckets) + 3)
+        series[bisect_left(self.buckets, value)] += 1
+        series[-2] += value
+        series[-1] += 1
+
+    def render(self) -> list[str]:
+        lines = _header(self.name, self.type, self.help)
+        for key, series in self.values.items():
+            labels = dict(zip(self.labelnames, key))
+            cumulative = 0.0
+            for bound, count in zip((*self.buckets, math.inf), series):
+                cumulative += count
+                lines.append(
+                    f"{self.name}_bucket{_labels({**labels, 'le': _number(bound)})} {_number(cumulative)}"
+                )
+            lines.append(f"{self.name}_sum{_labels(labels)} {_number(series[-2])}")
+            lines.append(f"{self.name}_count{_labels(labels)} {_number(series[-1])}")
+        return lines
+
+
+metrics = MetricsRegistry(enabled=get_settings().metrics_enabled)
+
+JOB_DURATION = metrics.histogram(
+    "lucas_job_duration_seconds", "Duration of scheduled job runs.", ("job",)
+)
+JOB_ROWS = metrics.counter("lucas_job_rows_total", "Rows handled by job runs.", ("job",))
+JOB_ROWS_PER_SECOND = metrics.gauge(
+    "lucas_job_rows_per_second", "Throughput of the latest run of each job.", ("job",)
+)
+JOB_FAILURES = metrics.counter("lucas_job_failures_total", "Failed job runs.", ("job",))
+RATE_LIMIT_WAIT = metrics.histogram(
+    "lucas_rate_limiter_wait_seconds", "Time callers waited for a rate limiter slot.", ("limiter",)
+)
+RETRIES = metrics.counter(
+    "lucas_retries_total", "Retried calls per function.", ("function",)
+)
+RETRIES_EXHAUSTED = metrics.counter(
+    "lucas_retries_exhausted_total", "Calls that failed after every retry.", ("function",)
+)
+BREAKER_TRANSITIONS = metrics.counter(
+    "lucas_circuit_breaker_transitions_total",
+    "Circuit breaker state changes.",
+    ("function", "state"),
+)
+BREAKER_OPEN = metrics.gauge(
+    "lucas_circuit_breaker_open", "Whether a circuit breaker is currently open.", ("function",)
+)
+BREAKER_OPEN_SECONDS = metrics.counter(
+    "lucas_circuit_breaker_open_seconds_total",
+    "Time circuit breakers spent open.",
+    ("function",),
+)
+DB_CHECKOUT = metrics.histogram(
+    "lucas_db_checkout_seconds",
+    "Time spent waiting for a pooled database connection.",
+    ("mode",),
+)
@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from datetime import datetime, UTC
 
-from sqlalchemy import Boolean, DateTime, Float, ForeignKey, String
+from sqlalchemy import DDL, Boolean, DateTime, Float, ForeignKey, Index, String, event, text
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
 
 
@@ -19,8 +19,19 @@ class TrendSeed(Base):
     domains: Mapped[list["Domain"]] = relationship(back_populates="trend_seed")
 
 
+# Top-level suffix of a domain, e.g. "com" for "example.com"; shared by the
+# expression index and the queries that must match it to use the index.
+DOMAIN_TLD_SQL = "substr(domain, instr(domain, '.') + 1)"
+
+
 class Domain(Base):
     __tablename__ = "domains"
+    __table_args__ = (
+        # covers the per-status stage queues and keyset listing
+        Index("ix_domains_status_id_domain", "status", "id", "domain"),
+        Index("ix_domains_created_at", "created_at"),
+        Index("ix_domains_tld", text(DOMAIN_TLD_SQL)),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     domain: Mapped[str] = mapped_column(String, unique=True, index=True)
@@ -42,6 +53,7 @@ class Domain(Base):
 
 class AvailabilityCheck(Base):
     __tablename__ = "availability_checks"
+    __table_args__ = (Index("ix_availability_checks_domain_id", "domain_id"),)
 
     id: Mapped[int] = mapped_column(primary_key=True)
     domain_id: Mapped[int] = mapped_column(ForeignKey("domains.id"))
@@ -55,6 +67,8 @@ class AvailabilityCheck(Base):
 
 class Valuation(Base):
     __tablename__ = "valuations"
+    # covers the per-domain value lookups in joins and KPI triggers
+    __table_args__ = (Index("ix_valuations_domain_id_value", "domain_id", "value"),)
 
     id: Mapped[int] = mapped_column(primary_key=True)
     domain_id: Mapped[int] = mapped_column(ForeignKey("domains.id"))
@@ -69,6 +83,7 @@ class Valuation(Base):
 
 class Monitor(Base):
     __tablename__ = "monitors"
+    __table_args__ = (Index("ix_monitors_service_domain_id", "service", "domain_id"),)
 
     id: Mapped[int] = mapped_column(primary_key=True)
     domain_id: Mapped[int] = mapped_column(ForeignKey("domains.id"))
@@ -80,6 +95,7 @@ class Monitor(Base):
 
 class Backorder(Base):
     __tablename__ = "backorders"
+    __table_args__ = (Index("ix_backorders_domain_id", "domain_id"),)
 
     id: Mapped[int] = mapped_column(primary_key=True)
     domain_id: Mapped[int] = mapped_column(ForeignKey("domains.id"))
@@ -91,6 +107,174 @@ class Backorder(Base):
     domain: Mapped[Domain] = relationship(back_populates="backorders")
 
 
+class StageCheckpoint(Base):
+    __tablename__ = "stage_checkpoints"
+
+    stage: Mapped[str] = mapped_column(String, primary_key=True)
+    watermark: Mapped[int] = mapped_column(default=0)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime, default=lambda: datetime.now(UTC)
+    )
+
+
+class ChangeCounter(Base):
+    """Version number bumped by triggers whenever a tracked row set changes."""
+
+    __tablename__ = "change_counters"
+
+    name: Mapped[str] = mapped_column(String, primary_key=True)
+    version: Mapped[int] = mapped_column(default=0)
+
+
+class KpiStatus(Base):
+    """Materialized domain count and valuation total per domain status."""
+
+    __tablename__ = "kpi_status"
+
+    status: Mapped[str] = mapped_column(String, primary_key=True)
+    domains: Mapped[int] = mapped_column(default=0)
+    value: Mapped[float] = mapped_column(Float, default=0.0)
+
+
+class KpiService(Base):
+    """Materialized valuation count and total per valuation service."""
+
+    __tablename__ = "kpi_service"
+
+    service: Mapped[str] = mapped_column(String, primary_key=True)
+    valuations: Mapped[int] = mapped_column(default=0)
+    value: Mapped[float] = mapped_column(Float, default=0.0)
+
+
+# Triggers keeping ``kpi_status`` and ``kpi_service`` in step with every write
+# to ``domains`` and ``valuations``, inside the writer's own transaction.
+KPI_TRIGGERS = {
+    "trg_kpi_domain_insert": """
+CREATE TRIGGER IF NOT EXISTS trg_kpi_domain_insert AFTER INSERT ON domains
+BEGIN
+    INSERT INTO kpi_status (status, domains, value) VALUES (NEW.status, 1, 0)
+    ON CONFLICT(status) DO UPDATE SET domains = domains + 1;
+END""",
+    "trg_kpi_domain_delete": """
+CREATE TRIGGER IF NOT EXISTS trg_kpi_domain_delete AFTER DELETE ON domains
+BEGIN
+    UPDATE kpi_status SET domains = domains - 1,
+        value = value - (SELECT COALESCE(SUM(value), 0) FROM valuations WHERE domain_id = OLD.id)
+    WHERE status = OLD.status;
+END""",
+    "trg_kpi_domain_status": """
+CREATE TRIGGER IF NOT EXISTS trg_kpi_domain_status AFTER UPDATE OF status ON domains
+WHEN OLD.status IS NOT NEW.status
+BEGIN
+    UPDATE kpi_status SET domains = domains - 1,
+        value = value - (SELECT COALESCE(SUM(value), 0) FROM valuations WHERE domain_id = OLD.id)
+    WHERE status = OLD.status;
+    INSERT INTO kpi_status (status, domains, value)
+    VALUES (NEW.status, 1,
+        (SELECT COALESCE(SUM(value), 0) FROM valuations WHERE domain_id = NEW.id))
+    ON CONFLICT(status) DO UPDATE SET domains = domains + 1, value = value + excluded.value;
+END""",
+    "trg_kpi_valuation_insert": """
+CREATE TRIGGER IF NOT EXISTS trg_kpi_valuation_insert AFTER INSERT ON valuations
+BEGIN
+    INSERT INTO kpi_service (service, valuations, value) VALUES (NEW.service, 1, NEW.value)
+    ON CONFLICT(service) DO UPDATE SET valuations = valuations + 1, value = value + excluded.value;
+    UPDATE kpi_status SET value = value + NEW.value
+    WHERE status = (SELECT status FROM domains WHERE id = NEW.domain_id);
+END""",
+    "trg_kpi_valuation_delete": """
+CREATE TRIGGER IF NOT EXISTS trg_kpi_valuation_delete AFTER DELETE ON valuations
+BEGIN
+    UPDATE kpi_service SET valuations = valuations - 1, value = value - OLD.value
+    WHERE service = OLD.service;
+    UPDATE kpi_status SET value = value - OLD.value
+    WHERE status = (SELECT status FROM domains WHERE id = OLD.domain_id);
+END""",
+    "trg_kpi_valuation_update": """
+CREATE TRIGGER IF NOT EXISTS trg_kpi_valuation_update
+AFTER UPDATE OF domain_id, service, value ON valuations
+BEGIN
+    UPDATE kpi_service SET valuations = valuations - 1, value = value - OLD.value
+    WHERE service = OLD.service;
+    UPDATE kpi_status SET value = value - OLD.value
+    WHERE status = (SELECT status FROM domains WHERE id = OLD.domain_id);
+    INSERT INTO kpi_service (service, valuations, value) VALUES (NEW.service, 1, NEW.value)
+    ON CONFLICT(service) DO UPDATE SET valuations = valuations + 1, value = value + excluded.value;
+    UPDATE kpi_status SET value = value + NEW.value
+    WHERE status = (SELECT status FROM domains WHERE id = NEW.domain_id);
+END""",
+}
+
+# Recompute both aggregate tables from scratch.
+KPI_REBUILD_SQL = (
+    "DELETE FROM kpi_status",
+    "DELETE FROM kpi_service",
+    (
+        "INSERT INTO kpi_status (status, domains, value) "
+        "SELECT d.status, COUNT(*), COALESCE(SUM(v.total), 0) FROM domains d "
+        "LEFT JOIN (SELECT domain_id, SUM(value) AS total FROM valuations GROUP BY domain_id) v "
+        "ON v.domain_id = d.id GROUP BY d.status"
+    ),
+    (
+        "INSERT INTO kpi_service (service, valuations, value) "
+        "SELECT service, COUNT(*), COALESCE(SUM(value), 0) FROM valuations GROUP BY service"
+    ),
+)
+
+# Bump the ``portfolio`` counter on any write that can change the portfolio
+# export: owned domains coming or going, renamed, or revalued.
+PORTFOLIO_TRIGGERS = {
+    "trg_portfolio_domain_insert": """
+CREATE TRIGGER IF NOT EXISTS trg_portfolio_domain_insert AFTER INSERT ON domains
+WHEN NEW.status = 'owned'
+BEGIN
+    INSERT INTO change_counters (name, version) VALUES ('portfolio', 1)
+    ON CONFLICT(name) DO UPDATE SET version = version + 1;
+END""",
+    "trg_portfolio_domain_delete": """
+CREATE TRIGGER IF NOT EXISTS trg_portfolio_domain_delete AFTER DELETE ON domains
+WHEN OLD.status = 'owned'
+BEGIN
+    INSERT INTO change_counters (name, version) VALUES ('portfolio', 1)
+    ON CONFLICT(name) DO UPDATE SET version = version + 1;
+END""",
+    "trg_portfolio_domain_update": """
+CREATE TRIGGER IF NOT EXISTS trg_portfolio_domain_update
+AFTER UPDATE OF status, domain ON domains
+WHEN 'owned' IN (OLD.status, NEW.status)
+BEGIN
+    INSERT INTO change_counters (name, version) VALUES ('portfolio', 1)
+    ON CONFLICT(name) DO UPDATE SET version = version + 1;
+END""",
+    "trg_portfolio_valuation_insert": """
+CREATE TRIGGER IF NOT EXISTS trg_portfolio_valuation_insert AFTER INSERT ON valuations
+WHEN (SELECT status FROM domains WHERE id = NEW.domain_id) = 'owned'
+BEGIN
+    INSERT INTO change_counters (name, version) VALUES ('portfolio', 1)
+    ON CONFLICT(name) DO UPDATE SET version = version + 1;
+END""",
+    "trg_portfolio_valuation_delete": """
+CREATE TRIGGER IF NOT EXISTS trg_portfolio_valuation_delete AFTER DELETE ON valuations
+WHEN (SELECT status FROM domains WHERE id = OLD.domain_id) = 'owned'
+BEGIN
+    INSERT INTO change_counters (name, version) VALUES ('portfolio', 1)
+    ON CONFLICT(name) DO UPDATE SET version = version + 1;
+END""",
+    "trg_portfolio_valuation_update": """
+CREATE TRIGGER IF NOT EXISTS trg_portfolio_valuation_update
+AFTER UPDATE OF domain_id, value ON valuations
+WHEN (SELECT status FROM domains WHERE id = OLD.domain_id) = 'owned'
+    OR (SELECT status FROM domains WHERE id = NEW.domain_id) = 'owned'
+BEGIN
+    INSERT INTO change_counters (name, version) VALUES ('portfolio', 1)
+    ON CONFLICT(name) DO UPDATE SET version = version + 1;
+END""",
+}
+
+for _sql in (*KPI_TRIGGERS.values(), *PORTFOLIO_TRIGGERS.values()):
+    event.listen(Base.metadata, "after_create", DDL(_sql))
+
+
 class Listing(Base):
     __tablename__ = "listings"
 
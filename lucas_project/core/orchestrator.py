@@ -2,71 +2,279 @@
 
 from __future__ import annotations
 
-from collections.abc import Awaitable, Callable
-from typing import Any, Set
+import asyncio
+import json
+import time
+from collections import OrderedDict, deque
+from collections.abc import Awaitable, Callable, Hashable, Iterable
+from dataclasses import dataclass, field
+from fnmatch import fnmatchcase
+from functools import wraps
+from itertools import count
+from typing import TYPE_CHECKING, Any
 
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
-from fastapi import WebSocket
 
+from .aggregates import rebuild_kpi_aggregates
+from .config import SlowConsumerPolicy, get_settings
+from .db import close_pools
+from .domain_index import get_domain_index, save_domain_indexes
+from .events import ProgressHub
+from .http import http_clients
+from .jobs import JobEngine
 from .utils import get_logger
 
+if TYPE_CHECKING:
+    from fastapi import WebSocket
+
+logger = get_logger(__name__)
+
+# started by startup(), so importing core has no side effects
 scheduler = AsyncIOScheduler()
-try:
-    scheduler.start()
-except RuntimeError:
-    # scheduler may be imported without an event loop (e.g. during migrations)
-    pass
+
+
+@dataclass
+class BroadcastStats:
+    """Counters for :class:`WebSocketBroadcaster`."""
+
+    broadcasts: int = 0
+    sent: int = 0
+    dropped: int = 0
+    coalesced: int = 0
+    disconnected: int = 0
+
+
+@dataclass
+class _Client:
+    websocket: WebSocket
+    # key -> (payload, enqueued at); unkeyed messages get a unique key
+    pending: OrderedDict[Hashable, tuple[str, float]] = field(default_factory=OrderedDict)
+    ready: asyncio.Event = field(default_factory=asyncio.Event)
+    # fnmatch patterns of the topics this client subscribed to
+    topics: set[str] = field(default_factory=set)
+    sender: asyncio.Task[None] | None = None
 
 
 class WebSocketBroadcaster:
-    """Manage websocket connections and broadcast messages."""
+    """Manage websocket connections and broadcast messages.
 
-    def __init__(self) -> None:
-        self.connections: Set[WebSocket] = set()
+    Every connection gets a bounded outbound queue drained by its own sender
+    task, so :meth:`broadcast` only enqueues and never waits on a client.
+    When a queue is full the ``policy`` decides what happens:
+    ``"drop_oldest"`` discards the oldest queued message, ``"coalesce"``
+    additionally replaces a queued message that has the same ``key`` and
+    ``"disconnect"`` closes the slow client. A send that takes longer than
+    ``send_timeout`` seconds also disconnects the client. Messages published
+    under a ``topic`` only reach clients that subscribed to a matching
+    pattern.
+    """
+
+    def __init__(
+        self,
+        *,
+        queue_size: int | None = None,
+        policy: SlowConsumerPolicy | None = None,
+        send_timeout: float | None = None,
+        latency_window: int = 10_000,
+    ) -> None:
+        settings = get_settings()
+        self.queue_size = max(1, queue_size or settings.ws_queue_size)
+        self.policy = policy or settings.ws_slow_consumer_policy
+        self.send_timeout = send_timeout or settings.ws_send_timeout
+        self.connections: dict[WebSocket, _Client] = {}
+        self.stats = BroadcastStats()
+        self.latencies: deque[float] = deque(maxlen=latency_window)
+        self._sequence = count()
 
     async def connect(self, websocket: WebSocket) -> None:
         """Accept and register a websocket connection."""
 
         await websocket.accept()
-        self.connections.add(websocket)
+        client = _Client(websocket)
+        client.sender = asyncio.create_task(self._send_loop(client))
+        self.connections[websocket] = client
 
     def disconnect(self, websocket: WebSocket) -> None:
         """Remove a websocket connection."""
 
-        self.connections.discard(websocket)
+        client = self.connections.pop(websocket, None)
+        if client is not None and client.sender is not None:
+            if client.sender is not asyncio.current_task():
+                client.sender.cancel()
+
+    def subscribe(self, websocket: WebSocket, patterns: Iterable[str]) -> None:
+        """Deliver topics matching ``patterns`` (e.g. ``"stage.*"``) to ``websocket``."""
+
+        client = self.connections.get(websocket)
+        if client is not None:
+            client.topics.update(patterns)
+
+    def unsubscribe(self, websocket: WebSocket, patterns: Iterable[str]) -> None:
+        client = self.connections.get(websocket)
+        if client is not None:
+            client.topics.difference_update(patterns)
+
+    async def broadcast(
+        self,
+        message: str | Any,
+        *,
+        key: Hashable | None = None,
+        topic: str | None = None,
+    ) -> None:
+        """Queue ``message`` for every connection without waiting on them.
+
+        Non-string messages are JSON-encoded once. With the ``"coalesce"``
+        policy a message carrying ``key`` replaces any still-queued message
+        with the same key. A ``topic`` restricts delivery to subscribers.
+        """
+
+        payload = message if isinstance(message, str) else json.dumps(message)
+        enqueued = time.perf_counter()
+        self.stats.broadcasts += 1
+        coalesce = self.policy == "coalesce" and key is not None
+        slot = key if coalesce else next(self._sequence)
+        for client in list(self.connections.values()):
+            if topic is not None and not any(
+                fnmatchcase(topic, pattern) for pattern in client.topics
+            ):
+                continue
+            pending = client.pending
+            if coalesce and slot in pending:
+                pending[slot] = (payload, pending[slot][1])
+                self.stats.coalesced += 1
+                continue
+            if len(pending) >= self.queue_size:
+                if self.policy == "disconnect":
+                    self._drop(client)
+                    continue
+                pending.popitem(last=False)
+                self.stats.dropped += 1
+            pending[slot] = (payload, enqueued)
+            client.ready.set()
 
-    async def broadcast(self, message: str) -> None:
-        """Send ``message`` to all active connections."""
+    def _drop(self, client: _Client) -> None:
+        self.stats.disconnected += 1
+        self.disconnect(client.websocket)
+        asyncio.ensure_future(_close_quietly(client.websocket))
 
-        for ws in list(self.connections):
-            try:
-                await ws.send_text(message)
-            except Exception:
-                self.disconnect(ws)
+    async def _send_loop(self, client: _Client) -> None:
+        websocket = client.websocket
+        while True:
+            await client.ready.wait()
+            client.ready.clear()
+            while client.pending:
+                _, (payload, enqueued) = client.pending.popitem(last=False)
+                try:
+                    async with asyncio.timeout(self.send_timeout):
+                        await websocket.send_text(payload)
+                except asyncio.CancelledError:
+                    raise
+                except Exception:
+                    self._drop(client)
+                    return
+                self.stats.sent += 1
+                self.latencies.append(time.perf_counter() - enqueued)
+
+    def latency_percentiles(self) -> dict[str, float]:
+        """Return enqueue-to-send latency percentiles in seconds."""
+
+        if not self.latencies:
+            return {}
+        ordered = sorted(self.latencies)
+
+        def pick(q: float) -> float:
+            return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+        return {"p50": pick(0.5), "p99": pick(0.99), "max": ordered[-1]}
+
+    async def aclose(self) -> None:
+        """Stop every sender task and close the connections."""
+
+        clients = list(self.connections.values())
+        for client in clients:
+            self.disconnect(client.websocket)
+        await asyncio.gather(
+            *(client.sender for client in clients if client.sender is not None),
+            return_exceptions=True,
+        )
+        await asyncio.gather(*(_close_quietly(client.websocket) for client in clients))
+
+
+async def _close_quietly(websocket: WebSocket) -> None:
+    from starlette.websockets import WebSocketDisconnect
+
+    try:
+        await websocket.close()
+    except (RuntimeError, OSError, WebSocketDisconnect) as exc:
+        # already closed by the client, or the transport is gone
+        logger.debug("Closing websocket failed: %r", exc)
 
 
 broadcaster = WebSocketBroadcaster()
+progress = ProgressHub(broadcaster.broadcast)
+jobs = JobEngine(scheduler, progress)
 
 
-def register_job(*, trigger: str = "interval", **trigger_args: Any) -> Callable[[Callable[..., Awaitable[Any]]], Callable[..., Awaitable[Any]]]:
-    """Register an async function as a scheduled job."""
+def register_job(
+    *,
+    trigger: str = "interval",
+    name: str | None = None,
+    after: str | Iterable[str] = (),
+    **trigger_args: Any,
+) -> Callable[[Callable[..., Awaitable[Any]]], Callable[..., Awaitable[None]]]:
+    """Register an async function as a scheduled job.
 
-    def decorator(func: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
-        logger = get_logger(func.__module__)
+    ``name`` defaults to the defining module's name (e.g. ``"4_valuation"``).
+    ``after`` names upstream jobs whose successful completion also starts
+    this one. Calling the returned function runs the job once, waiting for
+    an in-flight run instead of overlapping it.
+    """
 
+    def decorator(func: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[None]]:
+        job_name = name or func.__module__.rsplit(".", 1)[-1]
+        jobs.register(func, name=job_name, trigger=trigger, after=after, **trigger_args)
+
+        @wraps(func)
         async def wrapped(*args: Any, **kwargs: Any) -> None:
-            try:
-                await func(*args, **kwargs)
-            except Exception:
-                logger.exception("Scheduled job %s failed", func.__name__)
+            await jobs.run(job_name, *args, **kwargs)
 
-        scheduler.add_job(wrapped, trigger, **trigger_args)
         return wrapped
 
     return decorator
 
 
+async def startup() -> None:
+    """Load the stage modules, schedule their jobs and start the scheduler.
+
+    Also warms up the HTTP clients and the domain index.
+    """
+    from lucas_project.modules import load_all
+
+    load_all()
+    jobs.schedule()
+    if not scheduler.running:
+        scheduler.start()
+    interval = get_settings().kpi_rebuild_interval
+    if interval > 0:
+        scheduler.add_job(
+            rebuild_kpi_aggregates,
+            "interval",
+            seconds=interval,
+            id="kpi_rebuild",
+            replace_existing=True,
+        )
+    await http_clients.startup()
+    progress.start()
+    await get_domain_index()
+
+
 async def shutdown() -> None:
-    """Gracefully stop the scheduler."""
+    """Gracefully stop the scheduler and release pooled connections."""
     if scheduler.running:
         scheduler.shutdown(wait=False)
+    await jobs.aclose()
+    await http_clients.aclose()
+    await progress.stop()
+    await broadcaster.aclose()
+    save_domain_indexes()
+    await close_pools()
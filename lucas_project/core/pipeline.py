@@ -0,0 +1,139 @@
+"""In-process streaming pipeline built from bounded asyncio queues."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import deque
+from collections.abc import AsyncIterable, Awaitable, Callable, Iterable
+from dataclasses import dataclass, field
+from typing import Any
+
+from .utils import get_logger
+
+logger = get_logger(__name__)
+
+StageHandler = Callable[[Any], Awaitable[Iterable[Any] | None]]
+
+
+@dataclass
+class Stage:
+    """A pipeline step run by ``concurrency`` workers.
+
+    ``handler`` receives one item and returns the items to pass downstream
+    (or ``None``). A full outbound queue blocks the workers, which in turn
+    stops them draining their own queue, so backpressure propagates upstream.
+    """
+
+    name: str
+    handler: StageHandler
+    concurrency: int = 1
+    queue_size: int = 100
+
+
+@dataclass
+class StageStats:
+    """Counters for a single stage."""
+
+    processed: int = 0
+    emitted: int = 0
+    failed: int = 0
+    busy_time: float = 0.0
+
+
+@dataclass
+class _Envelope:
+    item: Any
+    started: float = field(default_factory=time.perf_counter)
+
+
+class StreamPipeline:
+    """Connect :class:`Stage` objects with bounded queues and run them."""
+
+    def __init__(self, stages: list[Stage], *, latency_window: int = 1000) -> None:
+        if not stages:
+            raise ValueError("a pipeline needs at least one stage")
+        self.stages = stages
+        self.stats = {stage.name: StageStats() for stage in stages}
+        self.latencies: deque[float] = deque(maxlen=latency_window)
+        self._queues: list[asyncio.Queue[_Envelope]] = []
+        self._workers: list[asyncio.Task[None]] = []
+
+    @property
+    def running(self) -> bool:
+        return bool(self._workers)
+
+    async def start(self) -> None:
+        """Create queues and spawn stage workers."""
+
+        if self.running:
+            return
+        self._queues = [asyncio.Queue(stage.queue_size) for stage in self.stages]
+        for index, stage in enumerate(self.stages):
+            for _ in range(max(1, stage.concurrency)):
+                self._workers.append(asyncio.create_task(self._work(index)))
+
+    async def feed(self, item: Any) -> None:
+        """Submit ``item`` to the first stage, waiting if it is full."""
+
+        await self._queues[0].put(_Envelope(item))
+
+    async def stop(self, drain: bool = True) -> None:
+        """Stop workers, optionally after every queued item is processed."""
+
+        if drain:
+            for queue in self._queues:
+                await queue.join()
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers.clear()
+
+    async def run(self, source: AsyncIterable[Any]) -> None:
+        """Feed every item from ``source`` through the pipeline and drain it."""
+
+        await self.start()
+        try:
+            async for item in source:
+                await self.feed(item)
+        finally:
+            await self.stop()
+
+    async def _work(self, index: int) -> None:
+        stage = self.stages[index]
+        stats = self.stats[stage.name]
+        inbox = self._queues[index]
+        outbox = self._queues[index + 1] if index + 1 < len(self._queues) else None
+        while True:
+            envelope = await inbox.get()
+            started = time.perf_counter()
+            try:
+                results = await stage.handler(envelope.item)
+            except Exception:
+                # the polling jobs pick the item up again on their next sweep
+                stats.failed += 1
+                logger.exception("Stage %s failed for %r", stage.name, envelope.item)
+                inbox.task_done()
+                continue
+            stats.processed += 1
+            stats.busy_time += time.perf_counter() - started
+            results = list(results or [])
+            if outbox is None:
+                self.latencies.append(time.perf_counter() - envelope.started)
+            else:
+                for result in results:
+                    stats.emitted += 1
+                    await outbox.put(_Envelope(result, envelope.started))
+            inbox.task_done()
+
+    def latency_percentiles(self) -> dict[str, float]:
+        """Return end-to-end latency percentiles in seconds."""
+
+        if not self.latencies:
+            return {}
+        ordered = sorted(self.latencies)
+
+        def pick(q: float) -> float:
+            return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+        return {"p50": pick(0.5), "p95": pick(0.95), "max": ordered[-1]}
@@ -0,0 +1,147 @@
+"""Opt-in cProfile and tracemalloc reports for scheduled jobs.
+
+Jobs listed in ``LUCAS_PROFILE_JOBS`` (comma separated, ``*`` for all) are
+profiled on every ``LUCAS_PROFILE_EVERY``-th run. Depending on
+``LUCAS_PROFILE_MODE`` a run writes a ``.prof`` file readable with
+:mod:`pstats` or snakeviz, a ``.alloc.txt`` report of the top allocation
+sites, or both, to ``LUCAS_PROFILE_DIR/<job>/``. Only the newest
+``LUCAS_PROFILE_RETENTION`` reports per job are kept.
+
+cProfile hooks the whole thread, so a profile also contains whatever else
+the event loop ran meanwhile; one job is profiled at a time and overlapping
+samples are skipped.
+"""
+
+from __future__ import annotations
+
+import cProfile
+import tracemalloc
+from collections import Counter
+from collections.abc import Iterator
+from contextlib import contextmanager
+from datetime import UTC, datetime
+from pathlib import Path
+
+from .config import get_settings
+from .utils import get_logger
+
+logger = get_logger(__name__)
+
+REPORT_SUFFIXES = (".prof", ".alloc.txt")
+
+
+class JobProfiler:
+    """Decide which job runs to profile and write their reports."""
+
+    def __init__(
+        self,
+        jobs: str | None = None,
+        *,
+        mode: str | None = None,
+        every: int | None = None,
+        directory: Path | None = None,
+        retention: int | None = None,
+        top: int | None = None,
+    ) -> None:
+        settings = get_settings()
+        names = settings.profile_jobs if jobs is None else jobs
+        self.jobs = {name.strip() for name in names.split(",") if name.strip()}
+        self.mode = mode or settings.profile_mode
+        self.every = max(1, every or settings.profile_every)
+        self.directory = Path(directory or settings.profile_dir)
+        self.retention = settings.profile_retention if retention is None else retention
+        self.top = top or settings.profile_top
+        self.calls: Counter[str] = Counter()
+        self._active: str | None = None
+
+    def enabled_for(self, name: str) -> bool:
+        return "*" in self.jobs or name in self.jobs
+
+    def should_sample(self, name: str) -> bool:
+        """Count a run of ``name`` and return whether to profile it."""
+
+        if not self.enabled_for(name):
+            return False
+        self.calls[name] += 1
+        return (self.calls[name] - 1) % self.every == 0
+
+    @contextmanager
+    def profile(self, name: str) -> Iterator[list[Path]]:
+        """Profile the block if this run of ``name`` is sampled.
+
+        Yields the list that receives the written report paths.
+        """
+
+        reports: list[Path] = []
+        if not self.should_sample(name):
+            yield reports
+            return
+        if self._active is not None:
+            logger.info("Skipping profile of %s while %s is profiled", name, self._active)
+            yield reports
+            return
+        self._active = name
+        cpu = cProfile.Profile() if self.mode in ("cpu", "both") else None
+        memory = self.mode in ("memory", "both")
+        started_tracing = memory and not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+        elif memory:
+            # report this run's peak, not one from before it started
+            tracemalloc.reset_peak()
+        before = tracemalloc.take_snapshot() if memory else None
+        if cpu is not None:
+            cpu.enable()
+        try:
+            yield reports
+        finally:
+            if cpu is not None:
+                cpu.disable()
+            after = tracemalloc.take_snapshot() if memory else None
+            # read before stopping: stopping discards the counters
+            traced = tracemalloc.get_traced_memory() if memory else None
+            if started_tracing:
+                tracemalloc.stop()
+            self._active = None
+            try:
+                reports.extend(self._write(name, cpu, before, after, traced))
+            except OSError:
+                logger.exception("Writing profile of %s failed", name)
+
+    def _write(
+        self,
+        name: str,
+        cpu: cProfile.Profile | None,
+        before: tracemalloc.Snapshot | None,
+        after: tracemalloc.Snapshot | None,
+        traced: tuple[int, int] | None = None,
+    ) -> list[Path]:
+        directory = self.directory / name
+        directory.mkdir(parents=True, exist_ok=True)
+        stem = f"{datetime.now(UTC):%Y%m%dT%H%M%S%f}-{self.calls[name]}"
+        written = []
+        if cpu is not None:
+            path = directory / f"{stem}.prof"
+            cpu.dump_stats(path)
+            written.append(path)
+        if before is not None and after is not None:
+            path = directory / f"{stem}.alloc.txt"
+            stats = after.compare_to(before, "lineno")[: self.top]
+            lines = [f"# {name} run {self.calls[name]}: top {len(stats)} allocation sites"]
+            if traced is not None:
+                current, peak = traced
+                lines.append(f"# traced memory: current={current} peak={peak}")
+            lines.extend(str(stat) for stat in stats)
+            path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+            written.append(path)
+        self._prune(directory)
+        logger.info("Profiled %s: %s", name, ", ".join(str(path) for path in written))
+        return written
+
+    def _prune(self, directory: Path) -> None:
+        if self.retention <= 0:
+            return
+        for suffix in REPORT_SUFFIXES:
+            reports = sorted(directory.glob(f"*{suffix}"))
+            for path in reports[: -self.retention]:
+                path.unlink(missing_ok=True)
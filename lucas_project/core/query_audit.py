@@ -0,0 +1,105 @@
+"""Record issued SQL and flag full table scans in its query plans.
+
+:func:`record_statements` traces every statement run on the pooled
+connections. :func:`audit_statements` then runs ``EXPLAIN QUERY PLAN`` for
+each distinct statement shape and reports the ones that scan a table whose
+row count reaches ``LUCAS_QUERY_AUDIT_MIN_ROWS``. The test suite uses this
+to keep every stage and route query index-backed.
+"""
+
+from __future__ import annotations
+
+import re
+from collections.abc import AsyncIterator, Iterable
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+
+import aiosqlite
+
+from .config import get_settings
+from .db import get_pool
+
+_AUDITED = re.compile(r"^\s*(SELECT|UPDATE|DELETE|INSERT|REPLACE|WITH)\b", re.IGNORECASE)
+_LITERAL = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_TABLE_REF = re.compile(
+    r"\b(?:FROM|JOIN|UPDATE|INTO)\s+(\w+)(?:\s+(?:AS\s+)?(?!(?:ON|WHERE|JOIN|LEFT|INNER|CROSS|"
+    r"GROUP|ORDER|LIMIT|SET|VALUES|USING)\b)(\w+))?",
+    re.IGNORECASE,
+)
+_SCAN = re.compile(r"^SCAN (\w+)")
+
+
+@dataclass(frozen=True)
+class FullScan:
+    """A statement whose plan reads every row of a large table."""
+
+    sql: str
+    table: str
+    rows: int
+    detail: str
+
+
+def statement_shape(sql: str) -> str:
+    """Return ``sql`` with literals and whitespace normalised."""
+
+    return " ".join(_LITERAL.sub("?", sql).split())
+
+
+@asynccontextmanager
+async def record_statements() -> AsyncIterator[dict[str, str]]:
+    """Collect ``{shape: sql}`` for statements run on the configured pool."""
+
+    statements: dict[str, str] = {}
+
+    def trace(sql: str) -> None:
+        if _AUDITED.match(sql):
+            statements.setdefault(statement_shape(sql), sql)
+
+    pool = get_pool()
+    await pool.set_trace(trace)
+    try:
+        yield statements
+    finally:
+        await pool.set_trace(None)
+
+
+def _aliases(sql: str) -> dict[str, str]:
+    aliases: dict[str, str] = {}
+    for table, alias in _TABLE_REF.findall(sql):
+        aliases[table] = table
+        if alias:
+            aliases[alias] = table
+    return aliases
+
+
+async def full_scans(db: aiosqlite.Connection, sql: str) -> list[tuple[str, str]]:
+    """Return ``(table, plan detail)`` for every full scan in ``sql``'s plan."""
+
+    aliases = _aliases(sql)
+    scans = []
+    async with db.execute(f"EXPLAIN QUERY PLAN {sql}") as cursor:
+        for row in await cursor.fetchall():
+            detail = row[3]
+            match = _SCAN.match(detail)
+            if match and match.group(1) in aliases:
+                scans.append((aliases[match.group(1)], detail))
+    return scans
+
+
+async def audit_statements(
+    db: aiosqlite.Connection, statements: Iterable[str], min_rows: int | None = None
+) -> list[FullScan]:
+    """Return full scans of tables holding at least ``min_rows`` rows."""
+
+    if min_rows is None:
+        min_rows = get_settings().query_audit_min_rows
+    sizes: dict[str, int] = {}
+    found = []
+    for sql in statements:
+        for table, detail in await full_scans(db, sql):
+            if table not in sizes:
+                async with db.execute(f'SELECT COUNT(*) FROM "{table}"') as cursor:
+                    sizes[table] = (await cursor.fetchone())[0]
+            if sizes[table] >= min_rows:
+                found.append(FullScan(sql, table, sizes[table], detail))
+    return found
@@ -0,0 +1,330 @@
+"""In-process stand-ins for the external providers, for load testing.
+
+:class:`ProviderSimulator` serves GitHub search, WHOIS, HumbleWorth, EstiBot
+and GoDaddy as small ASGI apps and installs them into the shared HTTP
+client registry via :class:`httpx.ASGITransport`. The real fetchers, with
+their rate limiters, retries, circuit breakers and batching, then run
+unchanged against it. Each provider follows a :class:`ProviderProfile`:
+
+- ``latency``: a :class:`Latency` distribution slept before answering.
+- ``error_rate`` and ``throttle_rate``: chance of a 5xx or a ``429`` with
+  ``Retry-After``.
+- ``quota``: requests allowed per ``quota_period``; beyond it every request
+  gets a ``429`` until the window resets.
+
+Responses are generated deterministically from the request. Real responses
+captured with :func:`record_fixtures` can be loaded with
+:meth:`ProviderSimulator.load_fixtures` and are then replayed for matching
+requests.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import math
+import random
+import time
+import zlib
+from collections import Counter, defaultdict, deque
+from collections.abc import Awaitable, Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Literal
+from urllib.parse import parse_qs
+
+import httpx
+
+from .http import ClientRegistry, http_clients
+from .utils import get_logger
+
+logger = get_logger(__name__)
+
+Scope = dict[str, Any]
+Receive = Callable[[], Awaitable[dict[str, Any]]]
+Send = Callable[[dict[str, Any]], Awaitable[None]]
+
+SIMULATED_PROVIDERS = ("github", "whois", "humbleworth", "estibot", "godaddy")
+
+
+@dataclass(frozen=True)
+class Latency:
+    """Response latency distribution in seconds.
+
+    ``fixed`` always waits ``mean``; ``uniform`` draws from ``[low, high]``;
+    ``exponential`` has mean ``mean``; ``lognormal`` has median ``mean`` and
+    shape ``sigma``, giving a long tail.
+    """
+
+    kind: Literal["fixed", "uniform", "exponential", "lognormal"] = "fixed"
+    mean: float = 0.0
+    low: float = 0.0
+    high: float = 0.0
+    sigma: float = 0.5
+
+    def sample(self, rng: random.Random) -> float:
+        if self.kind == "uniform":
+            return rng.uniform(self.low, self.high)
+        if self.kind == "exponential":
+            return rng.expovariate(1 / self.mean) if self.mean > 0 else 0.0
+        if self.kind == "lognormal":
+            return rng.lognormvariate(math.log(self.mean), self.sigma) if self.mean > 0 else 0.0
+        return self.mean
+
+
+@dataclass(frozen=True)
+class ProviderProfile:
+    """How a simulated provider behaves."""
+
+    latency: Latency = field(default_factory=Latency)
+    error_rate: float = 0.0
+    throttle_rate: float = 0.0
+    retry_after: float = 1.0
+    quota: int | None = None
+    quota_period: float = 60.0
+
+
+@dataclass
+class ProviderStats:
+    """Requests served by one simulated provider."""
+
+    outcomes: Counter[str] = field(default_factory=Counter)
+    latencies: deque[float] = field(default_factory=lambda: deque(maxlen=10_000))
+
+    def summary(self) -> dict[str, Any]:
+        ordered = sorted(self.latencies)
+
+        def percentile(p: float) -> float:
+            return ordered[min(len(ordered) - 1, int(p * len(ordered)))] if ordered else 0.0
+
+        return {
+            **self.outcomes,
+            "requests": sum(self.outcomes.values()),
+            "p50": percentile(0.50),
+            "p99": percentile(0.99),
+            "max": ordered[-1] if ordered else 0.0,
+        }
+
+
+def fixture_key(method: str, target: str, body: bytes) -> str:
+    """Return the replay key of a request."""
+
+    digest = hashlib.sha1(body).hexdigest()[:12] if body else "-"
+    return f"{method.upper()} {target} {digest}"
+
+
+def _value(provider: str, domain: str) -> float:
+    return float(zlib.crc32(f"{provider}:{domain}".encode()) % 5000 + 10)
+
+
+def _generate(provider: str, method: str, path: str, query: dict[str, list[str]], body: bytes) -> tuple[int, Any]:
+    if provider == "github" and path == "/search/repositories":
+        count = int(query.get("per_page", ["5"])[0])
+        return 200, {"items": [{"name": f"simulated-repo-{i}"} for i in range(count)]}
+    if provider == "whois" and path == "/whois":
+        domain = query.get("domain", [""])[0]
+        return 200, {"domain": domain, "available": zlib.crc32(domain.encode()) % 3 != 0}
+    if provider == "estibot" and path == "/appraise":
+        domain = query.get("domain", [""])[0]
+        return 200, {"domain": domain, "value": _value(provider, domain)}
+    if provider == "godaddy" and path.startswith("/v1/appraisal/"):
+        domain = path.rsplit("/", 1)[1]
+        return 200, {"domain": domain, "govalue": _value(provider, domain)}
+    if provider == "humbleworth" and method == "POST" and path == "/api/valuation":
+        domains = json.loads(body or b"{}").get("domains", [])
+        return 200, {
+            "valuations": [
+                {"domain": domain, "marketplace": _value(provider, domain)} for domain in domains
+            ]
+        }
+    return 404, {"error": f"unknown {provider} endpoint {method} {path}"}
+
+
+class ProviderSimulator:
+    """Serve every provider from memory with injected latency and faults."""
+
+    def __init__(
+        self,
+        profiles: dict[str, ProviderProfile] | None = None,
+        *,
+        default: ProviderProfile | None = None,
+        seed: int = 0,
+    ) -> None:
+        self.profiles = dict(profiles or {})
+        self.default = default or ProviderProfile()
+        self.rng = random.Random(seed)
+        self.stats: dict[str, ProviderStats] = defaultdict(ProviderStats)
+        self.fixtures: dict[str, deque[dict[str, Any]]] = {}
+        self._windows: dict[str, tuple[float, int]] = {}
+
+    def profile(self, provider: str) -> ProviderProfile:
+        return self.profiles.get(provider, self.default)
+
+    def load_fixtures(self, path: Path) -> int:
+        """Replay responses recorded by :func:`record_fixtures`.
+
+        Several responses for the same request are served in turn.
+        """
+
+        loaded = 0
+        with Path(path).open(encoding="utf-8") as fh:
+            for line in fh:
+                if line.strip():
+                    record = json.loads(line)
+                    self.fixtures.setdefault(record["key"], deque()).append(record)
+                    loaded += 1
+        return loaded
+
+    def app(self, provider: str) -> Callable[[Scope, Receive, Send], Awaitable[None]]:
+        """Return the ASGI app answering as ``provider``."""
+
+        async def asgi(scope: Scope, receive: Receive, send: Send) -> None:
+            if scope["type"] != "http":
+                return
+            body = b""
+            while True:
+                message = await receive()
+                body += message.get("body", b"")
+                if not message.get("more_body"):
+                    break
+            status, headers, content = await self._respond(provider, scope, body)
+            await send({"type": "http.response.start", "status": status, "headers": headers})
+            await send({"type": "http.response.body", "body": content})
+
+        return asgi
+
+    async def _respond(
+        self, provider: str, scope: Scope, body: bytes
+    ) -> tuple[int, list[tuple[bytes, bytes]], bytes]:
+        profile = self.profile(provider)
+        stats = self.stats[provider]
+        delay = profile.latency.sample(self.rng)
+        stats.latencies.append(delay)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        headers = [(b"content-type", b"application/json")]
+
+        retry_after = self._quota_exceeded(provider, profile)
+        if retry_after is None and self.rng.random() < profile.throttle_rate:
+            retry_after = profile.retry_after
+            stats.outcomes["throttled"] += 1
+        elif retry_after is not None:
+            stats.outcomes["quota_exhausted"] += 1
+        if retry_after is not None:
+            headers.append((b"retry-after", str(math.ceil(retry_after)).encode()))
+            return 429, headers, b'{"error": "rate limited"}'
+        if self.rng.random() < profile.error_rate:
+            stats.outcomes["errors"] += 1
+            status = self.rng.choice((500, 502, 503))
+            return status, headers, b'{"error": "simulated failure"}'
+
+        query_string = scope.get("query_string", b"").decode()
+        target = scope["path"] + (f"?{query_string}" if query_string else "")
+        replay = self.fixtures.get(fixture_key(scope["method"], target, body))
+        if replay:
+            record = replay[0]
+            replay.rotate(-1)
+            stats.outcomes["replayed"] += 1
+            return record["status"], headers, record["response"].encode()
+        status, payload = _generate(provider, scope["method"], scope["path"], parse_qs(query_string), body)
+        stats.outcomes["ok" if status < 400 else "not_found"] += 1
+        return status, headers, json.dumps(payload).encode()
+
+    def _quota_exceeded(self, provider: str, profile: ProviderProfile) -> float | None:
+        if profile.quota is None:
+            return None
+        now = time.monotonic()
+        started, used = self._windows.get(provider, (now, 0))
+        if now - started >= profile.quota_period:
+            started, used = now, 0
+        if used >= profile.quota:
+            self._windows[provider] = (started, used)
+            return started + profile.quota_period - now
+        self._windows[provider] = (started, used + 1)
+        return None
+
+    def summary(self) -> dict[str, dict[str, Any]]:
+        """Return outcome counts and latency percentiles per provider."""
+
+        return {provider: stats.summary() for provider, stats in self.stats.items()}
+
+    @contextmanager
+    def install(
+        self, registry: ClientRegistry = http_clients, providers: tuple[str, ...] = SIMULATED_PROVIDERS
+    ) -> Iterator[ProviderSimulator]:
+        """Route ``providers`` to the simulator for the duration of the block.
+
+        Providers without a base URL get ``http://<name>.simulator`` so their
+        fetchers make HTTP calls instead of using built-in stand-ins. Clients
+        created inside the block should be closed before it ends.
+        """
+
+        previous = {name: registry.providers.get(name) for name in providers}
+        for name in providers:
+            if not registry.configured(name):
+                registry.configure(name, base_url=f"http://{name}.simulator")
+            registry.set_transport(httpx.ASGITransport(app=self.app(name)), name)
+        try:
+            yield self
+        finally:
+            for name, config in previous.items():
+                registry.set_transport(None, name)
+                if config is None:
+                    registry.providers.pop(name, None)
+                else:
+                    registry.providers[name] = config
+
+
+class RecordingTransport(httpx.AsyncBaseTransport):
+    """Forward requests and append every exchange to a JSON-lines fixture."""
+
+    def __init__(
+        self, provider: str, path: Path, inner: httpx.AsyncBaseTransport | None = None
+    ) -> None:
+        self.provider = provider
+        self.path = Path(path)
+        self.inner = inner or httpx.AsyncHTTPTransport()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        body = await request.aread()
+        response = await self.inner.handle_async_request(request)
+        content = await response.aread()
+        # aread() decoded the body, so drop the headers describing the wire format
+        headers = [
+            (name, value)
+            for name, value in response.headers.items()
+            if name.lower() not in ("content-encoding", "content-length", "transfer-encoding")
+        ]
+        query = request.url.query.decode()
+        target = request.url.path + (f"?{query}" if query else "")
+        record = {
+            "provider": self.provider,
+            "key": fixture_key(request.method, target, body),
+            "status": response.status_code,
+            "response": content.decode("utf-8", errors="replace"),
+        }
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self.path.open("a", encoding="utf-8") as fh:
+            fh.write(json.dumps(record) + "\n")
+        return httpx.Response(response.status_code, headers=headers, content=content, request=request)
+
+    async def aclose(self) -> None:
+        await self.inner.aclose()
+
+
+@contextmanager
+def record_fixtures(
+    path: Path, registry: ClientRegistry = http_clients, providers: tuple[str, ...] = SIMULATED_PROVIDERS
+) -> Iterator[None]:
+    """Record real responses of ``providers`` to ``path`` for later replay."""
+
+    for name in providers:
+        registry.set_transport(RecordingTransport(name, path), name)
+    try:
+        yield
+    finally:
+        for name in providers:
+            registry.set_transport(None, name)
+    logger.info("Recorded provider fixtures to %s", path)
@@ -4,9 +4,20 @@ from __future__ import annotations
 
 import asyncio
 import logging
+import time
 from collections.abc import Awaitable, Callable
+from email.utils import parsedate_to_datetime
 from functools import wraps
-from typing import ParamSpec, TypeVar
+from typing import Any, ParamSpec, TypeVar
+
+from .metrics import (
+    BREAKER_OPEN,
+    BREAKER_OPEN_SECONDS,
+    BREAKER_TRANSITIONS,
+    RATE_LIMIT_WAIT,
+    RETRIES,
+    RETRIES_EXHAUSTED,
+)
 
 P = ParamSpec("P")
 R = TypeVar("R")
@@ -27,20 +38,156 @@ def get_logger(name: str) -> logging.Logger:
     return logger
 
 
-def rate_limiter(max_calls: int, period: float) -> Callable[[Callable[P, Awaitable[R]]], Callable[P, Awaitable[R]]]:
-    """Rate limit calls to an async function."""
+def _function_name(func: Callable[..., Any]) -> str:
+    """Return ``module.qualname`` used to label a function's metrics."""
+
+    return f"{func.__module__.rsplit('.', 1)[-1]}.{func.__qualname__}"
+
+
+class RateLimiter:
+    """GCRA rate limiter allowing ``max_calls`` per ``period`` with bursts.
+
+    Each acquisition reserves the next emission slot without holding a lock
+    across the wrapped call, so throughput is independent of call latency.
+    ``burst`` calls may be issued back to back after an idle period. A
+    sliding ``period``-long window sees at most ``max_calls + burst - 1``
+    calls, so the default ``burst`` of 1 never exceeds ``max_calls``.
+    """
+
+    def __init__(
+        self, max_calls: int, period: float, burst: int | None = None, *, name: str = ""
+    ) -> None:
+        self.name = name
+        self.max_calls = max_calls
+        self.period = period
+        self.interval = period / max_calls
+        self.burst = max(1, burst or 1)
+        self.tolerance = self.interval * (self.burst - 1)
+        self.tat = 0.0
+        self.blocked_until = 0.0
+        self.waits = 0
+        self.total_wait = 0.0
+
+    def wait_time(self) -> float:
+        """Return how long a call issued now would have to wait."""
+
+        now = time.monotonic()
+        allow_at = max(self.tat - self.tolerance, self.blocked_until)
+        return max(0.0, allow_at - now)
+
+    async def acquire(self) -> None:
+        """Wait until the next call is allowed and reserve its slot."""
+
+        now = time.monotonic()
+        tat = max(self.tat, now, self.blocked_until)
+        allow_at = max(tat - self.tolerance, self.blocked_until)
+        self.tat = tat + self.interval
+        delay = allow_at - now
+        RATE_LIMIT_WAIT.observe(max(0.0, delay), self.name)
+        if delay > 0:
+            self.waits += 1
+            self.total_wait += delay
+            try:
+                await asyncio.sleep(delay)
+            except asyncio.CancelledError:
+                # hand the slot back unless a later caller already queued behind it
+                if self.tat == tat + self.interval:
+                    self.tat = tat
+                raise
+
+    def penalize(self, retry_after: float) -> None:
+        """Pause all callers for ``retry_after`` seconds, then resume unbursted."""
+
+        blocked_until = time.monotonic() + retry_after
+        self.blocked_until = max(self.blocked_until, blocked_until)
+        self.tat = max(self.tat, self.blocked_until + self.tolerance)
 
-    semaphore = asyncio.Semaphore(max_calls)
-    interval = period / max_calls
+
+# Budgets are shared within one process only; separate workers each get
+# the full ``max_calls`` per key.
+_rate_limiters: dict[str, RateLimiter] = {}
+
+
+def get_rate_limiter(
+    key: str, max_calls: int, period: float, burst: int | None = None
+) -> RateLimiter:
+    """Return the shared limiter for ``key``, creating it on first use.
+
+    Raises :class:`ValueError` when ``key`` is already registered with a
+    different ``max_calls``, ``period`` or ``burst``.
+    """
+
+    limiter = _rate_limiters.get(key)
+    if limiter is None:
+        limiter = _rate_limiters[key] = RateLimiter(max_calls, period, burst, name=key)
+    elif (limiter.max_calls, limiter.period, limiter.burst) != (
+        max_calls,
+        period,
+        max(1, burst or 1),
+    ):
+        raise ValueError(
+            f"rate limiter {key!r} already allows {limiter.max_calls} calls per "
+            f"{limiter.period}s (burst {limiter.burst})"
+        )
+    return limiter
+
+
+def _retry_after(exc: BaseException) -> float | None:
+    """Return the back-off requested by a ``429`` response, if any."""
+
+    response = getattr(exc, "response", None)
+    if getattr(response, "status_code", None) != 429:
+        return None
+    header = response.headers.get("Retry-After", "")
+    try:
+        return max(0.0, float(header))
+    except ValueError:
+        try:
+            when = parsedate_to_datetime(header)
+        except (TypeError, ValueError):
+            return 1.0
+        return max(0.0, when.timestamp() - time.time())
+
+
+def rate_limiter(
+    max_calls: int,
+    period: float,
+    *,
+    key: str | Callable[..., str] | None = None,
+    burst: int | None = None,
+) -> Callable[[Callable[P, Awaitable[R]]], Callable[P, Awaitable[R]]]:
+    """Rate limit calls to an async function.
+
+    Functions decorated with the same ``key`` draw from one shared budget.
+    A callable ``key`` receives the call's arguments and picks the budget
+    per call, e.g. one per upstream service. A ``429`` response carrying
+    ``Retry-After`` pauses every caller of that budget before the error is
+    re-raised.
+    """
 
     def decorator(func: Callable[P, Awaitable[R]]) -> Callable[P, Awaitable[R]]:
+        shared: RateLimiter | None = None
+        if isinstance(key, str) and key:
+            shared = get_rate_limiter(key, max_calls, period, burst)
+        elif not callable(key):
+            shared = RateLimiter(max_calls, period, burst, name=_function_name(func))
+
         @wraps(func)
         async def wrapper(*args: P.args, **kwargs: P.kwargs) -> R:
-            async with semaphore:
-                result = await func(*args, **kwargs)
-                await asyncio.sleep(interval)
-                return result
+            limiter = shared
+            if limiter is None:
+                assert callable(key)
+                limiter = get_rate_limiter(key(*args, **kwargs), max_calls, period, burst)
+            await limiter.acquire()
+            try:
+                return await func(*args, **kwargs)
+            except Exception as exc:
+                retry_after = _retry_after(exc)
+                if retry_after is not None:
+                    limiter.penalize(retry_after)
+                raise
 
+        wrapper.limiter = shared  # type: ignore[attr-defined]
         return wrapper
 
     return decorator
@@ -94,6 +241,8 @@ def retry(retries: int = 3, backoff: float = 1.0) -> Callable[[Callable[P, Await
     """Retry an async function on failure using exponential backoff."""
 
     def decorator(func: Callable[P, Awaitable[R]]) -> Callable[P, Awaitable[R]]:
+        name = _function_name(func)
+
         @wraps(func)
         async def wrapper(*args: P.args, **kwargs: P.kwargs) -> R:
             attempt = 0
@@ -103,7 +252,9 @@ def retry(retries: int = 3, backoff: float = 1.0) -> Callable[[Callable[P, Await
                 except Exception:  # pragma: no cover - thin wrapper
                     attempt += 1
                     if attempt > retries:
+                        RETRIES_EXHAUSTED.inc(name)
                         raise
+                    RETRIES.inc(name)
                     await asyncio.sleep(backoff * attempt)
 
         return wrapper
@@ -117,6 +268,7 @@ def circuit_breaker(
     """Simple circuit breaker for async functions."""
 
     def decorator(func: Callable[P, Awaitable[R]]) -> Callable[P, Awaitable[R]]:
+        name = _function_name(func)
         failures = 0
         opened_at: float | None = None
 
@@ -129,6 +281,10 @@ def circuit_breaker(
             if opened_at and now - opened_at < reset_timeout:
                 raise RuntimeError("Circuit breaker open")
             if opened_at and now - opened_at >= reset_timeout:
+                # the breaker stays open until the first call after the timeout
+                BREAKER_OPEN_SECONDS.inc(name, amount=now - opened_at)
+                BREAKER_TRANSITIONS.inc(name, "closed")
+                BREAKER_OPEN.set(0, name)
                 failures = 0
                 opened_at = None
 
@@ -138,8 +294,11 @@ def circuit_breaker(
                 return result
             except Exception:
                 failures += 1
-                if failures >= max_failures:
+                # calls already in flight when it opened must not re-open it
+                if failures >= max_failures and opened_at is None:
                     opened_at = loop.time()
+                    BREAKER_TRANSITIONS.inc(name, "open")
+                    BREAKER_OPEN.set(1, name)
                 raise
 
         return wrapper
@@ -0,0 +1,85 @@
+"""Buffered bulk writes using ``executemany``."""
+
+from __future__ import annotations
+
+import time
+from collections.abc import Iterable, Sequence
+from types import TracebackType
+from typing import Any, Self
+
+import aiosqlite
+
+from .config import get_settings
+
+
+class BatchWriter:
+    """Buffer rows per statement and flush them with ``executemany``.
+
+    Statements are flushed in the order they were first added, so an
+    ``INSERT`` buffered before an ``UPDATE`` is applied first. Used as an
+    async context manager the writer flushes and commits once on exit,
+    keeping the whole batch in a single transaction.
+    """
+
+    def __init__(self, db: aiosqlite.Connection, chunk_size: int | None = None) -> None:
+        self.db = db
+        self.chunk_size = chunk_size or get_settings().db_write_chunk_size
+        self.rows = 0
+        # rows the database actually changed, e.g. excluding ignored inserts
+        self.changes = 0
+        self.round_trips = 0
+        self._buffers: dict[str, list[Sequence[Any]]] = {}
+        self._pending = 0
+        self._started = time.perf_counter()
+
+    async def add(self, sql: str, params: Sequence[Any]) -> None:
+        """Buffer one row for ``sql``, flushing once a chunk is full."""
+
+        self._buffers.setdefault(sql, []).append(params)
+        self._pending += 1
+        if self._pending >= self.chunk_size:
+            await self.flush()
+
+    async def add_many(self, sql: str, rows: Iterable[Sequence[Any]]) -> None:
+        """Buffer every row in ``rows`` for ``sql``."""
+
+        for params in rows:
+            await self.add(sql, params)
+
+    async def flush(self) -> None:
+        """Send all buffered rows to the database without committing."""
+
+        buffers, self._buffers = self._buffers, {}
+        self._pending = 0
+        for sql, rows in buffers.items():
+            cursor = await self.db.executemany(sql, rows)
+            self.rows += len(rows)
+            self.changes += max(cursor.rowcount, 0)
+            self.round_trips += 1
+
+    async def commit(self) -> None:
+        """Flush buffered rows and commit the transaction."""
+
+        await self.flush()
+        await self.db.commit()
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self._started
+
+    @property
+    def rows_per_sec(self) -> float:
+        elapsed = self.elapsed
+        return self.rows / elapsed if elapsed > 0 else 0.0
+
+    async def __aenter__(self) -> Self:
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        if exc_type is None:
+            await self.commit()
@@ -2,11 +2,15 @@
 
 from fastapi import APIRouter, FastAPI
 
+from lucas_project.core import shutdown, startup
+
 from .routes import router as dashboard_router
 
 
 def init_app(app: FastAPI) -> None:
-    """Include dashboard routes in ``app``."""
+    """Include dashboard routes in ``app`` and hook core lifecycle events."""
+    app.router.on_startup.append(startup)
+    app.router.on_shutdown.append(shutdown)
     api_router = APIRouter(prefix="/api")
     api_router.include_router(dashboard_router)
     app.include_router(api_router)
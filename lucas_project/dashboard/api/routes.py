@@ -2,9 +2,23 @@
 
 from __future__ import annotations
 
-from fastapi import APIRouter
+import json
+from collections.abc import AsyncIterator
+from datetime import datetime
+from typing import Any, Literal
 
-from lucas_project.core import get_db
+from fastapi import APIRouter, Query, WebSocket, WebSocketDisconnect
+from fastapi.responses import PlainTextResponse, StreamingResponse
+
+from lucas_project.core import (
+    broadcaster,
+    get_db,
+    get_kpi_aggregates,
+    jobs,
+    metrics,
+    pool_stats,
+)
+from lucas_project.core.models import DOMAIN_TLD_SQL
 
 router = APIRouter()
 
@@ -15,32 +29,166 @@ async def health() -> dict[str, str]:
     return {"status": "ok"}
 
 
+def _patterns(value: Any) -> list[str]:
+    """Return ``value`` if it is a list of topic patterns, else nothing."""
+
+    if isinstance(value, list) and all(isinstance(item, str) for item in value):
+        return value
+    return []
+
+
+@router.websocket("/ws")
+async def websocket(websocket: WebSocket) -> None:
+    """Stream broadcast messages to a dashboard client.
+
+    Clients send ``{"subscribe": ["stage.*"]}`` or ``{"unsubscribe": [...]}``
+    to choose which progress topics they receive.
+    """
+    await broadcaster.connect(websocket)
+    try:
+        while True:
+            try:
+                request = json.loads(await websocket.receive_text())
+            except ValueError:
+                continue
+            if not isinstance(request, dict):
+                continue
+            broadcaster.subscribe(websocket, _patterns(request.get("subscribe")))
+            broadcaster.unsubscribe(websocket, _patterns(request.get("unsubscribe")))
+    except WebSocketDisconnect:
+        broadcaster.disconnect(websocket)
+
+
+@router.get("/db")
+async def db_pool() -> dict[str, float]:
+    """Return database connection pool statistics."""
+    return pool_stats()
+
+
+@router.get("/jobs")
+async def job_stats() -> list[dict[str, Any]]:
+    """Return scheduled jobs with their latest run."""
+    return jobs.stats()
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics() -> PlainTextResponse:
+    """Return runtime metrics in the Prometheus text format."""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+
 @router.get("/kpis")
-async def kpis() -> dict[str, int]:
-    """Return simple KPIs from the database."""
-    async with get_db() as db:
-        async with db.execute("SELECT COUNT(*) FROM domains") as cursor:
-            row = await cursor.fetchone()
-            domains = row[0] if row else 0
-    return {"domains": domains, "revenue": 0}
+async def kpis() -> dict[str, Any]:
+    """Return domain KPIs from the materialized aggregates."""
+    snapshot = await get_kpi_aggregates().snapshot()
+    by_status = {status: int(row["domains"]) for status, row in snapshot["status"].items()}
+    return {"domains": sum(by_status.values()), "revenue": 0, "by_status": by_status}
 
 
 @router.get("/finance")
-async def finance() -> dict[str, float]:
-    """Return finance metrics."""
-    async with get_db() as db:
-        async with db.execute(
-            "SELECT SUM(value) FROM valuations"
-        ) as cursor:
-            row = await cursor.fetchone()
-            value = row[0] if row and row[0] is not None else 0.0
-    return {"profit": float(value)}
+async def finance() -> dict[str, Any]:
+    """Return valuation totals from the materialized aggregates."""
+    snapshot = await get_kpi_aggregates().snapshot()
+    return {
+        "profit": float(sum(row["value"] for row in snapshot["service"].values())),
+        "by_service": {service: row["value"] for service, row in snapshot["service"].items()},
+        "by_status": {status: row["value"] for status, row in snapshot["status"].items()},
+    }
+
+
+MAX_PAGE_SIZE = 1000
+_EXPORT_CHUNK = 1000
+
+
+def _domain_filters(
+    status: str | None,
+    tld: str | None,
+    created_from: datetime | None,
+    created_to: datetime | None,
+) -> tuple[list[str], list[Any]]:
+    """Build index-backed ``WHERE`` clauses for domain listings."""
+
+    clauses: list[str] = []
+    params: list[Any] = []
+    if status is not None:
+        clauses.append("status = ?")
+        params.append(status)
+    if tld is not None:
+        clauses.append(f"{DOMAIN_TLD_SQL} = ?")
+        params.append(tld.lower().lstrip("."))
+    if created_from is not None:
+        clauses.append("created_at >= ?")
+        params.append(created_from)
+    if created_to is not None:
+        clauses.append("created_at < ?")
+        params.append(created_to)
+    return clauses, params
+
+
+def _domain_item(row: Any) -> dict[str, Any]:
+    return {
+        "id": row["id"],
+        "domain": row["domain"],
+        "status": row["status"],
+        "created_at": str(row["created_at"]),
+    }
 
 
 @router.get("/domains")
-async def domains() -> list[str]:
-    """Return managed domains."""
-    async with get_db() as db:
-        async with db.execute("SELECT domain FROM domains") as cursor:
-            rows = await cursor.fetchall()
-    return [r["domain"] for r in rows]
+async def domains(
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    after: int = Query(0, ge=0, description="Return domains with an id above this cursor"),
+    status: str | None = None,
+    tld: str | None = None,
+    created_from: datetime | None = None,
+    created_to: datetime | None = None,
+) -> dict[str, Any]:
+    """Return one page of managed domains ordered by id.
+
+    Pass the returned ``next_cursor`` as ``after`` to fetch the next page;
+    it is ``null`` on the last page.
+    """
+    clauses, params = _domain_filters(status, tld, created_from, created_to)
+    clauses.append("id > ?")
+    params.append(after)
+    query = (
+        "SELECT id, domain, status, created_at FROM domains "
+        f"WHERE {' AND '.join(clauses)} ORDER BY id LIMIT ?"
+    )
+    async with get_db(readonly=True) as db, db.execute(query, (*params, limit + 1)) as cursor:
+        rows = await cursor.fetchall()
+    items = [_domain_item(row) for row in rows[:limit]]
+    next_cursor = items[-1]["id"] if len(rows) > limit else None
+    return {"items": items, "next_cursor": next_cursor}
+
+
+@router.get("/domains/export")
+async def export_domains(
+    format: Literal["ndjson", "json"] = "ndjson",
+    status: str | None = None,
+    tld: str | None = None,
+    created_from: datetime | None = None,
+    created_to: datetime | None = None,
+) -> StreamingResponse:
+    """Stream every matching domain without buffering the result set."""
+    clauses, params = _domain_filters(status, tld, created_from, created_to)
+    where = f"WHERE {' AND '.join(clauses)} " if clauses else ""
+    query = f"SELECT id, domain, status, created_at FROM domains {where}ORDER BY id"
+
+    async def rows() -> AsyncIterator[str]:
+        first = True
+        if format == "json":
+            yield "["
+        async with get_db(readonly=True) as db, db.execute(query, params) as cursor:
+            while chunk := await cursor.fetchmany(_EXPORT_CHUNK):
+                lines = [json.dumps(_domain_item(row)) for row in chunk]
+                if format == "ndjson":
+                    yield "\n".join(lines) + "\n"
+                else:
+                    yield ("" if first else ",") + ",".join(lines)
+                first = False
+        if format == "json":
+            yield "]"
+
+    media_type = "application/x-ndjson" if format == "ndjson" else "application/json"
+    return StreamingResponse(rows(), media_type=media_type)
@@ -3,6 +3,12 @@ import React, { useEffect, useState } from 'react'
 interface Kpis {
   domains: number
   revenue: number
+  by_status: Record<string, number>
+}
+
+interface ProgressMessage {
+  topic: string
+  delta: Record<string, number>
 }
 
 export default function Example() {
@@ -30,7 +36,7 @@ export default function Example() {
 
         setKpis(kpisData)
         setFinance(financeData)
-        setDomains(domainsData)
+        setDomains(domainsData.items.map((d: { domain: string }) => d.domain))
       } catch (err) {
         setError((err as Error).message)
       }
@@ -39,6 +45,28 @@ export default function Example() {
     fetchData()
   }, [])
 
+  useEffect(() => {
+    // one subscription instead of re-polling the aggregates
+    const protocol = window.location.protocol === 'https:' ? 'wss' : 'ws'
+    const socket = new WebSocket(`${protocol}://${window.location.host}/api/ws`)
+    socket.onopen = () => socket.send(JSON.stringify({ subscribe: ['domains.status'] }))
+    socket.onmessage = (event) => {
+      const message: ProgressMessage = JSON.parse(event.data)
+      if (message.topic !== 'domains.status') return
+      setKpis((current) => {
+        if (!current) return current
+        const byStatus = { ...current.by_status }
+        let domains = current.domains
+        for (const [status, change] of Object.entries(message.delta)) {
+          byStatus[status] = (byStatus[status] ?? 0) + change
+          domains += change
+        }
+        return { ...current, domains, by_status: byStatus }
+      })
+    }
+    return () => socket.close()
+  }, [])
+
   if (error) {
     return <div className="p-2 border rounded text-red-500">Error: {error}</div>
   }
@@ -52,6 +80,12 @@ export default function Example() {
       <div>
         KPIs: domains={kpis.domains}, revenue={kpis.revenue}
       </div>
+      <div>
+        By status:{' '}
+        {Object.entries(kpis.by_status)
+          .map(([status, count]) => `${status}=${count}`)
+          .join(', ')}
+      </div>
       <div>Finance Profit: {finance.profit}</div>
       <div>
         Domains:
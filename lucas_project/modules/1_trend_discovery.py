@@ -2,11 +2,12 @@
 
 from __future__ import annotations
 
-import httpx
-
 from lucas_project.core import (
+    BatchWriter,
     get_db,
+    get_http_client,
     get_logger,
+    progress,
     get_settings,
     rate_limiter,
     register_job,
@@ -16,10 +17,12 @@ from lucas_project.core import (
 
 logger = get_logger(__name__)
 
+STAGE = "1_trend_discovery"
+
 
 @retry(3, backoff=1.0)
 @circuit_breaker(5, 60)
-@rate_limiter(max_calls=5, period=60.0)
+@rate_limiter(max_calls=5, period=60.0, key="github")
 async def fetch_trends() -> list[str]:
     """Fetch trending repository names from GitHub."""
 
@@ -28,26 +31,45 @@ async def fetch_trends() -> list[str]:
     if settings.github_token:
         headers["Authorization"] = f"token {settings.github_token}"
     url = (
-        "https://api.github.com/search/repositories?q=stars:%3E50000&sort=stars&"
+        "/search/repositories?q=stars:%3E50000&sort=stars&"
         "order=desc&per_page=5"
     )
-    async with httpx.AsyncClient() as client:
-        resp = await client.get(url, headers=headers, timeout=10)
-        resp.raise_for_status()
-        data = resp.json()
+    resp = await get_http_client("github").get(url, headers=headers)
+    resp.raise_for_status()
+    data = resp.json()
     return [item["name"] for item in data.get("items", [])]
 
 
-@register_job(trigger="interval", minutes=60)
-async def run() -> None:
-    """Periodic task that fetches and stores trending phrases."""
+async def discover() -> list:
+    """Fetch and store trending phrases, returning the newly added seeds."""
 
     trends = await fetch_trends()
+    if not trends:
+        return []
+    placeholders = ",".join("?" * len(trends))
     async with get_db() as db:
-        for phrase in trends:
-            await db.execute(
+        async with db.execute(
+            f"SELECT phrase FROM trend_seeds WHERE phrase IN ({placeholders})", trends
+        ) as cursor:
+            known = {row["phrase"] for row in await cursor.fetchall()}
+        fresh = [phrase for phrase in dict.fromkeys(trends) if phrase not in known]
+        async with BatchWriter(db) as writer:
+            await writer.add_many(
                 "INSERT OR IGNORE INTO trend_seeds (phrase) VALUES (?)",
-                (phrase,),
+                ((phrase,) for phrase in fresh),
             )
-        await db.commit()
+        placeholders = ",".join("?" * len(fresh))
+        async with db.execute(
+            f"SELECT id, phrase FROM trend_seeds WHERE phrase IN ({placeholders})", fresh
+        ) as cursor:
+            seeds = await cursor.fetchall()
     logger.info("Discovered trends: %s", trends)
+    return seeds
+
+
+@register_job(trigger="interval", minutes=60)
+@progress.tracked(STAGE)
+async def run() -> None:
+    """Periodic task that fetches and stores trending phrases."""
+
+    progress.rows(STAGE, len(await discover()))
@@ -2,34 +2,258 @@
 
 from __future__ import annotations
 
-from typing import Iterable
+import asyncio
+import re
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+from itertools import islice
 
-from lucas_project.core import get_db, get_logger, register_job
+from lucas_project.core import (
+    BatchWriter,
+    get_checkpoint,
+    get_db,
+    get_domain_index,
+    get_logger,
+    progress,
+    get_settings,
+    register_job,
+    set_checkpoint,
+)
 from datetime import datetime, UTC
 
 logger = get_logger(__name__)
 
+STAGE = "2_domain_generator"
 
-def generate_domains(trends: Iterable[str]) -> list[str]:
+
+_CAMEL = re.compile(r"(?<=[a-z0-9])(?=[A-Z])")
+_TOKEN = re.compile(r"[^\W_]+")
+_LDH = re.compile(r"^[a-z0-9](?:[a-z0-9-]{0,61}[a-z0-9])?$")
+
+
+@dataclass(frozen=True)
+class RuleSet:
+    """Which variants the candidate engine derives from each seed."""
+
+    tlds: tuple[str, ...] = ("com",)
+    prefixes: tuple[str, ...] = ()
+    suffixes: tuple[str, ...] = ()
+    hyphenate: bool = False
+    inflect: bool = False
+    abbreviate: bool = False
+
+    @classmethod
+    def from_settings(cls) -> RuleSet:
+        settings = get_settings()
+        return cls(
+            tlds=tuple(settings.generator_tlds),
+            prefixes=tuple(settings.generator_prefixes),
+            suffixes=tuple(settings.generator_suffixes),
+            hyphenate=settings.generator_hyphenate,
+            inflect=settings.generator_inflect,
+            abbreviate=settings.generator_abbreviate,
+        )
+
+
+def tokenize(phrase: str) -> list[str]:
+    """Split ``phrase`` on separators and camelCase boundaries."""
+
+    return [token.lower() for token in _TOKEN.findall(_CAMEL.sub(" ", phrase))]
+
+
+def _inflections(word: str) -> tuple[str, ...]:
+    if word.endswith("ies") and len(word) > 3:
+        return word, word[:-3] + "y"
+    if word.endswith("s") and not word.endswith("ss") and len(word) > 1:
+        return word, word[:-1]
+    if word.endswith("y") and len(word) > 1 and word[-2] not in "aeiou":
+        return word, word[:-1] + "ies"
+    if word.endswith(("s", "x", "z", "ch", "sh")):
+        return word, word + "es"
+    return word, word + "s"
+
+
+def normalize_label(label: str) -> str | None:
+    """Return ``label`` as a valid LDH/IDNA label or ``None``."""
+
+    label = label.strip("-").lower()
+    if not label:
+        return None
+    try:
+        label = label.encode("idna").decode("ascii")
+    except UnicodeError:
+        return None
+    if not _LDH.match(label):
+        return None
+    if label[2:4] == "--" and not label.startswith("xn--"):
+        return None
+    return label
+
+
+def _labels(tokens: list[str], rules: RuleSet) -> Iterator[str]:
+    variants = [tokens]
+    if rules.inflect:
+        variants += [tokens[:-1] + [word] for word in _inflections(tokens[-1])[1:]]
+    for words in variants:
+        joined = "".join(words)
+        yield joined
+        if rules.hyphenate and len(words) > 1:
+            yield "-".join(words)
+        for prefix in rules.prefixes:
+            yield prefix + joined
+        for suffix in rules.suffixes:
+            yield joined + suffix
+    if rules.abbreviate and len(tokens) > 1:
+        yield "".join(word[0] for word in tokens)
+        yield tokens[0] + "".join(word[0] for word in tokens[1:])
+
+
+def iter_candidates(phrase: str, rules: RuleSet | None = None) -> Iterator[str]:
+    """Lazily yield unique candidate domains for one phrase."""
+
+    rules = rules or RuleSet()
+    tokens = tokenize(phrase)
+    if not tokens:
+        return
+    seen: set[str] = set()
+    for raw in _labels(tokens, rules):
+        label = normalize_label(raw)
+        if label is None or label in seen:
+            continue
+        seen.add(label)
+        for tld in rules.tlds:
+            yield f"{label}.{tld}"
+
+
+class CandidateEngine:
+    """Stream ``(seed_id, domain)`` pairs, deduplicated across seeds."""
+
+    def __init__(self, rules: RuleSet | None = None) -> None:
+        self.rules = rules or RuleSet.from_settings()
+        self.seen: set[str] = set()
+        self.generated = 0
+
+    def generate(self, seeds: Iterable[tuple[int, str]]) -> Iterator[tuple[int, str]]:
+        for seed_id, phrase in seeds:
+            for domain in iter_candidates(phrase, self.rules):
+                if domain in self.seen:
+                    continue
+                self.seen.add(domain)
+                self.generated += 1
+                yield seed_id, domain
+
+
+def generate_domains(trends: Iterable[str], rules: RuleSet | None = None) -> list[str]:
     """Generate candidate domain names from trending phrases."""
 
-    return [f"{trend.replace(' ', '')}.com" for trend in trends]
+    engine = CandidateEngine(rules)
+    return [domain for _, domain in engine.generate((0, trend) for trend in trends)]
 
 
-@register_job(trigger="interval", minutes=60)
-async def run() -> None:
-    """Generate domains using discovered trends."""
+async def generate_for_seed(seed) -> list:
+    """Insert candidates for one seed and return the rows that were new."""
 
+    candidates = generate_domains([seed["phrase"]])
+    if not candidates:
+        return []
+    index = await get_domain_index()
     async with get_db() as db:
-        async with db.execute("SELECT id, phrase FROM trend_seeds") as cursor:
+        fresh = await index.filter_new(db, candidates)
+        if not fresh:
+            return []
+        now = datetime.now(UTC)
+        async with BatchWriter(db) as writer:
+            await writer.add_many(
+                "INSERT OR IGNORE INTO domains (domain, trend_seed_id, status, created_at) VALUES (?, ?, ?, ?)",
+                ((domain, seed["id"], "new", now) for domain in fresh),
+            )
+        index.add_many(fresh)
+        await index.grow()
+        placeholders = ",".join("?" * len(fresh))
+        async with db.execute(
+            f"SELECT id, domain FROM domains WHERE domain IN ({placeholders})", fresh
+        ) as cursor:
+            return await cursor.fetchall()
+
+
+async def _distinct_seeds(seeds: list, watermark: int) -> list:
+    """Drop seeds that are near-duplicates of an earlier seed.
+
+    Only active with ``semantic_dedup``. New seeds are compared against the
+    earlier ones and each other; earlier vectors come from the vector cache,
+    so only new phrases are encoded.
+    """
+
+    settings = get_settings()
+    if not settings.semantic_dedup or not seeds:
+        return seeds
+    from lucas_project.core.embeddings import get_embedding_engine
+
+    async with get_db(readonly=True) as db:
+        async with db.execute(
+            "SELECT phrase FROM trend_seeds WHERE id <= ? ORDER BY id", (watermark,)
+        ) as cursor:
+            earlier = [row[0] for row in await cursor.fetchall()]
+    leaders = await asyncio.to_thread(
+        get_embedding_engine().collapse,
+        [seed["phrase"] for seed in seeds],
+        settings.semantic_dedup_threshold,
+        earlier,
+    )
+    kept = [seed for seed in seeds if leaders[seed["phrase"]] == seed["phrase"]]
+    if len(kept) < len(seeds):
+        logger.info("Skipped %d near-duplicate seeds", len(seeds) - len(kept))
+    return kept
+
+
+@register_job(trigger="interval", minutes=60, after="1_trend_discovery")
+@progress.tracked(STAGE)
+async def run(full_rebuild: bool = False) -> None:
+    """Generate domains for trends added since the last run.
+
+    ``full_rebuild`` ignores the checkpoint and regenerates every seed.
+    """
+
+    # load before taking the writer: loading checks out a reader connection
+    index = await get_domain_index()
+    async with get_db(readonly=True) as db:
+        watermark = 0 if full_rebuild else await get_checkpoint(db, STAGE)
+        async with db.execute(
+            "SELECT id, phrase FROM trend_seeds WHERE id > ? ORDER BY id", (watermark,)
+        ) as cursor:
             seeds = await cursor.fetchall()
-        for seed in seeds:
-            domains = generate_domains([seed["phrase"]])
-            for domain in domains:
-                await db.execute(
+    latest = seeds[-1]["id"] if seeds else watermark
+    # embedding may take a while; keep it off the single writer connection
+    seeds = await _distinct_seeds(seeds, watermark)
+    async with get_db() as db:
+        now = datetime.now(UTC)
+        engine = CandidateEngine()
+        candidates = engine.generate((seed["id"], seed["phrase"]) for seed in seeds)
+        async with BatchWriter(db) as writer:
+            while batch := list(islice(candidates, writer.chunk_size)):
+                seed_ids = {domain: seed_id for seed_id, domain in batch}
+                fresh = await index.filter_new(db, seed_ids)
+                await writer.add_many(
                     "INSERT OR IGNORE INTO domains (domain, trend_seed_id, status, created_at) VALUES (?, ?, ?, ?)",
-                    (domain, seed["id"], "new", datetime.now(UTC)),
+                    ((domain, seed_ids[domain], "new", now) for domain in fresh),
                 )
-        await db.commit()
-        logger.info("Generated domains for %d seeds", len(seeds))
+                index.add_many(fresh)
+                # count what was inserted, not what the filter let through
+                inserted = writer.changes
+                await writer.flush()
+                inserted = writer.changes - inserted
+                progress.rows(STAGE, inserted)
+                progress.transition(None, "new", inserted)
+            if latest > watermark:
+                await set_checkpoint(db, STAGE, latest)
+        await index.grow()
+        index.save()
+        logger.info(
+            "Generated %d candidates for %d seeds, %d new (%.0f rows/s, index %s)",
+            engine.generated,
+            len(seeds),
+            writer.changes,
+            writer.rows_per_sec,
+            index.stats(),
+        )
 
@@ -3,10 +3,18 @@
 from __future__ import annotations
 
 import asyncio
+from datetime import datetime, UTC
 
 from lucas_project.core import (
+    CHECKED_DOMAINS,
+    BatchWriter,
     get_db,
+    get_domain_index,
+    get_http_client,
     get_logger,
+    http_clients,
+    progress,
+    get_settings,
     rate_limiter,
     register_job,
     retry,
@@ -15,32 +23,108 @@ from lucas_project.core import (
 
 logger = get_logger(__name__)
 
+STAGE = "3_availability_checker"
+
 
 @retry(3, backoff=1.0)
 @circuit_breaker(5, 60)
-@rate_limiter(max_calls=5, period=1.0)
+@rate_limiter(max_calls=5, period=1.0, key="whois")
 async def check_domain_availability(domain: str) -> bool:
-    """Simulate a WHOIS call returning availability."""
-    await asyncio.sleep(0)
-    return True
+    """Return whether ``domain`` is available according to the WHOIS provider.
+
+    Without a ``whois`` base URL (e.g. set by the provider simulator) the
+    call is simulated and every domain is available.
+    """
+    if not http_clients.configured("whois"):
+        await asyncio.sleep(0)
+        return True
+    api_key = get_settings().whois_api_key
+    resp = await get_http_client("whois").get(
+        "/whois",
+        params={"domain": domain},
+        headers={"Authorization": api_key} if api_key else None,
+    )
+    resp.raise_for_status()
+    return bool(resp.json()["available"])
+
+
+async def _check(row) -> tuple[int, bool, str] | None:
+    try:
+        return row["id"], await check_domain_availability(row["domain"]), row["domain"]
+    except Exception:
+        # leave the domain as 'new' so the next run retries it
+        logger.warning("Availability check failed for %s", row["domain"], exc_info=True)
+        return None
+
+
+async def _record(results: list[tuple[int, bool, str]]) -> None:
+    now = datetime.now(UTC)
+    async with get_db() as db, BatchWriter(db) as writer:
+        for domain_id, available, _ in results:
+            await writer.add(
+                "INSERT INTO availability_checks (domain_id, available, checked_at) VALUES (?, ?, ?)",
+                (domain_id, available, now),
+            )
+            await writer.add(
+                "UPDATE domains SET status = ? WHERE id = ?",
+                ("available" if available else "taken", domain_id),
+            )
+    available = sum(1 for _, is_available, _ in results if is_available)
+    progress.transition("new", "available", available)
+    progress.transition("new", "taken", len(results) - available)
+    progress.rows(STAGE, len(results))
+    checked = await get_domain_index(CHECKED_DOMAINS)
+    checked.add_many(domain for _, _, domain in results)
+    await checked.grow()
+
 
+async def check_one(row) -> list:
+    """Check and record a single domain, passing it on if available.
 
-@register_job(trigger="interval", minutes=60)
+    Domains that already have a check (e.g. re-emitted by an overlapping
+    sweep) are dropped without spending WHOIS quota.
+    """
+
+    checked = await get_domain_index(CHECKED_DOMAINS)
+    async with get_db(readonly=True) as db:
+        if not await checked.filter_new(db, [row["domain"]]):
+            return []
+    available = await check_domain_availability(row["domain"])
+    await _record([(row["id"], available, row["domain"])])
+    return [row] if available else []
+
+
+@register_job(trigger="interval", minutes=60, after="2_domain_generator")
+@progress.tracked(STAGE)
 async def run() -> None:
     """Check new domains for availability and record results."""
-    async with get_db() as db:
+    settings = get_settings()
+    async with get_db(readonly=True) as db:
         async with db.execute("SELECT id, domain FROM domains WHERE status = 'new'") as cursor:
             rows = await cursor.fetchall()
-        for row in rows:
-            available = await check_domain_availability(row["domain"])
-            await db.execute(
-                "INSERT INTO availability_checks (domain_id, available) VALUES (?, ?)",
-                (row["id"], available),
-            )
-            status = "available" if available else "taken"
-            await db.execute(
-                "UPDATE domains SET status = ? WHERE id = ?",
-                (status, row["id"]),
-            )
-        await db.commit()
-        logger.info("Checked availability for %d domains", len(rows))
+
+    pending = iter(rows)
+    buffer: list[tuple[int, bool, str]] = []
+    checked = failed = 0
+
+    async def worker() -> None:
+        nonlocal buffer, checked, failed
+        for row in pending:
+            result = await _check(row)
+            if result is None:
+                failed += 1
+                continue
+            buffer.append(result)
+            checked += 1
+            if len(buffer) >= settings.availability_batch_size:
+                batch, buffer = buffer, []
+                await _record(batch)
+
+    workers = min(settings.availability_concurrency, len(rows))
+    # a failing worker (e.g. a database error in _record) cancels its siblings
+    async with asyncio.TaskGroup() as group:
+        for _ in range(workers):
+            group.create_task(worker())
+    if buffer:
+        await _record(buffer)
+    logger.info("Checked availability for %d domains (%d failed)", checked, failed)
@@ -3,12 +3,17 @@
 from __future__ import annotations
 
 import asyncio
-import httpx
+from datetime import datetime, UTC
 
 from lucas_project.core import (
-    LLMCache,
+    BatchWriter,
+    MicroBatcher,
+    cache,
     get_db,
+    get_http_client,
     get_logger,
+    http_clients,
+    progress,
     register_job,
     rate_limiter,
     retry,
@@ -17,44 +22,94 @@ from lucas_project.core import (
 )
 
 logger = get_logger(__name__)
-cache = LLMCache()
+
+STAGE = "4_valuation"
 
 
 @retry(3, backoff=1.0)
 @circuit_breaker(5, 60)
-@rate_limiter(max_calls=5, period=1.0)
+@rate_limiter(max_calls=5, period=1.0, key="estibot")
 async def fetch_estibot(domain: str) -> float:
-    await asyncio.sleep(0)
-    return 100.0
+    """Appraise ``domain`` with EstiBot (simulated without a base URL)."""
+
+    if not http_clients.configured("estibot"):
+        await asyncio.sleep(0)
+        return 100.0
+    api_key = get_settings().estibot_api_key
+    resp = await get_http_client("estibot").get(
+        "/appraise",
+        params={"domain": domain},
+        headers={"Authorization": api_key} if api_key else None,
+    )
+    resp.raise_for_status()
+    return float(resp.json()["value"])
 
 
 @retry(3, backoff=1.0)
 @circuit_breaker(5, 60)
-@rate_limiter(max_calls=5, period=1.0)
-async def fetch_humbleworth(domain: str) -> float:
+@rate_limiter(max_calls=5, period=1.0, key="humbleworth")
+async def _post_humbleworth(domains: list[str]) -> dict[str, float | Exception]:
+    """Value ``domains`` with a single HumbleWorth request."""
+
     settings = get_settings()
-    url = "https://valuation.humbleworth.com/api/valuation"
-    payload = {"domains": [domain]}
+    payload = {"domains": domains}
     headers = {"Content-Type": "application/json"}
     if settings.humbleworth_api_key:
         headers["Authorization"] = settings.humbleworth_api_key
-    async with httpx.AsyncClient() as client:
-        resp = await client.post(url, headers=headers, json=payload, timeout=10)
-        resp.raise_for_status()
-        data = resp.json()
-    valuations = data.get("valuations", [])
-    if valuations:
-        val = valuations[0]
-        return float(val.get("marketplace", 0))
-    return 0.0
+    resp = await get_http_client("humbleworth").post(
+        "/api/valuation", headers=headers, json=payload
+    )
+    resp.raise_for_status()
+    data = resp.json()
+    results: dict[str, float | Exception] = {domain: 0.0 for domain in domains}
+    for position, val in enumerate(data.get("valuations", [])):
+        domain = val.get("domain")
+        if domain is None and position < len(domains):
+            domain = domains[position]
+        if domain not in results:
+            continue
+        if val.get("error"):
+            results[domain] = ValueError(f"HumbleWorth error for {domain}: {val['error']}")
+        else:
+            results[domain] = float(val.get("marketplace", 0))
+    return results
+
+
+_humbleworth_batcher: MicroBatcher[str, float] | None = None
+
+
+def humbleworth_batcher() -> MicroBatcher[str, float]:
+    """Return the shared HumbleWorth batcher, built from settings on first use."""
+
+    global _humbleworth_batcher
+    if _humbleworth_batcher is None:
+        settings = get_settings()
+        _humbleworth_batcher = MicroBatcher(
+            _post_humbleworth,
+            max_batch_size=settings.humbleworth_batch_size,
+            max_linger=settings.humbleworth_batch_linger,
+        )
+    return _humbleworth_batcher
+
+
+async def fetch_humbleworth(domain: str) -> float:
+    """Value ``domain``, sharing a HumbleWorth request with concurrent callers."""
+
+    return await humbleworth_batcher().submit(domain)
 
 
 @retry(3, backoff=1.0)
 @circuit_breaker(5, 60)
-@rate_limiter(max_calls=5, period=1.0)
+@rate_limiter(max_calls=5, period=1.0, key="godaddy")
 async def fetch_godaddy(domain: str) -> float:
-    await asyncio.sleep(0)
-    return 60.0
+    """Appraise ``domain`` with GoDaddy (simulated without a base URL)."""
+
+    if not http_clients.configured("godaddy"):
+        await asyncio.sleep(0)
+        return 60.0
+    resp = await get_http_client("godaddy").get(f"/v1/appraisal/{domain}")
+    resp.raise_for_status()
+    return float(resp.json()["govalue"])
 
 
 SERVICE_FUNCS = {
@@ -64,28 +119,72 @@ SERVICE_FUNCS = {
 }
 
 
-@register_job(trigger="interval", minutes=120)
+async def _valuate(domain: str) -> list[tuple[str, float]]:
+    async def lookup(service: str, func) -> tuple[str, float]:
+        key = f"valuation:{service}:{domain}"
+        value = cache.lookup(key)
+        if value is None:
+            value = await func(domain)
+            cache.store(key, value)
+        return service, value
+
+    return await asyncio.gather(
+        *(lookup(service, func) for service, func in SERVICE_FUNCS.items())
+    )
+
+
+async def _record(rows: list, results: list[list[tuple[str, float]]]) -> None:
+    now = datetime.now(UTC)
+    async with get_db() as db, BatchWriter(db) as writer:
+        for row, values in zip(rows, results):
+            await writer.add_many(
+                "INSERT INTO valuations (domain_id, service, value, created_at) VALUES (?, ?, ?, ?)",
+                ((row["id"], service, value, now) for service, value in values),
+            )
+            await writer.add(
+                "UPDATE domains SET status = 'valuated' WHERE id = ?",
+                (row["id"],),
+            )
+    progress.rows(STAGE, len(rows))
+    progress.transition("available", "valuated", len(rows))
+
+
+async def value_one(row) -> list:
+    """Value and record a single domain."""
+
+    await _record([row], [await _valuate(row["domain"])])
+    return [row]
+
+
+@register_job(trigger="interval", minutes=120, after="3_availability_checker")
+@progress.tracked(STAGE)
 async def run() -> None:
     """Value available domains using external services."""
-    async with get_db() as db:
+    chunk_size = get_settings().humbleworth_batch_size
+    async with get_db(readonly=True) as db:
         async with db.execute(
             "SELECT id, domain FROM domains WHERE status = 'available'"
         ) as cursor:
             rows = await cursor.fetchall()
-        for row in rows:
-            for service, func in SERVICE_FUNCS.items():
-                key = f"valuation:{service}:{row['domain']}"
-                value = cache.lookup(key)
-                if value is None:
-                    value = await func(row["domain"])
-                    cache.store(key, value)
-                await db.execute(
-                    "INSERT INTO valuations (domain_id, service, value) VALUES (?, ?, ?)",
-                    (row["id"], service, value),
+    valuated = failed = 0
+    for start in range(0, len(rows), chunk_size):
+        chunk = rows[start : start + chunk_size]
+        # value a whole chunk concurrently so HumbleWorth calls coalesce
+        results = await asyncio.gather(
+            *(_valuate(row["domain"]) for row in chunk), return_exceptions=True
+        )
+        done, values = [], []
+        for row, result in zip(chunk, results):
+            if isinstance(result, Exception):
+                # leave the domain as 'available' so the next run retries it
+                logger.warning(
+                    "Valuation failed for %s", row["domain"], exc_info=result
                 )
-            await db.execute(
-                "UPDATE domains SET status = 'valuated' WHERE id = ?",
-                (row["id"],),
-            )
-        await db.commit()
-        logger.info("Valuated %d domains", len(rows))
+                failed += 1
+                continue
+            done.append(row)
+            values.append(result)
+        if done:
+            await _record(done, values)
+        valuated += len(done)
+    logger.info("Valuated %d domains (%d failed)", valuated, failed)
@@ -1,10 +1,25 @@
-"""Monitor expiring domains and enforce free-tier limits."""
+"""Monitor expiring domains and enforce free-tier limits.
+
+Each service monitors at most ``cap`` domains. Every run ranks the domains
+a service already monitors together with the newly valuated ones by their
+average valuation and keeps the top ``cap`` using a bounded min-heap; only
+the difference to the current set is sent to the providers and written, in
+one batched transaction once every provider call is done.
+"""
 
 from __future__ import annotations
 
+import asyncio
+import heapq
+from collections.abc import Iterable
+
+import aiosqlite
+
 from lucas_project.core import (
+    BatchWriter,
     get_db,
     get_logger,
+    progress,
     register_job,
     rate_limiter,
     retry,
@@ -13,58 +28,157 @@ from lucas_project.core import (
 
 logger = get_logger(__name__)
 
+STAGE = "5_monitoring"
+
 UPTIME_ROBOT_CAP = 50
 FREE_DOMAIN_ALERTS_CAP = 20
+CAPS = {"UptimeRobot": UPTIME_ROBOT_CAP, "FreeDomainAlerts": FREE_DOMAIN_ALERTS_CAP}
 
+# domains valued by several services are ranked on their mean valuation
+_VALUATED_SQL = (
+    "SELECT d.id, COALESCE(AVG(v.value), 0) FROM domains d "
+    "LEFT JOIN valuations v ON v.domain_id = d.id "
+    "WHERE d.status = 'valuated' GROUP BY d.id"
+)
+_MONITORED_SQL = (
+    "SELECT m.domain_id, COALESCE(AVG(v.value), 0) FROM monitors m "
+    "LEFT JOIN valuations v ON v.domain_id = m.domain_id "
+    "WHERE m.service = ? GROUP BY m.domain_id"
+)
 
-async def _count_monitors(db, service: str) -> int:
-    async with db.execute(
-        "SELECT COUNT(*) FROM monitors WHERE service = ?",
-        (service,),
-    ) as cursor:
-        row = await cursor.fetchone()
-        return row[0] if row else 0
 
+def _service_key(service: str, domain_id: int) -> str:
+    """Give every monitoring service its own request budget."""
 
-async def _drop_lowest_value(db, service: str) -> None:
-    query = (
-        "SELECT m.id FROM monitors m "
-        "JOIN valuations v ON m.domain_id = v.domain_id "
-        "WHERE m.service = ? ORDER BY v.value ASC LIMIT 1"
-    )
-    async with db.execute(query, (service,)) as cursor:
-        row = await cursor.fetchone()
-    if row:
-        await db.execute("DELETE FROM monitors WHERE id = ?", (row[0],))
+    return f"monitoring:{service.lower()}"
 
 
 @retry(3, backoff=1.0)
 @circuit_breaker(5, 60)
-@rate_limiter(max_calls=5, period=1.0)
-async def _add_monitor(db, domain_id: int, service: str) -> None:
-    cap = UPTIME_ROBOT_CAP if service == "UptimeRobot" else FREE_DOMAIN_ALERTS_CAP
-    if await _count_monitors(db, service) >= cap:
-        await _drop_lowest_value(db, service)
-    await db.execute(
-        "INSERT INTO monitors (domain_id, service, monitor_ref) VALUES (?, ?, ?)",
-        (domain_id, service, f"{service}-{domain_id}"),
-    )
+@rate_limiter(max_calls=5, period=1.0, key=_service_key)
+async def _create_monitor(service: str, domain_id: int) -> str:
+    """Register ``domain_id`` with ``service`` and return its reference."""
+
+    return f"{service}-{domain_id}"
+
+
+@retry(3, backoff=1.0)
+@circuit_breaker(5, 60)
+@rate_limiter(max_calls=5, period=1.0, key=_service_key)
+async def _delete_monitor(service: str, domain_id: int) -> None:
+    """Remove ``domain_id`` from ``service``."""
+
+
+def top_k(values: Iterable[tuple[int, float]], k: int, current: set[int]) -> set[int]:
+    """Return the ids of the ``k`` most valuable domains.
+
+    Ties favour domains already in ``current`` (avoiding churn), then older
+    domains.
+    """
+
+    heap: list[tuple[float, bool, int]] = []
+    for domain_id, value in values:
+        entry = (value, domain_id in current, -domain_id)
+        if len(heap) < k:
+            heapq.heappush(heap, entry)
+        elif entry > heap[0]:
+            heapq.heapreplace(heap, entry)
+    return {-entry[2] for entry in heap}
+
+
+async def _monitored(db: aiosqlite.Connection, service: str) -> dict[int, float]:
+    async with db.execute(_MONITORED_SQL, (service,)) as cursor:
+        return {domain_id: value for domain_id, value in await cursor.fetchall()}
+
+
+async def plan_caps(
+    db: aiosqlite.Connection, candidates: dict[int, float]
+) -> dict[str, tuple[list[int], list[int]]]:
+    """Return the ``(added, removed)`` domain ids keeping each service at its top ``cap``.
+
+    ``candidates`` maps domain ids to values for domains that are not yet
+    monitored.
+    """
+
+    plan = {}
+    for service, cap in CAPS.items():
+        current = await _monitored(db, service)
+        pool = {**candidates, **current}
+        keep = top_k(pool.items(), cap, set(current))
+        plan[service] = (sorted(keep - current.keys()), sorted(current.keys() - keep))
+    return plan
+
+
+_lock: tuple[asyncio.AbstractEventLoop, asyncio.Lock] | None = None
+
+
+def _sync_lock() -> asyncio.Lock:
+    # runs rank on a reader, so overlapping runs must not act on stale plans
+    global _lock
+    loop = asyncio.get_running_loop()
+    if _lock is None or _lock[0] is not loop:
+        _lock = (loop, asyncio.Lock())
+    return _lock[1]
+
+
+async def sync_monitors(candidates: dict[int, float]) -> dict[str, dict[str, int]]:
+    """Offer ``candidates`` to every service and mark them as monitoring.
+
+    Ranking reads from a reader connection and provider calls hold no
+    connection at all; the writer is only taken to record the outcome.
+    """
+
+    async with _sync_lock():
+        async with get_db(readonly=True) as db:
+            plan = await plan_caps(db, candidates)
+        created: dict[str, list[tuple[int, str]]] = {}
+        for service, (added, removed) in plan.items():
+            for domain_id in removed:
+                await _delete_monitor(service, domain_id)
+            created[service] = [
+                (domain_id, await _create_monitor(service, domain_id)) for domain_id in added
+            ]
+        async with get_db() as db, BatchWriter(db) as writer:
+            for service, (_, removed) in plan.items():
+                await writer.add_many(
+                    "DELETE FROM monitors WHERE service = ? AND domain_id = ?",
+                    ((service, domain_id) for domain_id in removed),
+                )
+                await writer.add_many(
+                    "INSERT INTO monitors (domain_id, service, monitor_ref) VALUES (?, ?, ?)",
+                    ((domain_id, service, ref) for domain_id, ref in created[service]),
+                )
+            await writer.add_many(
+                "UPDATE domains SET status = 'monitoring' WHERE id = ?",
+                ((domain_id,) for domain_id in candidates),
+            )
+    return {
+        service: {"added": len(added), "removed": len(removed)}
+        for service, (added, removed) in plan.items()
+    }
+
+
+async def monitor_one(row) -> list:
+    """Offer a single valuated domain to every service's monitored set."""
+
+    async with get_db(readonly=True) as db, db.execute(
+        "SELECT COALESCE(AVG(value), 0) FROM valuations WHERE domain_id = ?",
+        (row["id"],),
+    ) as cursor:
+        value = (await cursor.fetchone())[0]
+    await sync_monitors({row["id"]: value})
+    progress.rows(STAGE)
+    progress.transition("valuated", "monitoring")
+    return []
 
 
 @register_job(trigger="interval", minutes=1440)
+@progress.tracked(STAGE)
 async def run() -> None:
     """Add monitors for valuated domains within free-tier caps."""
-    async with get_db() as db:
-        async with db.execute(
-            "SELECT id FROM domains WHERE status = 'valuated'"
-        ) as cursor:
-            domains = await cursor.fetchall()
-        for row in domains:
-            await _add_monitor(db, row["id"], "UptimeRobot")
-            await _add_monitor(db, row["id"], "FreeDomainAlerts")
-            await db.execute(
-                "UPDATE domains SET status = 'monitoring' WHERE id = ?",
-                (row["id"],),
-            )
-        await db.commit()
-        logger.info("Monitoring %d domains", len(domains))
+    async with get_db(readonly=True) as db, db.execute(_VALUATED_SQL) as cursor:
+        candidates = {domain_id: value for domain_id, value in await cursor.fetchall()}
+    changes = await sync_monitors(candidates)
+    progress.rows(STAGE, len(candidates))
+    progress.transition("valuated", "monitoring", len(candidates))
+    logger.info("Monitoring %d domains: %s", len(candidates), changes)
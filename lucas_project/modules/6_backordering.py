@@ -2,12 +2,17 @@
 
 from __future__ import annotations
 
-from lucas_project.core import get_db, get_logger, register_job
+from datetime import datetime, UTC
+
+from lucas_project.core import BatchWriter, get_db, get_logger, progress, register_job
 
 logger = get_logger(__name__)
 
+STAGE = "6_backordering"
+
 
 @register_job(trigger="cron", hour=0)
+@progress.tracked(STAGE)
 async def run() -> None:
     """Place backorders for monitored domains."""
     async with get_db() as db:
@@ -15,14 +20,17 @@ async def run() -> None:
             "SELECT id FROM domains WHERE status = 'monitoring'"
         ) as cursor:
             domains = await cursor.fetchall()
-        for row in domains:
-            await db.execute(
-                "INSERT INTO backorders (domain_id, provider) VALUES (?, ?)",
-                (row["id"], "NoWinNoFee"),
-            )
-            await db.execute(
-                "UPDATE domains SET status = 'backordered' WHERE id = ?",
-                (row["id"],),
-            )
-        await db.commit()
+        now = datetime.now(UTC)
+        async with BatchWriter(db) as writer:
+            for row in domains:
+                await writer.add(
+                    "INSERT INTO backorders (domain_id, provider, ordered_at) VALUES (?, ?, ?)",
+                    (row["id"], "NoWinNoFee", now),
+                )
+                await writer.add(
+                    "UPDATE domains SET status = 'backordered' WHERE id = ?",
+                    (row["id"],),
+                )
+        progress.rows(STAGE, len(domains))
+        progress.transition("monitoring", "backordered", len(domains))
         logger.info("Backordered %d domains", len(domains))
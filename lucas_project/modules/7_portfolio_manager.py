@@ -2,31 +2,64 @@
 
 from __future__ import annotations
 
-import csv
+import asyncio
 from datetime import date
-from pathlib import Path
 
-from lucas_project.core import get_db, get_logger, register_job
+from lucas_project.core import (
+    get_checkpoint,
+    get_db,
+    get_logger,
+    get_settings,
+    progress,
+    register_job,
+    set_checkpoint,
+)
+from lucas_project.core.exports import ExportWriter, stream_rows
 
 logger = get_logger(__name__)
 
+STAGE = "7_portfolio_manager"
 
-def _export_csv(rows: list[tuple[str, float]], path: Path) -> None:
-    with path.open("w", newline="", encoding="utf-8") as fh:
-        writer = csv.writer(fh)
-        writer.writerow(["domain", "estimated_value"])
-        writer.writerows(rows)
+# one row per owned domain, valued at the mean of its valuations
+_PORTFOLIO_SQL = (
+    "SELECT d.domain, AVG(v.value) FROM domains d "
+    "JOIN valuations v ON v.domain_id = d.id "
+    "WHERE d.status = 'owned' GROUP BY d.id ORDER BY d.id"
+)
+
+# bumped by triggers whenever an owned domain or its valuations change
+# (see ``models.PORTFOLIO_TRIGGERS``)
+_VERSION_SQL = "SELECT version FROM change_counters WHERE name = 'portfolio'"
+
+
+async def _portfolio_version(db) -> int:
+    """Return the change counter of the portfolio export's input."""
+
+    async with db.execute(_VERSION_SQL) as cursor:
+        row = await cursor.fetchone()
+    return row[0] if row else 0
 
 
 @register_job(trigger="cron", day_of_week="sun", hour=0)
-async def run() -> None:
-    """Export portfolio of owned domains."""
+@progress.tracked(STAGE)
+async def run(full_rebuild: bool = False) -> None:
+    """Export portfolio of owned domains if they changed.
+
+    The export is skipped when neither the set of owned domains nor their
+    valuations changed since the previous one, unless ``full_rebuild``.
+    """
+    async with get_db(readonly=True) as db:
+        watermark = await get_checkpoint(db, STAGE)
+        # read first: a change landing mid-export only causes one more export
+        latest = await _portfolio_version(db)
+        if latest == watermark and not full_rebuild:
+            logger.info("Portfolio unchanged since last export")
+            return
+        stem = get_settings().export_dir / f"portfolio_{date.today().isoformat()}"
+        with ExportWriter(stem, ("domain", "estimated_value")) as export:
+            async for chunk in stream_rows(db, _PORTFOLIO_SQL):
+                progress.rows(STAGE, await asyncio.to_thread(export.write, chunk))
     async with get_db() as db:
-        async with db.execute(
-            "SELECT domain, value FROM domains d JOIN valuations v ON d.id = v.domain_id WHERE d.status = 'owned'"
-        ) as cursor:
-            rows = await cursor.fetchall()
-        today = date.today().isoformat()
-        out_path = Path(f"lucas_project/data/portfolio_{today}.csv")
-        _export_csv([(r["domain"], r["value"]) for r in rows], out_path)
-        logger.info("Exported portfolio to %s", out_path)
+        await set_checkpoint(db, STAGE, latest)
+        await db.commit()
+    logger.info("Exported portfolio to %s", export.path)
@@ -2,34 +2,59 @@
 
 from __future__ import annotations
 
-from pathlib import Path
-
-from lucas_project.core import get_db, get_logger, register_job
+import asyncio
+
+from lucas_project.core import (
+    BatchWriter,
+    get_checkpoint,
+    get_db,
+    get_logger,
+    get_settings,
+    progress,
+    register_job,
+    set_checkpoint,
+)
+from lucas_project.core.exports import ExportWriter, stream_rows
 
 logger = get_logger(__name__)
 
+STAGE = "8_monetization"
 
-def _sedo_csv_row(domain: str, price: float) -> str:
-    return f"{domain},{price},USD"
+# one row per new backorder, priced at the domain's mean valuation; a domain
+# without valuations is listed without a price rather than skipped for good
+_BACKORDERED_SQL = (
+    "SELECT b.id AS backorder_id, d.id, d.domain, AVG(v.value) AS value FROM backorders b "
+    "JOIN domains d ON d.id = b.domain_id LEFT JOIN valuations v ON d.id = v.domain_id "
+    "WHERE d.status = 'backordered' AND b.id > ? GROUP BY b.id ORDER BY b.id"
+)
 
 
 @register_job(trigger="cron", day_of_week="mon", hour=1)
-async def run() -> None:
-    """Upload domains to marketplaces and update listings."""
+@progress.tracked(STAGE)
+async def run(full_rebuild: bool = False) -> None:
+    """Upload newly backordered domains to marketplaces and update listings.
+
+    Only backorders placed since the last run are listed unless
+    ``full_rebuild`` is set. Listings and the checkpoint are committed only
+    after the upload file is in place.
+    """
     async with get_db() as db:
-        async with db.execute(
-            "SELECT d.id, d.domain, v.value FROM domains d JOIN valuations v ON d.id = v.domain_id WHERE d.status = 'backordered'"
-        ) as cursor:
-            rows = await cursor.fetchall()
-        sedo_rows = []
-        for row in rows:
-            sedo_rows.append(_sedo_csv_row(row["domain"], row["value"]))
-            await db.execute(
-                "INSERT INTO listings (domain_id, marketplace, url, status) VALUES (?, ?, ?, ?)",
-                (row["id"], "Sedo", None, "listed"),
-            )
-        if sedo_rows:
-            csv_path = Path("lucas_project/data/sedo_upload.csv")
-            csv_path.write_text("\n".join(sedo_rows), encoding="utf-8")
-        await db.commit()
-        logger.info("Listed %d domains", len(rows))
+        watermark = 0 if full_rebuild else await get_checkpoint(db, STAGE)
+        stem = get_settings().export_dir / "sedo_upload"
+        last = watermark
+        writer = BatchWriter(db)
+        with ExportWriter(stem, ("domain", "price", "currency"), header=False, keep_empty=False) as export:
+            async for chunk in stream_rows(db, _BACKORDERED_SQL, (watermark,)):
+                await asyncio.to_thread(
+                    export.write, [(row["domain"], row["value"], "USD") for row in chunk]
+                )
+                await writer.add_many(
+                    "INSERT INTO listings (domain_id, marketplace, url, status) VALUES (?, ?, ?, ?)",
+                    ((row["id"], "Sedo", None, "listed") for row in chunk),
+                )
+                last = chunk[-1]["backorder_id"]
+        if export.rows:
+            await set_checkpoint(db, STAGE, last)
+        await writer.commit()
+        progress.rows(STAGE, export.rows)
+        logger.info("Listed %d domains", export.rows)
@@ -1,19 +1,34 @@
-"""Domain modules for Lucas project."""
+"""Domain modules for Lucas project.
+
+Stage modules are imported on demand with :func:`load`, so importing this
+package neither pulls in their dependencies nor registers their jobs.
+"""
 
 from importlib import import_module
+from types import ModuleType
+
+STAGES = (
+    "1_trend_discovery",
+    "2_domain_generator",
+    "3_availability_checker",
+    "4_valuation",
+    "5_monitoring",
+    "6_backordering",
+    "7_portfolio_manager",
+    "8_monetization",
+)
+MODULES = [f"{__name__}.{stage}" for stage in STAGES]
+
+
+def load(stage: str) -> ModuleType:
+    """Import and return stage module ``stage``, e.g. ``"4_valuation"``."""
 
-MODULES = [
-    "lucas_project.modules.1_trend_discovery",
-    "lucas_project.modules.2_domain_generator",
-    "lucas_project.modules.3_availability_checker",
-    "lucas_project.modules.4_valuation",
-    "lucas_project.modules.5_monitoring",
-    "lucas_project.modules.6_backordering",
-    "lucas_project.modules.7_portfolio_manager",
-    "lucas_project.modules.8_monetization",
-]
+    if stage not in STAGES:
+        raise KeyError(f"Unknown stage {stage!r}; expected one of {', '.join(STAGES)}")
+    return import_module(f"{__name__}.{stage}")
 
-for mod in MODULES:
-    import_module(mod)
 
+def load_all() -> dict[str, ModuleType]:
+    """Import every stage module, registering all pipeline jobs."""
 
+    return {stage: load(stage) for stage in STAGES}
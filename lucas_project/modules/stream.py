@@ -0,0 +1,66 @@
+"""Continuous streaming mode connecting the discovery-to-monitoring stages.
+
+Instead of waiting for each stage's polling job, items flow from trend
+discovery through generation, availability, valuation and monitoring as
+soon as they are produced. The scheduled ``run`` jobs remain registered
+and act as a recovery sweep for anything a stage failed to process.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from importlib import import_module
+
+from lucas_project.core import get_logger, get_settings
+from lucas_project.core.pipeline import Stage, StreamPipeline
+
+logger = get_logger(__name__)
+
+
+def build_pipeline() -> StreamPipeline:
+    """Wire stage handlers together with bounded queues."""
+
+    settings = get_settings()
+    generator = import_module("lucas_project.modules.2_domain_generator")
+    checker = import_module("lucas_project.modules.3_availability_checker")
+    valuation = import_module("lucas_project.modules.4_valuation")
+    monitoring = import_module("lucas_project.modules.5_monitoring")
+    size = settings.stream_queue_size
+    return StreamPipeline(
+        [
+            Stage("generate", generator.generate_for_seed, 1, size),
+            Stage(
+                "availability",
+                checker.check_one,
+                settings.availability_concurrency,
+                size,
+            ),
+            Stage(
+                "valuation",
+                valuation.value_one,
+                settings.humbleworth_batch_size,
+                size,
+            ),
+            Stage("monitoring", monitoring.monitor_one, 1, size),
+        ]
+    )
+
+
+async def run_stream(pipeline: StreamPipeline | None = None) -> None:
+    """Poll trend discovery and stream new seeds through the pipeline."""
+
+    settings = get_settings()
+    trend = import_module("lucas_project.modules.1_trend_discovery")
+    pipeline = pipeline or build_pipeline()
+    await pipeline.start()
+    try:
+        while True:
+            try:
+                for seed in await trend.discover():
+                    await pipeline.feed(seed)
+            except Exception:
+                logger.exception("Trend discovery failed")
+            logger.info("Stream latency: %s", pipeline.latency_percentiles())
+            await asyncio.sleep(settings.stream_discovery_interval)
+    finally:
+        await pipeline.stop(drain=False)
@@ -1,11 +1,62 @@
-"""Entry point for the Lucas project."""
+"""Entry point for the Lucas project.
 
-from lucas_project.core import *  # noqa: F401,F403
+``python main.py 4_valuation [...]`` runs the named stages once, importing
+only those stage modules. ``python main.py --stream`` runs the streaming
+pipeline until interrupted. Without arguments it just bootstraps.
+"""
 
+from __future__ import annotations
 
-def main() -> None:
-    """Placeholder main function."""
-    print("Lucas project bootstrap")
+import asyncio
+import sys
+
+
+async def _release() -> None:
+    from lucas_project.core import close_pools, http_clients, save_domain_indexes
+
+    await http_clients.aclose()
+    save_domain_indexes()
+    await close_pools()
+
+
+async def run_stages(names: list[str]) -> None:
+    """Run each stage in ``names`` once, in order."""
+
+    from lucas_project.modules import load
+
+    modules = [load(name) for name in names]
+    try:
+        for module in modules:
+            await module.run()
+    finally:
+        await _release()
+
+
+async def stream() -> None:
+    """Feed discovered trends through the streaming pipeline until cancelled."""
+
+    from lucas_project.modules.stream import run_stream
+
+    try:
+        await run_stream()
+    finally:
+        await _release()
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Run the stages named in ``argv`` or print the bootstrap message."""
+
+    names = sys.argv[1:] if argv is None else argv
+    if not names:
+        print("Lucas project bootstrap")
+        return
+    if names == ["--stream"]:
+        try:
+            asyncio.run(stream())
+        except KeyboardInterrupt:
+            pass
+        return
+    asyncio.run(run_stages(names))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,87 @@
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import pytest
+
+from lucas_project.core.aggregates import KpiAggregates
+from lucas_project.core.config import get_settings
+from lucas_project.core.db import get_db, get_engine
+from lucas_project.core.models import Base
+
+
+@pytest.mark.asyncio
+async def test_triggers_maintain_aggregates_and_rebuild_repairs_drift(tmp_path):
+    os.environ['LUCAS_DATABASE_URL'] = str(tmp_path / 'kpi.db')
+    get_settings.cache_clear()
+    Base.metadata.create_all(get_engine())
+    aggregates = KpiAggregates(max_staleness=0)
+
+    async with get_db() as db:
+        await db.executemany(
+            "INSERT INTO domains (domain, status, created_at) VALUES (?, 'new', CURRENT_TIMESTAMP)",
+            [('a.com',), ('b.com',), ('c.com',)],
+        )
+        await db.executemany(
+            'INSERT INTO valuations (domain_id, service, value, created_at) '
+            'VALUES (?, ?, ?, CURRENT_TIMESTAMP)',
+            [(1, 'estibot', 10.0), (1, 'godaddy', 5.0), (2, 'estibot', 7.0)],
+        )
+        await db.execute("UPDATE domains SET status = 'available' WHERE id IN (1, 3)")
+        await db.execute('DELETE FROM valuations WHERE service = ?', ('godaddy',))
+        await db.commit()
+
+    snapshot = await aggregates.snapshot()
+    assert snapshot['status'] == {
+        'new': {'domains': 1, 'value': 7.0},
+        'available': {'domains': 2, 'value': 10.0},
+    }
+    assert snapshot['service'] == {'estibot': {'valuations': 2, 'value': 17.0}}
+
+    async with get_db() as db:
+        await db.execute("UPDATE kpi_status SET domains = 99 WHERE status = 'new'")
+        await db.commit()
+    drift = await aggregates.rebuild()
+    assert list(drift) == ['status:new']
+    assert (await aggregates.snapshot())['status']['new'] == {'domains': 1, 'value': 7.0}
+    assert await aggregates.rebuild() == {}
+
+
+@pytest.mark.asyncio
+async def test_snapshot_is_served_from_memory_within_staleness(tmp_path):
+    os.environ['LUCAS_DATABASE_URL'] = str(tmp_path / 'kpi_cache.db')
+    get_settings.cache_clear()
+    Base.metadata.create_all(get_engine())
+    aggregates = KpiAggregates(max_staleness=60)
+
+    first = await aggregates.snapshot()
+    async with get_db() as db:
+        await db.execute("INSERT INTO domains (domain, status, created_at) VALUES ('x.com', 'new', CURRENT_TIMESTAMP)")
+        await db.commit()
+    assert await aggregates.snapshot() is first
+    aggregates.invalidate()
+    assert (await aggregates.snapshot())['status']['new']['domains'] == 1
+    assert aggregates.loads == 2
+
+
+@pytest.mark.parametrize(
+    ('migration', 'frozen'),
+    [
+        ('0004_kpi_aggregates', {'TRIGGERS': 'KPI_TRIGGERS', 'REBUILD_SQL': 'KPI_REBUILD_SQL'}),
+        ('0006_change_counters', {'TRIGGERS': 'PORTFOLIO_TRIGGERS'}),
+    ],
+)
+def test_migration_sql_matches_models(migration, frozen):
+    # changing the SQL in models needs a new migration freezing it; point this test there
+    import importlib.util
+
+    from lucas_project.core import models
+
+    path = Path(models.__file__).parents[1] / 'alembic' / 'versions' / f'{migration}.py'
+    spec = importlib.util.spec_from_file_location(migration, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    for name, model_name in frozen.items():
+        assert getattr(module, name) == getattr(models, model_name)
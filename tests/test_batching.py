@@ -0,0 +1,47 @@
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import pytest
+
+from lucas_project.core.batching import MicroBatcher
+
+
+@pytest.mark.asyncio
+async def test_cancelled_dispatch_cancels_waiters():
+    started = asyncio.Event()
+
+    async def handler(keys):
+        started.set()
+        await asyncio.sleep(10)
+        return {}
+
+    batcher = MicroBatcher(handler, max_batch_size=2)
+    waiters = [asyncio.create_task(batcher.submit(key)) for key in ('a', 'b')]
+    await started.wait()
+    for task in list(batcher._tasks):
+        task.cancel()
+    results = await asyncio.wait_for(asyncio.gather(*waiters, return_exceptions=True), 1)
+    assert all(isinstance(result, asyncio.CancelledError) for result in results)
+
+
+def test_batcher_flushes_on_a_new_loop_after_the_old_one_closed():
+    async def handler(keys):
+        return {key: key.upper() for key in keys}
+
+    batcher = MicroBatcher(handler, max_batch_size=10, max_linger=60)
+
+    async def abandon():
+        asyncio.get_running_loop().create_task(batcher.submit('stale'))
+        await asyncio.sleep(0)
+
+    asyncio.run(abandon())
+    assert batcher._timer is not None
+
+    async def submit():
+        batcher.max_linger = 0.01
+        return await asyncio.wait_for(batcher.submit('x'), 1)
+
+    assert asyncio.run(submit()) == 'X'
@@ -0,0 +1,36 @@
+import asyncio
+import importlib
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+harness = importlib.import_module('benchmarks.harness')
+
+
+def test_harness_runs_every_step_at_small_scale(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    results = asyncio.run(harness.run_suite(300, 0.0, tmp_path))
+    by_name = {result.name: result for result in results}
+    assert set(harness.STAGES) <= by_name.keys()
+    assert by_name['seed'].rows == 300
+    assert by_name['GET /api/domains (all pages)'].rows == 300
+    assert by_name['3_availability_checker'].rows > 0
+    assert all(result.sql >= 0 and result.peak_rss_mb > 0 for result in results)
+    assert {result.peak_rss_scope for result in results} <= {'step', 'process'}
+    # stubs are restored afterwards
+    availability = importlib.import_module('lucas_project.modules.3_availability_checker')
+    assert hasattr(availability.check_domain_availability, '__wrapped__')
+
+
+def test_compare_flags_slower_steps_and_extra_sql():
+    baseline = {'a': {'seconds': 1.0, 'sql': 10}, 'b': {'seconds': 0.01, 'sql': 10}}
+    results = [
+        {'name': 'a', 'seconds': 1.5, 'sql': 10},
+        {'name': 'b', 'seconds': 0.03, 'sql': 20},
+        {'name': 'c', 'seconds': 9.0, 'sql': 99},
+    ]
+    regressions = harness.compare(results, baseline, 0.25)
+    assert len(regressions) == 2
+    assert regressions[0].startswith('a: 1.500s')
+    assert 'SQL statements' in regressions[1]
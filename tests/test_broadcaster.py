@@ -0,0 +1,87 @@
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import pytest
+
+from lucas_project.core.orchestrator import WebSocketBroadcaster
+
+
+class FakeSocket:
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.received = []
+        self.closed = False
+        self.gate = asyncio.Event()
+        self.gate.set()
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, message):
+        await self.gate.wait()
+        await asyncio.sleep(self.delay)
+        self.received.append(message)
+
+    async def close(self):
+        self.closed = True
+
+
+async def _settle():
+    await asyncio.sleep(0.01)
+
+
+@pytest.mark.asyncio
+async def test_slow_client_does_not_block_others_and_drops_oldest():
+    broadcaster = WebSocketBroadcaster(queue_size=2, policy='drop_oldest')
+    fast, slow = FakeSocket(), FakeSocket()
+    slow.gate.clear()
+    await broadcaster.connect(fast)
+    await broadcaster.connect(slow)
+
+    await broadcaster.broadcast({'n': 0})
+    await _settle()
+    for n in range(1, 4):
+        await asyncio.wait_for(broadcaster.broadcast({'n': n}), 0.1)
+    await _settle()
+    assert fast.received == [f'{{"n": {n}}}' for n in range(4)]
+
+    slow.gate.set()
+    await _settle()
+    # message 0 was in flight; 1 was dropped once the queue held two
+    assert slow.received == ['{"n": 0}', '{"n": 2}', '{"n": 3}']
+    assert broadcaster.stats.dropped == 1
+    assert broadcaster.latency_percentiles()['max'] >= 0
+    await broadcaster.aclose()
+
+
+@pytest.mark.asyncio
+async def test_coalesce_and_disconnect_policies():
+    coalescing = WebSocketBroadcaster(queue_size=10, policy='coalesce')
+    ws = FakeSocket()
+    ws.gate.clear()
+    await coalescing.connect(ws)
+    await coalescing.broadcast('first', key='kpis')
+    await _settle()
+    for value in ['a', 'b', 'c']:
+        await coalescing.broadcast(value, key='kpis')
+    await coalescing.broadcast('other')
+    ws.gate.set()
+    await _settle()
+    assert ws.received == ['first', 'c', 'other']
+    assert coalescing.stats.coalesced == 2
+    await coalescing.aclose()
+
+    strict = WebSocketBroadcaster(queue_size=1, policy='disconnect')
+    slow = FakeSocket()
+    slow.gate.clear()
+    await strict.connect(slow)
+    for value in ['x', 'y', 'z']:
+        await strict.broadcast(value)
+        await _settle()
+    assert slow not in strict.connections
+    assert slow.closed
+    assert strict.stats.disconnected == 1
+    await strict.aclose()
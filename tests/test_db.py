@@ -0,0 +1,100 @@
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import pytest
+
+from lucas_project.core.config import get_settings
+from lucas_project.core.db import get_db, pool_stats
+
+
+@pytest.mark.asyncio
+async def test_pool_reuses_connections_and_discards_uncommitted(tmp_path):
+    os.environ['LUCAS_DATABASE_URL'] = str(tmp_path / 'pool.db')
+    get_settings.cache_clear()
+
+    async with get_db() as db:
+        await db.execute('CREATE TABLE t (x INTEGER)')
+        await db.commit()
+        first = db
+    async with get_db() as db:
+        assert db is first
+        await db.execute('INSERT INTO t VALUES (1)')
+    async with get_db(readonly=True) as db:
+        async with db.execute('PRAGMA journal_mode') as cur:
+            assert (await cur.fetchone())[0] == 'wal'
+        async with db.execute('SELECT COUNT(*) FROM t') as cur:
+            assert (await cur.fetchone())[0] == 0
+
+    stats = pool_stats()
+    assert stats['opened'] == 2
+    assert stats['checkouts'] == 3
+
+
+@pytest.mark.asyncio
+async def test_nested_read_without_readers_shares_writer(tmp_path, monkeypatch):
+    os.environ['LUCAS_DATABASE_URL'] = str(tmp_path / 'nested.db')
+    monkeypatch.setenv('LUCAS_DB_POOL_READERS', '0')
+    get_settings.cache_clear()
+    async with get_db() as db:
+        await db.execute('CREATE TABLE t (x INTEGER)')
+        await db.execute('INSERT INTO t VALUES (1)')
+        async with get_db(readonly=True) as nested:
+            assert nested is db
+            async with nested.execute('SELECT COUNT(*) FROM t') as cur:
+                assert (await cur.fetchone())[0] == 1
+        assert db.in_transaction
+        with pytest.raises(RuntimeError):
+            async with get_db():
+                pass
+        await db.commit()
+    async with get_db(readonly=True) as db:
+        async with db.execute('SELECT COUNT(*) FROM t') as cur:
+            assert (await cur.fetchone())[0] == 1
+    get_settings.cache_clear()
+
+
+@pytest.mark.asyncio
+async def test_first_reader_sees_wal_and_spawned_tasks_wait_for_writer(tmp_path, monkeypatch):
+    import asyncio
+
+    os.environ['LUCAS_DATABASE_URL'] = str(tmp_path / 'first.db')
+    monkeypatch.setenv('LUCAS_DB_POOL_READERS', '1')
+    get_settings.cache_clear()
+    async with get_db(readonly=True) as db:
+        async with db.execute('PRAGMA journal_mode') as cur:
+            assert (await cur.fetchone())[0] == 'wal'
+
+    monkeypatch.setenv('LUCAS_DATABASE_URL', str(tmp_path / 'spawned.db'))
+    monkeypatch.setenv('LUCAS_DB_POOL_READERS', '0')
+    get_settings.cache_clear()
+    order = []
+
+    async def child():
+        async with get_db(readonly=True):
+            order.append('child')
+
+    async with get_db():
+        task = asyncio.create_task(child())
+        await asyncio.sleep(0.05)
+        order.append('parent done')
+    await task
+    assert order == ['parent done', 'child']
+    get_settings.cache_clear()
+
+
+@pytest.mark.asyncio
+async def test_batch_writer_counts_rows_actually_changed(tmp_path, monkeypatch):
+    from lucas_project.core.writer import BatchWriter
+
+    monkeypatch.setenv('LUCAS_DATABASE_URL', str(tmp_path / 'changes.db'))
+    get_settings.cache_clear()
+    async with get_db() as db:
+        await db.execute('CREATE TABLE t (x INTEGER PRIMARY KEY)')
+        async with BatchWriter(db) as writer:
+            await writer.add_many('INSERT OR IGNORE INTO t VALUES (?)', [(1,), (2,), (1,)])
+    assert writer.rows == 3
+    assert writer.changes == 2
+    get_settings.cache_clear()
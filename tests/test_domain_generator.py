@@ -0,0 +1,28 @@
+import importlib
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+gen = importlib.import_module('lucas_project.modules.2_domain_generator')
+
+
+def test_rule_set_variants_are_valid_and_deduplicated():
+    rules = gen.RuleSet(
+        tlds=('com', 'io'), prefixes=('get',), hyphenate=True, inflect=True, abbreviate=True
+    )
+    engine = gen.CandidateEngine(rules)
+    pairs = list(engine.generate([(1, 'React Native'), (2, 'reactNative'), (3, 'Café!')]))
+
+    domains = [domain for _, domain in pairs]
+    assert len(domains) == len(set(domains))
+    assert {'reactnative.com', 'react-native.io', 'getreactnative.com', 'reactnatives.com', 'rn.com'} <= set(domains)
+    assert all(seed_id != 2 for seed_id, _ in pairs)
+    assert 'xn--caf-dma.com' in domains
+
+
+def test_normalize_label_rejects_invalid_labels():
+    assert gen.normalize_label('-abc-') == 'abc'
+    assert gen.normalize_label('ab--c') is None
+    assert gen.normalize_label('x' * 64) is None
+    assert gen.normalize_label('a_b') is None
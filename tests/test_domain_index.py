@@ -0,0 +1,78 @@
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import pytest
+
+from lucas_project.core.config import get_settings
+from lucas_project.core.db import get_db, get_engine
+from lucas_project.core.domain_index import KNOWN_DOMAINS, BloomFilter, DomainIndex
+from lucas_project.core.models import Base
+
+
+def test_bloom_filter_false_positive_rate_is_bounded():
+    bloom = BloomFilter(10_000, 0.01)
+    for i in range(10_000):
+        bloom.add(f'known{i}.com')
+    assert all(f'known{i}.com' in bloom for i in range(10_000))
+    false_positives = sum(f'other{i}.com' in bloom for i in range(10_000))
+    assert false_positives < 300
+    assert bloom.estimated_fpr() < 0.02
+
+
+@pytest.mark.asyncio
+async def test_domain_index_filters_known_and_restores_snapshot(tmp_path):
+    os.environ['LUCAS_DATABASE_URL'] = str(tmp_path / 'index.db')
+    get_settings.cache_clear()
+    Base.metadata.create_all(get_engine())
+    async with get_db() as db:
+        await db.executemany(
+            'INSERT INTO domains (domain, status, created_at) VALUES (?, ?, CURRENT_TIMESTAMP)',
+            [(f'd{i}.com', 'new') for i in range(100)],
+        )
+        await db.commit()
+
+    snapshot = tmp_path / 'index.bloom'
+    index = DomainIndex(KNOWN_DOMAINS, capacity=1000, error_rate=0.01, snapshot_path=snapshot)
+    async with get_db(readonly=True) as db:
+        await index.load(db)
+        assert await index.filter_new(db, ['d1.com', 'fresh.com', 'd2.com']) == ['fresh.com']
+    index.save()
+
+    async with get_db() as db:
+        await db.execute(
+            "INSERT INTO domains (domain, status, created_at) VALUES ('late.com', 'new', CURRENT_TIMESTAMP)"
+        )
+        await db.commit()
+    restored = DomainIndex(KNOWN_DOMAINS, capacity=1000, error_rate=0.01, snapshot_path=snapshot)
+    async with get_db(readonly=True) as db:
+        await restored.load(db)
+    assert restored.max_id == 101
+    assert restored.might_contain('d5.com') and restored.might_contain('late.com')
+    assert restored.stats()['entries'] == 101
+
+
+@pytest.mark.asyncio
+async def test_domain_index_grows_past_capacity_at_runtime(tmp_path, monkeypatch):
+    monkeypatch.setenv('LUCAS_DATABASE_URL', str(tmp_path / 'grow.db'))
+    get_settings.cache_clear()
+    Base.metadata.create_all(get_engine())
+    index = DomainIndex(KNOWN_DOMAINS, capacity=10, error_rate=0.01)
+    async with get_db(readonly=True) as db:
+        await index.load(db)
+    domains = [f'g{i}.com' for i in range(50)]
+    async with get_db() as db:
+        await db.executemany(
+            "INSERT INTO domains (domain, status, created_at) VALUES (?, 'new', CURRENT_TIMESTAMP)",
+            [(domain,) for domain in domains],
+        )
+        await db.commit()
+    index.add_many(domains)
+    assert index.over_capacity
+    await index.grow()
+    assert index.bloom.capacity > 10 and index.max_id == 50
+    assert not index.over_capacity
+    assert all(index.might_contain(domain) for domain in domains)
+    get_settings.cache_clear()
@@ -0,0 +1,83 @@
+import sys
+import zlib
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from lucas_project.core.embeddings import EmbeddingEngine
+
+
+def _encoder(calls):
+    def encode(texts):
+        calls.append(list(texts))
+        # texts sharing their first five letters get identical vectors
+        return np.array(
+            [[(zlib.crc32(text[:5].encode()) >> shift) % 7 + 1 for shift in range(8)] for text in texts],
+            dtype=np.float32,
+        )
+
+    return encode
+
+
+@pytest.mark.parametrize('ann_threshold', [1000, 1])
+def test_collapse_groups_near_duplicates(tmp_path, ann_threshold):
+    calls = []
+    engine = EmbeddingEngine(
+        model_name='fake', store_path=tmp_path, ann_threshold=ann_threshold, encoder=_encoder(calls)
+    )
+    leaders = engine.collapse(['react', 'vue', 'reactjs', 'react-native', 'vue'], 0.99)
+    assert leaders == {'react': 'react', 'vue': 'vue', 'reactjs': 'react', 'react-native': 'react'}
+
+
+def test_collapse_compares_new_texts_against_earlier(tmp_path):
+    calls = []
+    engine = EmbeddingEngine(model_name='fake', store_path=tmp_path, encoder=_encoder(calls))
+    engine.embed(['react', 'vue'])
+    leaders = engine.collapse(['reactjs', 'svelte', 'sveltekit'], 0.99, earlier=['react', 'vue'])
+    assert leaders == {'reactjs': 'react', 'svelte': 'svelte', 'sveltekit': 'svelte'}
+    assert calls == [['react', 'vue'], ['reactjs', 'svelte', 'sveltekit']]
+
+
+def test_vectors_are_cached_on_disk(tmp_path):
+    calls = []
+    EmbeddingEngine(model_name='fake', store_path=tmp_path, batch_size=2, encoder=_encoder(calls)).embed(
+        ['a', 'b', 'c']
+    )
+    assert calls == [['a', 'b'], ['c']]
+
+    again = []
+    engine = EmbeddingEngine(model_name='fake', store_path=tmp_path, encoder=_encoder(again))
+    vectors = engine.embed(['c', 'a', 'd'])
+    assert again == [['d']]
+    assert vectors.shape == (3, 8)
+    assert np.allclose(np.linalg.norm(vectors, axis=1), 1.0)
+
+
+def test_lsh_finds_similar_but_not_identical_vectors(tmp_path):
+    rng = np.random.default_rng(1)
+    bases = rng.standard_normal((40, 64)).astype(np.float32)
+    bases /= np.linalg.norm(bases, axis=1, keepdims=True)
+    vectors = {f'base{i}': base for i, base in enumerate(bases)}
+    for i, base in enumerate(bases):
+        # cosine ~0.95 to its base, far from every other base
+        noise = rng.standard_normal(64).astype(np.float32)
+        noise -= noise @ base * base
+        vectors[f'near{i}'] = base + 0.33 * noise / np.linalg.norm(noise)
+
+    def encode(texts):
+        return np.array([vectors[text] for text in texts])
+
+    texts = [f'base{i}' for i in range(30)] + [f'near{i}' for i in range(40)]
+    earlier = [f'base{i}' for i in range(30, 40)]
+    exact = EmbeddingEngine(model_name='fake', store_path=tmp_path, ann_threshold=10**6, encoder=encode)
+    approx = EmbeddingEngine(model_name='fake', store_path=tmp_path, ann_threshold=1, encoder=encode)
+    expected = {
+        **{f'base{i}': f'base{i}' for i in range(30)},
+        **{f'near{i}': f'base{i}' for i in range(40)},
+    }
+    assert exact.collapse(texts, 0.85, earlier=earlier) == expected
+    assert approx.collapse(texts, 0.85, earlier=earlier) == expected
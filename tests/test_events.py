@@ -0,0 +1,80 @@
+import asyncio
+import importlib
+import json
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import pytest
+
+from lucas_project.core import progress
+from lucas_project.core.config import get_settings
+from lucas_project.core.db import get_db, get_engine
+from lucas_project.core.events import ProgressHub
+from lucas_project.core.models import Base
+from lucas_project.core.orchestrator import WebSocketBroadcaster
+
+
+class FakeSocket:
+    def __init__(self):
+        self.received = []
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, message):
+        self.received.append(json.loads(message))
+
+    async def close(self):
+        pass
+
+
+@pytest.mark.asyncio
+async def test_deltas_are_aggregated_per_tick_and_routed_by_topic():
+    broadcaster = WebSocketBroadcaster(policy='coalesce')
+    hub = ProgressHub(broadcaster.broadcast, tick=60)
+    stages, statuses = FakeSocket(), FakeSocket()
+    await broadcaster.connect(stages)
+    await broadcaster.connect(statuses)
+    broadcaster.subscribe(stages, ['stage.*'])
+    broadcaster.subscribe(statuses, ['domains.status'])
+
+    with hub.track('6_backordering'):
+        for _ in range(3):
+            hub.rows('6_backordering', 2)
+        hub.transition('monitoring', 'backordered', 6)
+    assert await hub.flush() == 2
+    assert await hub.flush() == 0
+    await asyncio.sleep(0.01)
+
+    [stage] = stages.received
+    assert stage['topic'] == 'stage.6_backordering'
+    assert stage['delta']['rows'] == 6 and stage['delta']['runs'] == 1
+    assert stage['delta']['rows_per_sec'] > 0
+    assert statuses.received == [{
+        'topic': 'domains.status',
+        'delta': {'monitoring': -6, 'backordered': 6},
+        'totals': {'monitoring': -6, 'backordered': 6},
+    }]
+    await broadcaster.aclose()
+
+
+@pytest.mark.asyncio
+async def test_stage_run_emits_progress(tmp_path):
+    os.environ['LUCAS_DATABASE_URL'] = str(tmp_path / 'events.db')
+    get_settings.cache_clear()
+    Base.metadata.create_all(get_engine())
+    backordering = importlib.import_module('lucas_project.modules.6_backordering')
+    async with get_db() as db:
+        await db.execute(
+            "INSERT INTO domains (domain, status, created_at) VALUES ('a.com', 'monitoring', CURRENT_TIMESTAMP)"
+        )
+        await db.commit()
+
+    progress.pending()
+    await backordering.run()
+    messages = {message['topic']: message['delta'] for message in progress.pending()}
+    assert messages['stage.6_backordering']['rows'] == 1
+    assert messages['domains.status'] == {'monitoring': -1, 'backordered': 1}
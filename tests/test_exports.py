@@ -0,0 +1,161 @@
+import csv
+import gzip
+import importlib
+import importlib.util
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import pytest
+
+from lucas_project.core.config import get_settings
+from lucas_project.core.db import get_db, get_engine
+from lucas_project.core.exports import ExportWriter, stream_rows
+from lucas_project.core.models import Base
+
+
+def test_csv_and_gzip_exports_are_published_atomically(tmp_path):
+    with ExportWriter(tmp_path / 'plain', ('domain', 'value'), format='csv') as export:
+        export.write([('a.com', 1.5)])
+        assert not export.path.exists()
+        export.write([('b.com', 2.0)])
+    assert export.path.read_text() == 'domain,value\na.com,1.5\nb.com,2.0\n'
+
+    with ExportWriter(tmp_path / 'packed', ('domain',), format='csv.gz', header=False) as export:
+        export.write([('a.com',)])
+    with gzip.open(tmp_path / 'packed.csv.gz', 'rt') as fh:
+        assert fh.read() == 'a.com\n'
+
+    with pytest.raises(RuntimeError):
+        with ExportWriter(tmp_path / 'plain', ('domain', 'value'), format='csv') as export:
+            export.write([('c.com', 3.0)])
+            raise RuntimeError
+    assert 'c.com' not in (tmp_path / 'plain.csv').read_text()
+    assert sorted(p.name for p in tmp_path.iterdir()) == ['packed.csv.gz', 'plain.csv']
+
+    with ExportWriter(tmp_path / 'empty', ('domain',), keep_empty=False) as export:
+        pass
+    assert not export.path.exists()
+
+
+@pytest.mark.skipif(importlib.util.find_spec('pyarrow') is not None, reason='pyarrow installed')
+def test_parquet_falls_back_to_csv_without_pyarrow(tmp_path):
+    with ExportWriter(tmp_path / 'cols', ('domain',), format='parquet') as export:
+        export.write([('a.com',)])
+    assert export.path.name == 'cols.csv'
+
+
+@pytest.mark.asyncio
+async def test_portfolio_export_streams_one_row_per_domain(tmp_path, monkeypatch):
+    monkeypatch.setenv('LUCAS_DATABASE_URL', str(tmp_path / 'exports.db'))
+    monkeypatch.setenv('LUCAS_EXPORT_DIR', str(tmp_path / 'out'))
+    get_settings.cache_clear()
+    Base.metadata.create_all(get_engine())
+    portfolio = importlib.import_module('lucas_project.modules.7_portfolio_manager')
+    async with get_db() as db:
+        await db.executemany(
+            "INSERT INTO domains (id, domain, status, created_at) VALUES (?, ?, 'owned', CURRENT_TIMESTAMP)",
+            [(i, f'd{i}.com') for i in range(1, 6)],
+        )
+        await db.executemany(
+            'INSERT INTO valuations (domain_id, service, value, created_at) VALUES (?, ?, ?, CURRENT_TIMESTAMP)',
+            [(i, service, value * i) for i in range(1, 6) for service, value in (('EstiBot', 10), ('GoDaddy', 30))],
+        )
+        await db.commit()
+        chunks = [len(chunk) async for chunk in stream_rows(db, 'SELECT id FROM domains', chunk_size=2)]
+    assert chunks == [2, 2, 1]
+
+    await portfolio.run(full_rebuild=True)
+    [path] = (tmp_path / 'out').glob('portfolio_*.csv')
+    with path.open() as fh:
+        rows = list(csv.reader(fh))
+    assert rows[0] == ['domain', 'estimated_value']
+    assert rows[1:] == [[f'd{i}.com', str(20.0 * i)] for i in range(1, 6)]
+
+
+@pytest.mark.asyncio
+async def test_portfolio_export_follows_owned_domains(tmp_path, monkeypatch):
+    monkeypatch.setenv('LUCAS_DATABASE_URL', str(tmp_path / 'owned.db'))
+    monkeypatch.setenv('LUCAS_EXPORT_DIR', str(tmp_path / 'out'))
+    get_settings.cache_clear()
+    Base.metadata.create_all(get_engine())
+    portfolio = importlib.import_module('lucas_project.modules.7_portfolio_manager')
+    async with get_db() as db:
+        await db.executemany(
+            "INSERT INTO domains (id, domain, status, created_at) VALUES (?, ?, ?, CURRENT_TIMESTAMP)",
+            [(1, 'a.com', 'owned'), (2, 'b.com', 'valuated')],
+        )
+        await db.executemany(
+            "INSERT INTO valuations (domain_id, service, value, created_at) VALUES (?, 'EstiBot', 10, CURRENT_TIMESTAMP)",
+            [(1,), (2,)],
+        )
+        await db.commit()
+
+    def exported():
+        [path] = (tmp_path / 'out').glob('portfolio_*.csv')
+        with path.open() as fh:
+            return [row[0] for row in list(csv.reader(fh))[1:]]
+
+    await portfolio.run()
+    assert exported() == ['a.com']
+    next((tmp_path / 'out').glob('portfolio_*.csv')).unlink()
+    await portfolio.run()
+    assert not list((tmp_path / 'out').glob('portfolio_*.csv'))
+
+    async with get_db() as db:
+        await db.execute("UPDATE domains SET status = 'owned' WHERE id = 2")
+        await db.commit()
+    await portfolio.run()
+    assert exported() == ['a.com', 'b.com']
+
+    # a revaluation that keeps the row count and ids must still re-export
+    next((tmp_path / 'out').glob('portfolio_*.csv')).unlink()
+    async with get_db() as db:
+        await db.execute('UPDATE valuations SET value = 99 WHERE domain_id = 1')
+        await db.commit()
+    await portfolio.run()
+    assert exported() == ['a.com', 'b.com']
+
+
+@pytest.mark.asyncio
+async def test_monetization_commits_after_the_upload_file_is_in_place(tmp_path, monkeypatch):
+    monkeypatch.setenv('LUCAS_DATABASE_URL', str(tmp_path / 'sedo.db'))
+    monkeypatch.setenv('LUCAS_EXPORT_DIR', str(tmp_path / 'out'))
+    get_settings.cache_clear()
+    Base.metadata.create_all(get_engine())
+    monetization = importlib.import_module('lucas_project.modules.8_monetization')
+    async with get_db() as db:
+        await db.executemany(
+            "INSERT INTO domains (id, domain, status, created_at) VALUES (?, ?, 'backordered', CURRENT_TIMESTAMP)",
+            [(1, 'valued.com'), (2, 'unvalued.com')],
+        )
+        await db.execute(
+            "INSERT INTO valuations (domain_id, service, value, created_at) VALUES (1, 'EstiBot', 10, CURRENT_TIMESTAMP)"
+        )
+        await db.executemany(
+            "INSERT INTO backorders (domain_id, provider, ordered_at) VALUES (?, 'NoWinNoFee', CURRENT_TIMESTAMP)",
+            [(1,), (2,)],
+        )
+        await db.commit()
+
+    async def listed():
+        async with get_db(readonly=True) as db, db.execute(
+            'SELECT domain_id FROM listings ORDER BY domain_id'
+        ) as cur:
+            return [row[0] for row in await cur.fetchall()]
+
+    def failing_replace(src, dst):
+        raise OSError('disk full')
+
+    with monkeypatch.context() as patch:
+        patch.setattr('lucas_project.core.exports.os.replace', failing_replace)
+        # the job engine logs the failure; nothing may be committed
+        await monetization.run()
+    assert await listed() == []
+
+    await monetization.run()
+    assert await listed() == [1, 2]
+    with (tmp_path / 'out' / 'sedo_upload.csv').open() as fh:
+        assert list(csv.reader(fh)) == [['valued.com', '10.0', 'USD'], ['unvalued.com', '', 'USD']]
+    get_settings.cache_clear()
@@ -0,0 +1,70 @@
+import importlib
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import httpx
+import pytest
+
+from lucas_project.core.http import http_clients
+
+valuation = importlib.import_module('lucas_project.modules.4_valuation')
+
+
+@pytest.mark.asyncio
+async def test_fetchers_share_client_and_accept_mock_transport():
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        domains = json.loads(request.content)['domains']
+        return httpx.Response(
+            200, json={'valuations': [{'domain': d, 'marketplace': 42} for d in domains]}
+        )
+
+    http_clients.set_transport(httpx.MockTransport(handler))
+    try:
+        client = http_clients.get('humbleworth')
+        assert await valuation.fetch_humbleworth('a.com') == 42.0
+        assert await valuation.fetch_humbleworth('b.com') == 42.0
+        assert http_clients.get('humbleworth') is client
+    finally:
+        await http_clients.aclose()
+        http_clients.set_transport(None)
+
+    assert [str(r.url) for r in requests] == [
+        'https://valuation.humbleworth.com/api/valuation'
+    ] * 2
+
+
+@pytest.mark.asyncio
+async def test_humbleworth_calls_coalesce_into_one_request():
+    import asyncio
+
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        domains = json.loads(request.content)['domains']
+        requests.append(domains)
+        return httpx.Response(200, json={'valuations': [
+            {'domain': d, 'error': 'bad'} if d == 'bad.com' else {'domain': d, 'marketplace': len(d)}
+            for d in domains
+        ]})
+
+    http_clients.set_transport(httpx.MockTransport(handler))
+    try:
+        results = await asyncio.gather(
+            *(valuation.fetch_humbleworth(d) for d in ['a.com', 'bad.com', 'bb.com', 'a.com']),
+            return_exceptions=True,
+        )
+    finally:
+        await http_clients.aclose()
+        http_clients.set_transport(None)
+
+    assert len(requests) == 1
+    assert sorted(requests[0]) == ['a.com', 'bad.com', 'bb.com']
+    assert results[0] == results[3] == 5.0
+    assert isinstance(results[1], ValueError)
+    assert results[2] == 6.0
@@ -0,0 +1,72 @@
+import importlib
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+bench_imports = importlib.import_module('benchmarks.bench_imports')
+
+# about twice the median measured on a loaded CI host; the median of a few
+# runs keeps a single slow start from failing the test
+IMPORT_BUDGET_MS = 800
+
+# heavy dependencies and stage modules that importing the core must not load
+DEFERRED = (
+    'fastapi',
+    'sqlalchemy',
+    'httpx',
+    'numpy',
+    'sentence_transformers',
+    *(
+        f'lucas_project.modules.{name}'
+        for name in (
+            '1_trend_discovery',
+            '2_domain_generator',
+            '3_availability_checker',
+            '4_valuation',
+            '5_monitoring',
+            '6_backordering',
+            '7_portfolio_manager',
+            '8_monetization',
+            'stream',
+        )
+    ),
+)
+
+
+def _import(code):
+    return subprocess.run(
+        [sys.executable, '-c', code],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+
+def test_core_import_is_light_and_side_effect_free():
+    result = _import(
+        'import sys, lucas_project.core as core, lucas_project.modules; '
+        f'print([m for m in {DEFERRED!r} if m in sys.modules]); '
+        'print(core.scheduler.running, core.cache._cache, len(core.jobs.jobs))'
+    )
+    loaded, state = result.stdout.splitlines()
+    assert loaded == '[]'
+    assert state == 'False None 0'
+
+
+def test_stage_modules_load_by_name():
+    result = _import(
+        'import sys; from lucas_project.modules import load; load("6_backordering"); '
+        'from lucas_project.core import jobs; '
+        'print(sorted(jobs.jobs), "lucas_project.modules.4_valuation" in sys.modules)'
+    )
+    assert result.stdout.strip() == "['6_backordering'] False"
+
+
+def test_core_import_stays_within_budget():
+    median_ms = statistics.median(bench_imports.import_time_us('lucas_project.core') / 1000 for _ in range(5))
+    assert median_ms < IMPORT_BUDGET_MS, f'import lucas_project.core took {median_ms:.0f} ms'
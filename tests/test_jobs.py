@@ -0,0 +1,172 @@
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import pytest
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
+
+from lucas_project.core.events import ProgressHub
+from lucas_project.core.jobs import JobEngine
+
+
+async def _publish(message, **kwargs):
+    pass
+
+
+def _engine():
+    return JobEngine(AsyncIOScheduler(), ProgressHub(_publish, tick=60))
+
+
+@pytest.mark.asyncio
+async def test_overlapping_triggers_run_once_plus_one_coalesced_follow_up():
+    engine = _engine()
+    started = []
+    release = asyncio.Event()
+
+    async def slow():
+        started.append(len(started))
+        await release.wait()
+        engine.progress.rows('slow', 5)
+
+    engine.register(slow, name='slow', minutes=5)
+    first = asyncio.create_task(engine.run('slow'))
+    await asyncio.sleep(0)
+    followers = [asyncio.create_task(engine.run('slow')) for _ in range(3)]
+    await asyncio.sleep(0)
+    assert started == [0]
+    release.set()
+    runs = await asyncio.gather(first, *followers)
+
+    assert started == [0, 1]
+    job = engine.jobs['slow']
+    assert job.runs == 2 and job.coalesced == 2
+    assert runs[1] is runs[2] is runs[3]
+    assert [run.rows for run in job.history] == [5, 5]
+    assert engine.scheduler.get_job('slow') is None
+    engine.schedule()
+    scheduled = engine.scheduler.get_job('slow')
+    assert scheduled.max_instances == 1 and scheduled.coalesce
+
+
+@pytest.mark.asyncio
+async def test_downstream_jobs_start_after_successful_upstream():
+    engine = _engine()
+    calls = []
+
+    async def upstream():
+        calls.append('upstream')
+
+    async def downstream():
+        calls.append('downstream')
+
+    async def broken():
+        raise RuntimeError('boom')
+
+    engine.register(upstream, name='upstream', minutes=60)
+    engine.register(downstream, name='downstream', minutes=60, after='upstream')
+    engine.register(broken, name='broken', minutes=60)
+    engine.register(downstream, name='after_broken', minutes=60, after=['broken'])
+
+    await engine.trigger('upstream')
+    await engine.aclose()
+    assert calls == ['upstream', 'downstream']
+    assert engine.jobs['downstream'].history[-1].trigger == 'after upstream'
+
+    run = await engine.trigger('broken')
+    await engine.aclose()
+    assert not run.ok
+    assert engine.jobs['after_broken'].runs == 0
+    assert engine.jobs['broken'].failures == 1
+
+
+@pytest.mark.asyncio
+async def test_profiler_samples_every_nth_run_and_prunes_reports(tmp_path):
+    from lucas_project.core.profiling import JobProfiler
+
+    profiler = JobProfiler(
+        'stage', mode='both', every=2, directory=tmp_path, retention=2, top=5
+    )
+    engine = JobEngine(AsyncIOScheduler(), ProgressHub(_publish, tick=60), profiler)
+
+    async def stage():
+        engine.progress.rows('stage', len([str(i) for i in range(1000)]))
+
+    async def other():
+        pass
+
+    engine.register(stage, name='stage', minutes=5)
+    engine.register(other, name='other', minutes=5)
+    for _ in range(7):
+        await engine.run('stage')
+    await engine.run('other')
+
+    assert profiler.calls == {'stage': 7}
+    reports = sorted(path.name for path in (tmp_path / 'stage').iterdir())
+    assert len(reports) == 4
+    assert sum(name.endswith('.prof') for name in reports) == 2
+    assert {name.split('.')[0].rsplit('-', 1)[1] for name in reports} == {'5', '7'}
+    assert not (tmp_path / 'other').exists()
+    [alloc] = (tmp_path / 'stage').glob('*-7.alloc.txt')
+    header = alloc.read_text().splitlines()[1]
+    assert header.startswith('# traced memory: current=')
+    # the run's 1000 short strings are gone again but show up in the peak
+    assert int(header.rsplit('peak=', 1)[1]) > 50_000
+
+
+@pytest.mark.asyncio
+async def test_queued_runs_keep_their_arguments():
+    engine = _engine()
+    calls = []
+    release = asyncio.Event()
+
+    async def stage(full_rebuild=False):
+        calls.append(full_rebuild)
+        await release.wait()
+
+    engine.register(stage, name='stage', minutes=5)
+    first = asyncio.create_task(engine.run('stage'))
+    await asyncio.sleep(0)
+    followers = [
+        asyncio.create_task(engine.run('stage')),
+        asyncio.create_task(engine.run('stage', full_rebuild=True)),
+        asyncio.create_task(engine.run('stage', full_rebuild=True)),
+    ]
+    await asyncio.sleep(0)
+    release.set()
+    runs = await asyncio.gather(first, *followers)
+
+    assert calls == [False, False, True]
+    assert runs[2] is runs[3] and runs[1] is not runs[2]
+    assert engine.jobs['stage'].coalesced == 1
+
+
+@pytest.mark.asyncio
+async def test_cancelled_queued_caller_releases_coalesced_waiters():
+    engine = _engine()
+    calls = []
+    release = asyncio.Event()
+
+    async def stage():
+        calls.append(len(calls))
+        await release.wait()
+
+    engine.register(stage, name='stage', minutes=5)
+    first = asyncio.create_task(engine.run('stage'))
+    await asyncio.sleep(0)
+    queued = asyncio.create_task(engine.run('stage'))
+    await asyncio.sleep(0)
+    coalesced = asyncio.create_task(engine.run('stage'))
+    await asyncio.sleep(0)
+    queued.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await coalesced
+    assert engine.jobs['stage']._queued == {}
+
+    later = asyncio.create_task(engine.run('stage'))
+    await asyncio.sleep(0)
+    release.set()
+    await asyncio.gather(first, later)
+    assert queued.cancelled()
+    assert calls == [0, 1]
@@ -0,0 +1,84 @@
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from lucas_project.core.llm_cache import LLMCache
+
+
+def test_store_survives_reload_and_evicts_lru(tmp_path):
+    path = tmp_path / 'cache.jsonl'
+    cache = LLMCache(path, max_entries=2)
+    cache.store('a', 1)
+    cache.store('b', 2)
+    assert cache.lookup('a') == 1
+    cache.store('c', 3)
+    assert cache.lookup('b') is None
+    assert cache.evictions == 1
+    cache.close()
+
+    reloaded = LLMCache(path, max_entries=2)
+    assert reloaded.lookup('a') == 1
+    assert reloaded.lookup('b') is None
+    assert reloaded.lookup('c') == 3
+
+
+def test_ttl_and_torn_write(tmp_path):
+    path = tmp_path / 'cache.jsonl'
+    cache = LLMCache(path)
+    cache.store('fresh', 'x')
+    cache.store('stale', 'y', ttl=-1)
+    assert cache.lookup('stale') is None
+    cache.close()
+    with path.open('a', encoding='utf-8') as fh:
+        fh.write('{"k": "torn", "v"')
+
+    reloaded = LLMCache(path)
+    assert reloaded.lookup('fresh') == 'x'
+    assert reloaded.lookup('torn') is None
+
+
+def test_migrates_legacy_json(tmp_path):
+    legacy = tmp_path / 'llm_cache.json'
+    legacy.write_text(json.dumps({'valuation:EstiBot:a.com': 100.0}), encoding='utf-8')
+
+    cache = LLMCache(legacy)
+    assert cache.path == tmp_path / 'llm_cache.jsonl'
+    assert cache.lookup('valuation:EstiBot:a.com') == 100.0
+    assert not legacy.exists()
+
+
+def test_append_after_torn_write(tmp_path):
+    path = tmp_path / 'cache.jsonl'
+    cache = LLMCache(path)
+    cache.store('fresh', 'x')
+    cache.close()
+    with path.open('a', encoding='utf-8') as fh:
+        fh.write('{"k": "torn", "v"')
+
+    resumed = LLMCache(path)
+    resumed.store('after', 'y')
+    resumed.close()
+
+    reloaded = LLMCache(path)
+    assert reloaded.lookup('fresh') == 'x'
+    assert reloaded.lookup('after') == 'y'
+    assert path.read_text(encoding='utf-8').endswith('\n')
+
+
+def test_skips_records_without_key_and_reports_every_instance(tmp_path):
+    from lucas_project.core.metrics import metrics
+
+    path = tmp_path / 'adhoc.jsonl'
+    path.write_text('{"v": 1}\n[1, 2]\n{"k": "ok", "v": 2}\n', encoding='utf-8')
+    cache = LLMCache(path)
+    assert len(cache) == 1
+    assert cache.lookup('ok') == 2
+
+    metrics.enabled = True
+    try:
+        text = metrics.render()
+    finally:
+        metrics.enabled = False
+    assert 'lucas_llm_cache_hits_total{cache="adhoc.jsonl"} 1' in text
@@ -0,0 +1,104 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import pytest
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
+
+from lucas_project.core.events import ProgressHub
+from lucas_project.core.jobs import JobEngine
+from lucas_project.core.metrics import MetricsRegistry, metrics
+from lucas_project.core.utils import circuit_breaker, retry
+
+
+async def _publish(message, **kwargs):
+    pass
+
+
+@pytest.fixture
+def enabled():
+    metrics.enabled = True
+    metrics.reset()
+    yield metrics
+    metrics.enabled = False
+    metrics.reset()
+
+
+def test_disabled_registry_records_nothing():
+    registry = MetricsRegistry(enabled=False)
+    counter = registry.counter('c_total', 'help', ('x',))
+    histogram = registry.histogram('h_seconds', 'help')
+    counter.inc('a')
+    histogram.observe(0.2)
+    assert counter.values == {} and histogram.values == {}
+    assert 'disabled' in registry.render()
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry = MetricsRegistry(enabled=True)
+    histogram = registry.histogram('h_seconds', 'Latency.', ('op',), buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.7, 3.0):
+        histogram.observe(value, 'read')
+    text = registry.render()
+    assert '# TYPE h_seconds histogram' in text
+    assert 'h_seconds_bucket{op="read",le="0.1"} 1' in text
+    assert 'h_seconds_bucket{op="read",le="1"} 3' in text
+    assert 'h_seconds_bucket{op="read",le="+Inf"} 4' in text
+    assert 'h_seconds_count{op="read"} 4' in text
+
+
+@pytest.mark.asyncio
+async def test_hot_paths_report_jobs_retries_and_breakers(enabled):
+    engine = JobEngine(AsyncIOScheduler(), ProgressHub(_publish, tick=60))
+
+    async def stage():
+        engine.progress.rows('stage', 10)
+
+    engine.register(stage, name='stage', minutes=5)
+    await engine.run('stage')
+
+    calls = []
+
+    @retry(2, backoff=0)
+    @circuit_breaker(1, 60)
+    async def flaky():
+        calls.append(1)
+        raise ValueError
+
+    with pytest.raises((ValueError, RuntimeError)):
+        await flaky()
+
+    text = enabled.render()
+    assert 'lucas_job_duration_seconds_count{job="stage"} 1' in text
+    assert 'lucas_job_rows_total{job="stage"} 10' in text
+    assert 'lucas_retries_total{function="test_metrics.test_hot_paths_report_jobs_retries_and_breakers.<locals>.flaky"} 2' in text
+    assert 'state="open"} 1' in text
+    assert 'lucas_circuit_breaker_open{' in text
+
+
+@pytest.mark.asyncio
+async def test_breaker_counts_real_transitions_and_measured_open_time(enabled):
+    import asyncio
+
+    release = asyncio.Event()
+
+    @circuit_breaker(1, 0.05)
+    async def failing():
+        await release.wait()
+        raise ValueError
+
+    calls = [asyncio.create_task(failing()) for _ in range(3)]
+    await asyncio.sleep(0)
+    release.set()
+    await asyncio.gather(*calls, return_exceptions=True)
+    await asyncio.sleep(0.2)
+    with pytest.raises(ValueError):
+        await failing()
+
+    text = enabled.render()
+    label = 'function="test_metrics.test_breaker_counts_real_transitions_and_measured_open_time.<locals>.failing"'
+    assert f'lucas_circuit_breaker_transitions_total{{{label},state="open"}} 2' in text
+    assert f'lucas_circuit_breaker_transitions_total{{{label},state="closed"}} 1' in text
+    open_seconds = float(text.split(f'lucas_circuit_breaker_open_seconds_total{{{label}}} ')[1].split()[0])
+    assert open_seconds >= 0.2
@@ -0,0 +1,87 @@
+import os
+import importlib
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import pytest
+
+from lucas_project.core.config import get_settings
+from lucas_project.core.db import get_db, get_engine
+from lucas_project.core.models import Base
+
+monitoring = importlib.import_module('lucas_project.modules.5_monitoring')
+
+
+def test_top_k_keeps_most_valuable_and_prefers_current_on_ties():
+    values = [(1, 5.0), (2, 9.0), (3, 1.0), (4, 9.0), (5, 7.0)]
+    assert monitoring.top_k(values, 3, set()) == {2, 4, 5}
+    assert monitoring.top_k([(1, 3.0), (2, 3.0)], 1, {2}) == {2}
+    assert monitoring.top_k([(1, 3.0), (2, 3.0)], 1, set()) == {1}
+
+
+@pytest.mark.asyncio
+async def test_run_keeps_top_valued_domains_per_service(tmp_path, monkeypatch):
+    os.environ['LUCAS_DATABASE_URL'] = str(tmp_path / 'monitoring.db')
+    get_settings.cache_clear()
+    Base.metadata.create_all(get_engine())
+    monkeypatch.setattr(monitoring, 'CAPS', {'UptimeRobot': 3, 'FreeDomainAlerts': 2})
+
+    async with get_db() as db:
+        # d1 was monitored before; d2 has many low valuations and one high one
+        await db.executemany(
+            'INSERT INTO domains (id, domain, status, created_at) VALUES (?, ?, ?, CURRENT_TIMESTAMP)',
+            [(1, 'd1.com', 'monitoring')] + [(i, f'd{i}.com', 'valuated') for i in range(2, 7)],
+        )
+        await db.executemany(
+            'INSERT INTO valuations (domain_id, service, value, created_at) VALUES (?, ?, ?, CURRENT_TIMESTAMP)',
+            [(1, 'EstiBot', 50.0), (2, 'EstiBot', 1.0), (2, 'GoDaddy', 1.0), (2, 'HumbleWorth', 100.0),
+             (3, 'EstiBot', 40.0), (4, 'EstiBot', 60.0), (5, 'EstiBot', 10.0), (6, 'EstiBot', 45.0)],
+        )
+        await db.executemany(
+            'INSERT INTO monitors (domain_id, service, monitor_ref) VALUES (?, ?, ?)',
+            [(1, 'UptimeRobot', 'UptimeRobot-1'), (5, 'FreeDomainAlerts', 'FreeDomainAlerts-5')],
+        )
+        await db.commit()
+
+    await monitoring.run()
+
+    async with get_db(readonly=True) as db:
+        async with db.execute('SELECT service, domain_id FROM monitors ORDER BY service, domain_id') as cur:
+            monitors = [tuple(row) for row in await cur.fetchall()]
+        async with db.execute("SELECT COUNT(*) FROM domains WHERE status = 'monitoring'") as cur:
+            assert (await cur.fetchone())[0] == 6
+    # averages: d1=50, d2=34, d3=40, d4=60, d5=10, d6=45
+    assert monitors == [
+        ('FreeDomainAlerts', 4), ('FreeDomainAlerts', 6),
+        ('UptimeRobot', 1), ('UptimeRobot', 4), ('UptimeRobot', 6),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_provider_calls_hold_no_connection(tmp_path, monkeypatch):
+    monkeypatch.setenv('LUCAS_DATABASE_URL', str(tmp_path / 'calls.db'))
+    get_settings.cache_clear()
+    Base.metadata.create_all(get_engine())
+    async with get_db() as db:
+        await db.execute(
+            "INSERT INTO domains (id, domain, status, created_at) VALUES (1, 'a.com', 'valuated', CURRENT_TIMESTAMP)"
+        )
+        await db.commit()
+    calls = []
+
+    async def create_monitor(service, domain_id):
+        # raises if this task still held the writer
+        async with get_db() as db:
+            await db.execute('SELECT 1')
+        calls.append(service)
+        return f'{service}-{domain_id}'
+
+    monkeypatch.setattr(monitoring, '_create_monitor', create_monitor)
+    await monitoring.monitor_one({'id': 1})
+    assert sorted(calls) == ['FreeDomainAlerts', 'UptimeRobot']
+    async with get_db(readonly=True) as db:
+        async with db.execute('SELECT COUNT(*) FROM monitors') as cur:
+            assert (await cur.fetchone())[0] == 2
+    get_settings.cache_clear()
@@ -10,6 +10,7 @@ import pytest
 from lucas_project.core.config import get_settings
 from lucas_project.core.models import Base
 from lucas_project.core.db import get_engine, get_db
+from lucas_project.core.llm_cache import LLMCache
 
 trend = importlib.import_module('lucas_project.modules.1_trend_discovery')
 gen = importlib.import_module('lucas_project.modules.2_domain_generator')
@@ -39,3 +40,264 @@ async def test_trend_to_domain_flow(tmp_path):
         async with db.execute('SELECT domain FROM domains') as cur:
             domains = await cur.fetchall()
     assert [d['domain'] for d in domains] == ['exampletrend.com']
+
+
+@pytest.mark.asyncio
+async def test_availability_check_survives_failures(tmp_path):
+    os.environ['LUCAS_DATABASE_URL'] = str(tmp_path / 'avail.db')
+    get_settings.cache_clear()
+    Base.metadata.create_all(get_engine())
+    checker = importlib.import_module('lucas_project.modules.3_availability_checker')
+
+    async with get_db() as db:
+        await db.executemany(
+            'INSERT INTO domains (domain, status, created_at) VALUES (?, ?, CURRENT_TIMESTAMP)',
+            [(f'd{i}.com', 'new') for i in range(10)],
+        )
+        await db.commit()
+
+    async def fake_check(domain):
+        if domain == 'd3.com':
+            raise RuntimeError('whois down')
+        return domain != 'd4.com'
+
+    original = checker.check_domain_availability
+    checker.check_domain_availability = fake_check
+    try:
+        await checker.run()
+    finally:
+        checker.check_domain_availability = original
+
+    async with get_db() as db:
+        async with db.execute('SELECT domain, status FROM domains') as cur:
+            statuses = {r['domain']: r['status'] for r in await cur.fetchall()}
+        async with db.execute('SELECT COUNT(*) FROM availability_checks') as cur:
+            checks = (await cur.fetchone())[0]
+    assert statuses['d3.com'] == 'new'
+    assert statuses['d4.com'] == 'taken'
+    assert statuses['d0.com'] == 'available'
+    assert checks == 9
+
+
+@pytest.mark.asyncio
+async def test_availability_record_failure_stops_sibling_workers(tmp_path, monkeypatch):
+    import asyncio
+
+    os.environ['LUCAS_DATABASE_URL'] = str(tmp_path / 'avail_fail.db')
+    monkeypatch.setenv('LUCAS_AVAILABILITY_BATCH_SIZE', '1')
+    monkeypatch.setenv('LUCAS_AVAILABILITY_CONCURRENCY', '4')
+    get_settings.cache_clear()
+    Base.metadata.create_all(get_engine())
+    checker = importlib.import_module('lucas_project.modules.3_availability_checker')
+
+    async with get_db() as db:
+        await db.executemany(
+            'INSERT INTO domains (domain, status, created_at) VALUES (?, ?, CURRENT_TIMESTAMP)',
+            [(f'f{i}.com', 'new') for i in range(40)],
+        )
+        await db.commit()
+
+    checks = []
+
+    async def fake_check(domain):
+        checks.append(domain)
+        await asyncio.sleep(0.01)
+        return True
+
+    async def broken_record(batch):
+        raise RuntimeError('disk full')
+
+    monkeypatch.setattr(checker, 'check_domain_availability', fake_check)
+    monkeypatch.setattr(checker, '_record', broken_record)
+    with pytest.raises(ExceptionGroup):
+        await checker.run.__wrapped__.__wrapped__()
+    await asyncio.sleep(0.05)
+    assert len(checks) <= 4
+    get_settings.cache_clear()
+
+
+@pytest.mark.asyncio
+async def test_valuation_survives_failed_domain_in_batch(tmp_path, monkeypatch):
+    import json
+
+    import httpx
+
+    from lucas_project.core.http import http_clients
+
+    os.environ['LUCAS_DATABASE_URL'] = str(tmp_path / 'value.db')
+    get_settings.cache_clear()
+    Base.metadata.create_all(get_engine())
+    valuation = importlib.import_module('lucas_project.modules.4_valuation')
+    monkeypatch.setattr(valuation, 'cache', LLMCache(tmp_path / 'cache.jsonl'))
+
+    async with get_db() as db:
+        await db.executemany(
+            'INSERT INTO domains (domain, status, created_at) VALUES (?, ?, CURRENT_TIMESTAMP)',
+            [(f'v{i}.com', 'available') for i in range(4)],
+        )
+        await db.commit()
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        domains = json.loads(request.content)['domains']
+        return httpx.Response(200, json={'valuations': [
+            {'domain': d, 'error': 'bad'} if d == 'v2.com' else {'domain': d, 'marketplace': 7}
+            for d in domains
+        ]})
+
+    http_clients.set_transport(httpx.MockTransport(handler))
+    try:
+        await valuation.run()
+    finally:
+        await http_clients.aclose()
+        http_clients.set_transport(None)
+
+    async with get_db(readonly=True) as db:
+        async with db.execute('SELECT domain, status FROM domains') as cur:
+            statuses = {r['domain']: r['status'] for r in await cur.fetchall()}
+        async with db.execute('SELECT COUNT(*) FROM valuations') as cur:
+            assert (await cur.fetchone())[0] == 9
+    assert statuses.pop('v2.com') == 'available'
+    assert set(statuses.values()) == {'valuated'}
+
+
+@pytest.mark.asyncio
+async def test_stages_advance_domain_status(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / 'lucas_project' / 'data').mkdir(parents=True)
+    os.environ['LUCAS_DATABASE_URL'] = str(tmp_path / 'stages.db')
+    get_settings.cache_clear()
+    Base.metadata.create_all(get_engine())
+    stages = {
+        name: importlib.import_module(f'lucas_project.modules.{name}')
+        for name in ['3_availability_checker', '4_valuation', '5_monitoring', '6_backordering', '8_monetization']
+    }
+
+    async def fake_value(domain):
+        return 10.0
+
+    monkeypatch.setitem(stages['4_valuation'].SERVICE_FUNCS, 'HumbleWorth', fake_value)
+    monkeypatch.setattr(stages['4_valuation'], 'cache', LLMCache(tmp_path / 'cache.jsonl'))
+
+    async with get_db() as db:
+        await db.execute(
+            "INSERT INTO domains (domain, status, created_at) VALUES ('a.com', 'new', CURRENT_TIMESTAMP)"
+        )
+        await db.commit()
+
+    expected = ['available', 'valuated', 'monitoring', 'backordered', 'backordered']
+    for module, status in zip(stages.values(), expected):
+        await module.run()
+        async with get_db(readonly=True) as db:
+            async with db.execute('SELECT status FROM domains') as cur:
+                assert (await cur.fetchone())['status'] == status
+
+    async with get_db(readonly=True) as db:
+        async with db.execute('SELECT COUNT(*) FROM valuations') as cur:
+            assert (await cur.fetchone())[0] == 3
+        async with db.execute('SELECT COUNT(*) FROM listings') as cur:
+            assert (await cur.fetchone())[0] == 1
+    assert (tmp_path / 'lucas_project' / 'data' / 'sedo_upload.csv').exists()
+
+
+@pytest.mark.asyncio
+async def test_stream_pipeline_flows_seed_to_monitoring(tmp_path, monkeypatch):
+    os.environ['LUCAS_DATABASE_URL'] = str(tmp_path / 'stream.db')
+    get_settings.cache_clear()
+    Base.metadata.create_all(get_engine())
+    stream = importlib.import_module('lucas_project.modules.stream')
+    valuation = importlib.import_module('lucas_project.modules.4_valuation')
+
+    async def fake_fetch_trends():
+        return ['stream me']
+
+    async def fake_value(domain):
+        return 5.0
+
+    monkeypatch.setattr(trend, 'fetch_trends', fake_fetch_trends)
+    monkeypatch.setitem(valuation.SERVICE_FUNCS, 'HumbleWorth', fake_value)
+    monkeypatch.setattr(valuation, 'cache', LLMCache(tmp_path / 'cache.jsonl'))
+
+    async def seeds():
+        for seed in await trend.discover():
+            yield seed
+
+    pipeline = stream.build_pipeline()
+    await pipeline.run(seeds())
+
+    async with get_db(readonly=True) as db:
+        async with db.execute('SELECT domain, status FROM domains') as cur:
+            rows = [tuple(r) for r in await cur.fetchall()]
+    assert rows == [('streamme.com', 'monitoring')]
+    assert pipeline.stats['monitoring'].processed == 1
+    assert len(pipeline.latencies) == 1
+
+
+@pytest.mark.asyncio
+async def test_generator_only_processes_new_seeds(tmp_path):
+    os.environ['LUCAS_DATABASE_URL'] = str(tmp_path / 'incremental.db')
+    get_settings.cache_clear()
+    Base.metadata.create_all(get_engine())
+
+    async def count_domains():
+        async with get_db(readonly=True) as db:
+            async with db.execute('SELECT COUNT(*) FROM domains') as cur:
+                return (await cur.fetchone())[0]
+
+    async with get_db() as db:
+        await db.execute("INSERT INTO trend_seeds (phrase) VALUES ('first')")
+        await db.commit()
+    await gen.run()
+    assert await count_domains() == 1
+
+    async with get_db() as db:
+        await db.execute('DELETE FROM domains')
+        await db.execute("INSERT INTO trend_seeds (phrase) VALUES ('second')")
+        await db.commit()
+    await gen.run()
+    assert await count_domains() == 1
+
+    await gen.run(full_rebuild=True)
+    assert await count_domains() == 2
+
+
+@pytest.mark.asyncio
+async def test_generator_drops_seeds_near_earlier_ones(tmp_path, monkeypatch):
+    import zlib
+
+    np = pytest.importorskip('numpy')
+    embeddings = importlib.import_module('lucas_project.core.embeddings')
+    os.environ['LUCAS_DATABASE_URL'] = str(tmp_path / 'semantic.db')
+    monkeypatch.setenv('LUCAS_SEMANTIC_DEDUP', 'true')
+    monkeypatch.setenv('LUCAS_SEMANTIC_DEDUP_THRESHOLD', '0.99')
+    get_settings.cache_clear()
+    Base.metadata.create_all(get_engine())
+
+    def encode(texts):
+        # phrases sharing their first five letters are near-duplicates
+        return np.array(
+            [[(zlib.crc32(text[:5].encode()) >> shift) % 7 + 1 for shift in range(8)] for text in texts],
+            dtype=np.float32,
+        )
+
+    engine = embeddings.EmbeddingEngine(model_name='fake', store_path=tmp_path, encoder=encode)
+    monkeypatch.setattr(embeddings, '_engine', engine)
+
+    async def domains():
+        async with get_db(readonly=True) as db:
+            async with db.execute('SELECT domain FROM domains ORDER BY id') as cur:
+                return [r[0] for r in await cur.fetchall()]
+
+    async with get_db() as db:
+        await db.execute("INSERT INTO trend_seeds (phrase) VALUES ('react')")
+        await db.commit()
+    await gen.run()
+    async with get_db() as db:
+        await db.executemany(
+            'INSERT INTO trend_seeds (phrase) VALUES (?)', [('reactjs',), ('svelte',)]
+        )
+        await db.commit()
+    await gen.run()
+
+    assert await domains() == ['react.com', 'svelte.com']
+    assert engine.encoded == 3
+    get_settings.cache_clear()
@@ -0,0 +1,85 @@
+import importlib
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import pytest
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+
+from lucas_project.core.config import get_settings
+from lucas_project.core.db import get_db, get_engine
+from lucas_project.core.llm_cache import LLMCache
+from lucas_project.core.models import Base
+from lucas_project.core.orchestrator import jobs
+from lucas_project.core.query_audit import audit_statements, record_statements
+from lucas_project.dashboard.api import init_app
+
+STAGES = [
+    '2_domain_generator',
+    '3_availability_checker',
+    '4_valuation',
+    '5_monitoring',
+    '6_backordering',
+    '7_portfolio_manager',
+    '8_monetization',
+]
+MIN_ROWS = 100
+
+
+async def _pad(db):
+    """Grow the hot tables past MIN_ROWS before the run."""
+    await db.executemany(
+        "INSERT INTO domains (domain, status, created_at) VALUES (?, ?, CURRENT_TIMESTAMP)",
+        [(f'pad{i}.com', 'owned') for i in range(MIN_ROWS)],
+    )
+    ids = [(i,) for i in range(2, MIN_ROWS + 2)]
+    await db.executemany(
+        "INSERT INTO valuations (domain_id, service, value, created_at) VALUES (?, 'estibot', 1, CURRENT_TIMESTAMP)", ids
+    )
+    await db.executemany(
+        "INSERT INTO availability_checks (domain_id, available, checked_at) VALUES (?, 0, CURRENT_TIMESTAMP)", ids
+    )
+    await db.executemany("INSERT INTO monitors (domain_id, service, monitor_ref) VALUES (?, 'Other', 'x')", ids)
+    await db.executemany(
+        "INSERT INTO backorders (domain_id, provider, ordered_at) VALUES (?, 'dropcatch', CURRENT_TIMESTAMP)", ids
+    )
+    await db.commit()
+
+
+@pytest.mark.asyncio
+async def test_stage_and_route_queries_avoid_full_scans(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / 'lucas_project' / 'data').mkdir(parents=True)
+    os.environ['LUCAS_DATABASE_URL'] = str(tmp_path / 'plans.db')
+    get_settings.cache_clear()
+    Base.metadata.create_all(get_engine())
+    stages = {name: importlib.import_module(f'lucas_project.modules.{name}') for name in STAGES}
+
+    async def fake_value(domain):
+        return 10.0
+
+    monkeypatch.setitem(stages['4_valuation'].SERVICE_FUNCS, 'HumbleWorth', fake_value)
+    monkeypatch.setattr(stages['4_valuation'], 'cache', LLMCache(tmp_path / 'cache.jsonl'))
+    async with get_db() as db:
+        await db.execute("INSERT INTO trend_seeds (phrase) VALUES ('audit')")
+        await _pad(db)
+
+    app = FastAPI()
+    init_app(app)
+    async with record_statements() as statements:
+        for name in stages:
+            # a failing stage would skip its queries and hide any full scan
+            run = await jobs.run(name)
+            assert run.ok, f'{name} failed'
+        async with AsyncClient(transport=ASGITransport(app=app), base_url='http://test') as client:
+            for path in ['/api/kpis', '/api/finance', '/api/domains?status=new', '/api/domains?tld=com&after=1']:
+                assert (await client.get(path)).status_code == 200
+
+    assert any('FROM domains WHERE status' in sql for sql in statements.values())
+    assert any('FROM monitors m' in sql for sql in statements.values())
+    async with get_db(readonly=True) as db:
+        scans = await audit_statements(db, statements.values(), min_rows=MIN_ROWS)
+    assert scans == [], '\n'.join(f'{s.table} ({s.rows} rows): {s.detail}\n  {s.sql}' for s in scans)
@@ -0,0 +1,81 @@
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import json
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from lucas_project.core.config import get_settings
+from lucas_project.core.db import get_db, get_engine
+from lucas_project.core.models import Base
+from lucas_project.dashboard.api import init_app
+
+
+@pytest.fixture
+def client(tmp_path):
+    os.environ['LUCAS_DATABASE_URL'] = str(tmp_path / 'routes.db')
+    get_settings.cache_clear()
+    Base.metadata.create_all(get_engine())
+    app = FastAPI()
+    init_app(app)
+    return TestClient(app)
+
+
+async def _seed(rows):
+    async with get_db() as db:
+        await db.executemany(
+            'INSERT INTO domains (domain, status, created_at) VALUES (?, ?, CURRENT_TIMESTAMP)', rows
+        )
+        await db.commit()
+
+
+def test_domains_keyset_pagination_and_filters(client):
+    import asyncio
+
+    asyncio.run(_seed([(f'd{i}.{"com" if i % 2 else "io"}', 'new' if i < 6 else 'available') for i in range(10)]))
+
+    first = client.get('/api/domains', params={'limit': 3}).json()
+    assert [d['domain'] for d in first['items']] == ['d0.io', 'd1.com', 'd2.io']
+    second = client.get('/api/domains', params={'limit': 3, 'after': first['next_cursor']}).json()
+    assert [d['id'] for d in second['items']] == [4, 5, 6]
+
+    page = client.get('/api/domains', params={'tld': 'com', 'status': 'new'}).json()
+    assert [d['domain'] for d in page['items']] == ['d1.com', 'd3.com', 'd5.com']
+    assert page['next_cursor'] is None
+    assert client.get('/api/domains', params={'limit': 5000}).status_code == 422
+
+
+def test_domains_export_streams_ndjson_and_json(client):
+    import asyncio
+
+    asyncio.run(_seed([(f'e{i}.com', 'new') for i in range(2500)]))
+
+    lines = client.get('/api/domains/export').text.splitlines()
+    assert len(lines) == 2500
+    assert json.loads(lines[-1])['domain'] == 'e2499.com'
+    exported = client.get('/api/domains/export', params={'format': 'json', 'status': 'new'}).json()
+    assert len(exported) == 2500
+
+
+def test_websocket_ignores_malformed_subscriptions(client):
+    import time
+
+    from lucas_project.core import broadcaster
+
+    with client.websocket_connect('/api/ws') as ws:
+        ws.send_text(json.dumps({'subscribe': 'stage.*'}))
+        ws.send_text(json.dumps({'subscribe': 5, 'unsubscribe': [1]}))
+        ws.send_text(json.dumps({'subscribe': ['domains.status']}))
+        deadline = time.monotonic() + 2
+        topics = set()
+        while time.monotonic() < deadline:
+            topics = {topic for c in broadcaster.connections.values() for topic in c.topics}
+            if topics:
+                break
+            time.sleep(0.01)
+    assert topics == {'domains.status'}
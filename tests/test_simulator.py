@@ -0,0 +1,83 @@
+import importlib
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import httpx
+import pytest
+
+from lucas_project.core.http import http_clients
+from lucas_project.core.simulator import (
+    ProviderProfile,
+    ProviderSimulator,
+    RecordingTransport,
+)
+
+availability = importlib.import_module('lucas_project.modules.3_availability_checker')
+valuation = importlib.import_module('lucas_project.modules.4_valuation')
+
+
+def _client(simulator, provider):
+    transport = httpx.ASGITransport(app=simulator.app(provider))
+    return httpx.AsyncClient(transport=transport, base_url=f'http://{provider}.test')
+
+
+@pytest.mark.asyncio
+async def test_fetchers_call_installed_simulator():
+    simulator = ProviderSimulator()
+    with simulator.install():
+        try:
+            assert isinstance(await availability.check_domain_availability('alpha.com'), bool)
+            estibot = await valuation.fetch_estibot('alpha.com')
+            godaddy = await valuation.fetch_godaddy('alpha.com')
+            humbleworth = await valuation.fetch_humbleworth('alpha.com')
+        finally:
+            await http_clients.aclose()
+    assert len({estibot, godaddy, humbleworth}) == 3
+    summary = simulator.summary()
+    assert {name: summary[name]['ok'] for name in summary} == {
+        'whois': 1, 'estibot': 1, 'godaddy': 1, 'humbleworth': 1
+    }
+    # outside the block the built-in stand-ins answer again
+    assert not http_clients.configured('whois')
+    assert await valuation.fetch_godaddy('alpha.com') == 60.0
+
+
+@pytest.mark.asyncio
+async def test_quota_exhaustion_and_error_injection():
+    simulator = ProviderSimulator(
+        {
+            'whois': ProviderProfile(quota=2, quota_period=30),
+            'estibot': ProviderProfile(error_rate=1.0),
+        }
+    )
+    async with _client(simulator, 'whois') as whois, _client(simulator, 'estibot') as estibot:
+        statuses = [(await whois.get('/whois', params={'domain': 'a.com'})).status_code for _ in range(3)]
+        throttled = await whois.get('/whois', params={'domain': 'a.com'})
+        failed = await estibot.get('/appraise', params={'domain': 'a.com'})
+    assert statuses == [200, 200, 429]
+    assert 0 < int(throttled.headers['retry-after']) <= 30
+    assert failed.status_code >= 500
+    assert simulator.summary()['whois']['quota_exhausted'] == 2
+
+
+@pytest.mark.asyncio
+async def test_recorded_responses_are_replayed(tmp_path):
+    fixtures = tmp_path / 'providers.jsonl'
+
+    def real(request):
+        return httpx.Response(200, json={'domain': 'a.com', 'value': 1234.0})
+
+    recorder = RecordingTransport('estibot', fixtures, httpx.MockTransport(real))
+    async with httpx.AsyncClient(transport=recorder, base_url='http://estibot.test') as client:
+        assert (await client.get('/appraise', params={'domain': 'a.com'})).json()['value'] == 1234.0
+
+    simulator = ProviderSimulator()
+    assert simulator.load_fixtures(fixtures) == 1
+    async with _client(simulator, 'estibot') as client:
+        replayed = (await client.get('/appraise', params={'domain': 'a.com'})).json()
+        generated = (await client.get('/appraise', params={'domain': 'b.com'})).json()
+    assert replayed['value'] == 1234.0
+    assert generated['value'] != 1234.0
+    assert simulator.summary()['estibot']['replayed'] == 1
@@ -0,0 +1,90 @@
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import httpx
+import pytest
+
+from lucas_project.core.utils import RateLimiter, get_rate_limiter, rate_limiter
+
+
+@pytest.mark.asyncio
+async def test_keyed_rate_limiter_shares_budget_and_ignores_latency():
+    @rate_limiter(max_calls=10, period=1.0, key='test-shared')
+    async def slow() -> None:
+        await asyncio.sleep(0.3)
+
+    @rate_limiter(max_calls=10, period=1.0, key='test-shared')
+    async def fast() -> None:
+        return None
+
+    assert slow.limiter is fast.limiter is get_rate_limiter('test-shared', 10, 1.0)
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    await asyncio.gather(*(slow() for _ in range(5)), *(fast() for _ in range(5)))
+    # 10 calls at 0.1s spacing, overlapping the slow calls
+    assert loop.time() - started < 1.2
+    assert fast.limiter.wait_time() > 0
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_honours_retry_after():
+    request = httpx.Request('GET', 'https://example.test')
+
+    @rate_limiter(max_calls=100, period=1.0, key='test-429')
+    async def throttled() -> None:
+        response = httpx.Response(429, headers={'Retry-After': '2'}, request=request)
+        response.raise_for_status()
+
+    with pytest.raises(httpx.HTTPStatusError):
+        await throttled()
+    assert 1.5 < throttled.limiter.wait_time() <= 2.0
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_never_exceeds_max_calls_per_window():
+    limiter = RateLimiter(5, 0.5)
+    loop = asyncio.get_running_loop()
+    times = []
+    for _ in range(12):
+        await limiter.acquire()
+        times.append(loop.time())
+    # any six consecutive calls must span at least one full period
+    assert all(later - earlier >= 0.5 - 0.01 for earlier, later in zip(times, times[5:]))
+
+
+def test_rate_limiter_key_rejects_conflicting_limits():
+    get_rate_limiter('test-conflict', 10, 1.0)
+    assert get_rate_limiter('test-conflict', 10, 1.0, burst=1).max_calls == 10
+    with pytest.raises(ValueError):
+        get_rate_limiter('test-conflict', 20, 1.0)
+
+
+@pytest.mark.asyncio
+async def test_callable_key_gives_each_service_its_own_budget():
+    @rate_limiter(max_calls=2, period=1.0, key=lambda service: f'test-svc:{service}')
+    async def call(service: str) -> None:
+        return None
+
+    await call('a')
+    await call('b')
+    assert get_rate_limiter('test-svc:a', 2, 1.0).wait_time() > 0
+    assert get_rate_limiter('test-svc:b', 2, 1.0).waits == 0
+    await call('a')
+    assert get_rate_limiter('test-svc:a', 2, 1.0).waits == 1
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_returns_its_slot():
+    limiter = RateLimiter(2, 1.0)
+    await limiter.acquire()
+    reserved = limiter.tat
+    waiter = asyncio.create_task(limiter.acquire())
+    await asyncio.sleep(0)
+    assert limiter.tat > reserved
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+    assert limiter.tat == reserved